@@ -0,0 +1,290 @@
+"""
+Benchmarks of the pi_sht1x hot paths. The protocol runs against simulated sensors on a counting GPIO backend, so
+no hardware is needed:
+
+    python benchmarks/benchmark.py              # run and check the results against budgets.json
+    python benchmarks/benchmark.py --update     # record the current results as the new budgets
+
+For every transaction the benchmark reports the GPIO calls and sleeps it issues, and the wall time of its
+phases: sending the command, waiting for Data Ready, reading the result and, as part of reading, the CRC check. It also
+measures the throughput of the conversion and CRC code. GPIO calls and sleeps are deterministic and may not
+exceed their budget; times and throughputs depend on the machine, --update records them with headroom.
+The script exits with status 1 when a budget is exceeded.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pi_sht1x import sht1x as sht1x_module  # noqa: E402
+from pi_sht1x import conversion  # noqa: E402
+from pi_sht1x.backends import GPIOBackend, BCM, HIGH, LOW  # noqa: E402
+from pi_sht1x.crc import CRCValidator  # noqa: E402
+from pi_sht1x.capture import RawSample  # noqa: E402
+from pi_sht1x.sht1x import SHT1x  # noqa: E402
+from pi_sht1x.simulator import SimulatedBackend, SimulatedSHT1x  # noqa: E402
+
+BUDGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+DATA_PIN = 18
+SCK_PIN = 23
+TRANSACTIONS = ('read_temperature', 'read_humidity', 'read_status_register')
+PHASES = {'command': '_send_command', 'wait': '_wait_for_result', 'crc': '_validate_crc'}
+# Conversions take 20% of their datasheet time: long enough that the host always samples the DATA line before
+# the sensor signals Data Ready, short enough to keep the benchmark quick.
+TIME_SCALE = 0.2
+# Times recorded by --update are multiplied by TIME_HEADROOM, throughputs divided by it.
+TIME_HEADROOM = 3.0
+
+
+class CountingBackend(SimulatedBackend):
+    """
+    Simulated backend counting the GPIO calls made by the library.
+    """
+    name = 'counting'
+
+    def __init__(self, sensors=()):
+        super().__init__(sensors)
+        self.calls = Counter()
+
+    def setmode(self, mode):
+        self.calls['setmode'] += 1
+        super().setmode(mode)
+
+    def setup(self, pin, direction, pull_up_down=None):
+        self.calls['setup'] += 1
+        if pull_up_down is None:
+            super().setup(pin, direction)
+        else:
+            super().setup(pin, direction, pull_up_down)
+
+    def output(self, pin, state):
+        self.calls['output'] += 1
+        super().output(pin, state)
+
+    def input(self, pin):
+        self.calls['input'] += 1
+        return super().input(pin)
+
+    def wait_for_edge(self, pin, edge, timeout=None):
+        self.calls['wait_for_edge'] += 1
+        return super().wait_for_edge(pin, edge, timeout)
+
+
+class ScriptedBackend(GPIOBackend):
+    """
+    Fake GPIO module whose DATA input repeats a fixed byte, MSB first, used to clock a known CRC byte into
+    _validate_crc without a sensor behind it.
+    """
+    name = 'scripted'
+
+    def __init__(self, byte):
+        self.bits = [(byte >> (7 - i)) & 1 for i in range(8)]
+        self.index = 0
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None):
+        pass
+
+    def output(self, pin, state):
+        pass
+
+    def input(self, pin):
+        bit = self.bits[self.index]
+        self.index = (self.index + 1) % 8
+        return HIGH if bit else LOW
+
+
+class CountingTime:
+    """
+    Stand-in for the time module of pi_sht1x.sht1x that counts the sleeps issued by the library.
+    """
+
+    def __init__(self):
+        self.sleeps = 0
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    def sleep(self, seconds):
+        self.sleeps += 1
+        time.sleep(seconds)
+
+
+def timed(method, totals, phase):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            totals[phase] += time.perf_counter() - start
+    return wrapper
+
+
+def benchmark_transactions(iterations):
+    """
+    Runs every transaction iterations times on a simulated sensor.
+    :return: Dictionary of transaction name to its GPIO calls, sleeps and phase times per transaction.
+    """
+    backend = CountingBackend([SimulatedSHT1x(DATA_PIN, SCK_PIN, time_scale=TIME_SCALE)])
+    clock = CountingTime()
+    sht1x_module.time = clock
+    try:
+        sensor = SHT1x(DATA_PIN, SCK_PIN, gpio_mode=BCM, backend=backend)
+        results = {}
+        for transaction in TRANSACTIONS:
+            totals = Counter()
+            for phase, method in PHASES.items():
+                setattr(sensor, method, timed(getattr(sensor, method), totals, phase))
+            read = getattr(sensor, transaction)
+            # Warm up, so pin setup and compiled waveforms of the first transaction are not counted.
+            read()
+            totals.clear()
+            backend.calls.clear()
+            clock.sleeps = 0
+
+            start = time.perf_counter()
+            for i in range(iterations):
+                read()
+            totals['total'] = time.perf_counter() - start
+
+            for method in PHASES.values():
+                delattr(sensor, method)
+            # _send_command includes the wait for Data Ready, everything after it is reading the result.
+            totals['read'] = totals['total'] - totals['command']
+            totals['command'] -= totals['wait']
+            calls = {name: count / iterations for name, count in sorted(backend.calls.items())}
+            calls['total'] = sum(backend.calls.values()) / iterations
+            results[transaction] = {'gpio_calls': calls,
+                                    'sleeps': clock.sleeps / iterations,
+                                    'time_us': {phase: totals[phase] / iterations * 1e6
+                                                for phase in ('command', 'wait', 'read', 'crc', 'total')}}
+        return results
+    finally:
+        sht1x_module.time = time
+
+
+def throughput(function, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        function()
+    return iterations / (time.perf_counter() - start)
+
+
+def benchmark_throughput(iterations):
+    """
+    Measures conversion and CRC throughput.
+    :return: Dictionary of benchmark name to operations per second.
+    """
+    table = conversion.get_table(3.5, SHT1x.RESOLUTION['High'])
+    raw_temperatures = list(range(5000, 9000, 4)) * 10
+    raw_humidities = list(range(1000, 3000, 2)) * 10
+
+    backend = SimulatedBackend([SimulatedSHT1x(DATA_PIN, SCK_PIN, time_scale=TIME_SCALE)])
+    sensor = SHT1x(DATA_PIN, SCK_PIN, gpio_mode=BCM, backend=backend, crc_check=True)
+    sensor._command = SHT1x.Commands['Temperature']
+    data = 6543
+    crc = sensor._calculate_crc(data)
+    # Once initialized, the sensor reads the CRC byte from the scripted backend instead of the simulator.
+    sensor.backend = ScriptedBackend(crc)
+
+    validator = CRCValidator('flag')
+    samples = [RawSample(0.0, raw_temperature, raw_humidity,
+                         sensor._calculate_crc(raw_temperature, command=SHT1x.Commands['Temperature']),
+                         sensor._calculate_crc(raw_humidity, command=SHT1x.Commands['Humidity']), 0, 0)
+               for raw_temperature, raw_humidity in zip(raw_temperatures[:1000], raw_humidities[:1000])]
+
+    return {
+        'conversion_table': throughput(lambda: table.humidity(2000, table.celsius(6543)), iterations * 100),
+        'conversion_convert_samples': throughput(
+            lambda: conversion.convert(raw_temperatures, raw_humidities), max(iterations // 100, 1)
+        ) * len(raw_temperatures),
+        'calculate_crc': throughput(lambda: sensor._calculate_crc(data), iterations * 100),
+        'validate_crc': throughput(lambda: sensor._validate_crc(data), iterations * 10),
+        'crc_validator_samples': throughput(lambda: validator.check(samples), max(iterations // 100, 1)) * len(samples),
+    }
+
+
+def check(results, budgets):
+    """
+    Compares results with budgets.
+    :return: List of budget violations.
+    """
+    violations = []
+    for transaction, budget in budgets.get('gpio_calls', {}).items():
+        actual = results['transactions'][transaction]['gpio_calls']['total']
+        if actual > budget:
+            violations.append('{0}: {1:g} GPIO calls, budget {2:g}'.format(transaction, actual, budget))
+    for transaction, budget in budgets.get('sleeps', {}).items():
+        actual = results['transactions'][transaction]['sleeps']
+        if actual > budget:
+            violations.append('{0}: {1:g} sleeps, budget {2:g}'.format(transaction, actual, budget))
+    for key, budget in budgets.get('time_us', {}).items():
+        transaction, phase = key.split('.')
+        actual = results['transactions'][transaction]['time_us'][phase]
+        if actual > budget:
+            violations.append('{0}: {1:.1f}us, budget {2:.1f}us'.format(key, actual, budget))
+    for name, budget in budgets.get('min_throughput', {}).items():
+        actual = results['throughput'][name]
+        if actual < budget:
+            violations.append('{0}: {1:.0f}/s, budget {2:.0f}/s'.format(name, actual, budget))
+    return violations
+
+
+def make_budgets(results):
+    transactions = results['transactions']
+    return {
+        'gpio_calls': {name: result['gpio_calls']['total'] for name, result in transactions.items()},
+        'sleeps': {name: result['sleeps'] for name, result in transactions.items()},
+        # Waiting time is set by the (simulated) conversion, only the bit-banging phases get a time budget.
+        'time_us': {'{0}.{1}'.format(name, phase): round(result['time_us'][phase] * TIME_HEADROOM, 1)
+                    for name, result in transactions.items() for phase in ('command', 'read', 'crc')},
+        'min_throughput': {name: round(value / TIME_HEADROOM) for name, value in results['throughput'].items()},
+    }
+
+
+def report(results):
+    for name, result in results['transactions'].items():
+        calls = ', '.join('{0} {1:g}'.format(call, count) for call, count in result['gpio_calls'].items())
+        phases = ', '.join('{0} {1:.1f}us'.format(phase, value) for phase, value in result['time_us'].items())
+        print('{0}\n  GPIO calls: {1}\n  sleeps: {2:g}\n  time: {3}'.format(name, calls, result['sleeps'], phases))
+    for name, value in results['throughput'].items():
+        print('{0}: {1:,.0f}/s'.format(name, value))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the pi_sht1x protocol, conversion and CRC code.')
+    parser.add_argument('-n', '--iterations', type=int, default=50, help='Transactions per benchmark.')
+    parser.add_argument('--budgets', default=BUDGETS_FILE, help='Budget file, defaults to budgets.json.')
+    parser.add_argument('--update', action='store_true', help='Record the results as the new budgets.')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    args = parser.parse_args(argv)
+
+    results = {'transactions': benchmark_transactions(args.iterations),
+               'throughput': benchmark_throughput(args.iterations)}
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        report(results)
+
+    if args.update:
+        with open(args.budgets, 'w') as f:
+            json.dump(make_budgets(results), f, indent=2, sort_keys=True)
+            f.write('\n')
+        print('Budgets written to {0}'.format(args.budgets))
+        return 0
+
+    with open(args.budgets) as f:
+        violations = check(results, json.load(f))
+    for violation in violations:
+        print('Budget exceeded: {0}'.format(violation), file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,40 @@
 __author__ = 'Doug Rohm'
-__version__ = '1.0.10'
+__version__ = '1.1.0'
 
-from .sht1x import SHT1x, SHT1xError
+import importlib
+
+# Public names and the modules defining them. They are imported on first access (PEP 562), so importing the
+# package doesn't load RPi.GPIO, NumPy or the logging setup on hosts that only need part of it.
+_exports = {'SHT1x': '.sht1x', 'Reading': '.sht1x',
+            'SHT1xError': '.exceptions', 'SHT1xAckError': '.exceptions', 'SHT1xStateError': '.exceptions',
+            'SHT1xTimeoutError': '.exceptions', 'SHT1xCRCError': '.exceptions',
+            'GPIOBackend': '.backends', 'RPiGPIOBackend': '.backends', 'GPIOMemBackend': '.backends',
+            'SimulatedBackend': '.simulator', 'SimulatedSHT1x': '.simulator',
+            'AsyncSHT1x': '.aio', 'read_sensors': '.aio',
+            'SHT1xBus': '.bus', 'BusReading': '.bus',
+            'Sampler': '.sampler',
+            'AdaptiveResolution': '.adaptive',
+            'COF': '.conversion',
+            'CRC': '.crc', 'CRCValidator': '.crc',
+            'RetryPolicy': '.retry',
+            'SensorMetrics': '.metrics', 'render_prometheus': '.metrics',
+            'CSVSink': '.sinks', 'SQLiteSink': '.sinks', 'LineProtocolSink': '.sinks', 'SinkWriter': '.sinks',
+            'Welford': '.aggregate', 'TumblingWindow': '.aggregate', 'SlidingWindow': '.aggregate',
+            'Oversampler': '.aggregate',
+            'SensorDaemon': '.daemon',
+            'SHT1xClient': '.client'}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
@@ -0,0 +1,95 @@
+"""
+Automatic choice of the measurement resolution for a sample rate or latency budget.
+"""
+import time
+
+from .exceptions import SHT1xError
+
+
+class AdaptiveResolution:
+    """
+    Reads a sensor at high resolution while a reading fits in the time budget, and switches it to low resolution
+    (12/8-bit, about a quarter of the conversion time) when it doesn't. The time a reading takes is modelled as the
+    nominal conversion time of the resolution plus an overhead (bus, scheduling, CPU load) that is tracked as an
+    exponential moving average of the measured durations. To avoid reconfiguring the sensor back and forth, the
+    sensor only returns to high resolution when the estimated reading fits the budget with a hysteresis margin,
+    and the resolution is kept for at least min_readings readings after every switch.
+
+    The object reads like a sensor and can be handed to a Sampler:
+
+        adaptive = AdaptiveResolution(sensor, rate=4)
+        reading = adaptive.read()
+    """
+
+    def __init__(self, sensor, rate=None, latency=None, hysteresis=0.2, min_readings=5, smoothing=0.2):
+        """
+        :param sensor: SHT1x object.
+        :param rate: Target number of readings per second, the budget of a reading is 1 / rate.
+        :param latency: Budget of a reading in seconds, used instead of rate.
+        :param hysteresis: Fraction of the budget that must be left before returning to high resolution.
+        :param min_readings: Minimum number of readings between two resolution changes.
+        :param smoothing: Weight of the newest duration in the overhead average.
+        """
+        if (rate is None) == (latency is None):
+            raise SHT1xError('Either a sample rate or a latency budget is required.')
+        budget = latency if latency is not None else 1.0 / rate
+        if budget <= 0:
+            raise SHT1xError('The sample rate and latency budget must be positive.')
+        self.sensor = sensor
+        self.budget = budget
+        self.hysteresis = hysteresis
+        self.min_readings = min_readings
+        self.smoothing = smoothing
+        self.overhead = 0.0
+        self.switches = 0
+        self._readings_since_switch = 0
+
+    @property
+    def logger(self):
+        return self.sensor.logger
+
+    def estimate(self, resolution):
+        """
+        Estimated duration of a reading at the given resolution.
+        :param resolution: [temperature bits, humidity bits].
+        :return: Duration in seconds.
+        """
+        return self.overhead + self._conversion_time(resolution)
+
+    def read(self):
+        """
+        Takes a reading at the current resolution, then switches the resolution for the next reading if needed.
+        :return: Reading.
+        """
+        start = time.monotonic()
+        reading = self.sensor.read()
+        duration = time.monotonic() - start
+
+        overhead = duration - self._conversion_time(reading.resolution)
+        if self._readings_since_switch:
+            self.overhead += self.smoothing * (overhead - self.overhead)
+        else:
+            self.overhead = overhead
+        self._readings_since_switch += 1
+        self._adapt()
+        return reading
+
+    def _adapt(self):
+        if self._readings_since_switch < self.min_readings:
+            return
+
+        high, low = self.sensor.RESOLUTION['High'], self.sensor.RESOLUTION['Low']
+        if self.sensor.resolution == high:
+            target = low if self.estimate(high) > self.budget else high
+        else:
+            target = high if self.estimate(high) <= self.budget * (1 - self.hysteresis) else low
+
+        if target != self.sensor.resolution:
+            self.logger.info('Switching resolution to %s/%s-bit, estimated reading time %.3fs for a budget of '
+                             '%.3fs.', target[0], target[1], self.estimate(target), self.budget)
+            self.sensor.resolution = target
+            self.switches += 1
+            self._readings_since_switch = 0
+
+    def _conversion_time(self, resolution):
+        return self.sensor.MEASUREMENT_TIME[resolution[0]] + self.sensor.MEASUREMENT_TIME[resolution[1]]
@@ -0,0 +1,282 @@
+"""
+Streaming aggregation of readings. Every aggregator updates in constant time per reading and keeps bounded
+state, so only the aggregates need to leave the device:
+
+    minutes = TumblingWindow(60, callback=print)
+    minutes.attach(sensor)
+    for reading in sensor.stream(rate=1):
+        pass
+
+TumblingWindow and SlidingWindow summarize temperature, humidity and dew point with count, mean, standard
+deviation, minimum and maximum. Oversampler averages every N readings into one, e.g. to reduce the noise of
+8-bit humidity readings.
+"""
+import math
+import threading
+from collections import deque, namedtuple
+
+from . import conversion
+from .exceptions import SHT1xError
+from .sht1x import Reading
+
+QUANTITIES = ('temperature_celsius', 'humidity', 'dew_point')
+
+Statistics = namedtuple('Statistics', ['count', 'mean', 'stddev', 'min', 'max'])
+Aggregate = namedtuple('Aggregate', ['start', 'end'] + list(QUANTITIES))
+Aggregate.__doc__ = """
+Statistics of the readings of a window, start and end being the timestamps bounding it.
+"""
+
+
+class Welford:
+    """
+    Running mean and variance using Welford's algorithm, numerically stable in a single pass. Values can be
+    removed again, in which case min and max are no longer maintained.
+    """
+    __slots__ = ('count', 'mean', 'min', 'max', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = None
+        self.max = None
+        self._m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def remove(self, value):
+        if self.count <= 1:
+            self.__init__()
+            return
+        mean = self.mean
+        self.count -= 1
+        self.mean -= (value - mean) / self.count
+        self._m2 -= (value - mean) * (value - self.mean)
+
+    @property
+    def variance(self):
+        """
+        Sample variance, 0 for less than two values.
+        """
+        return max(self._m2, 0.0) / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    def statistics(self):
+        return Statistics(self.count, self.mean if self.count else None, self.stddev, self.min, self.max)
+
+
+class Aggregator:
+    """
+    Base class of the aggregators. Readings are added with add, or received from the sensors the aggregator is
+    attached to. Aggregates are returned by add and passed to the callback.
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param callback: Optional, callable receiving every aggregate.
+        """
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._sensors = []
+
+    def attach(self, sensor):
+        """
+        Aggregates every reading of the sensor, see SHT1x.subscribe.
+        :return: None.
+        """
+        sensor.subscribe(self.add)
+        self._sensors.append(sensor)
+
+    def detach(self):
+        """
+        Stops receiving readings from the attached sensors.
+        :return: None.
+        """
+        for sensor in self._sensors:
+            sensor.unsubscribe(self.add)
+        self._sensors = []
+
+    def add(self, reading):
+        """
+        Adds a reading.
+        :param reading: Reading.
+        :return: Aggregate completed by the reading, None if there is none.
+        """
+        with self._lock:
+            result = self._add(reading)
+        if result is not None and self.callback is not None:
+            self.callback(result)
+        return result
+
+    def _add(self, reading):
+        raise NotImplementedError
+
+
+class TumblingWindow(Aggregator):
+    """
+    Summarizes the readings of consecutive, non-overlapping windows aligned to multiples of duration since the
+    epoch, so 60 second windows start on the minute. A window is emitted by the first reading past its end.
+    """
+
+    def __init__(self, duration, callback=None):
+        """
+        :param duration: Length of the windows in seconds.
+        """
+        if duration <= 0:
+            raise SHT1xError('The window duration must be positive.')
+        super().__init__(callback)
+        self.duration = duration
+        self._start = None
+        self._statistics = {quantity: Welford() for quantity in QUANTITIES}
+
+    def _add(self, reading):
+        start = reading.timestamp // self.duration * self.duration
+        aggregate = None
+        if self._start is not None and start != self._start:
+            aggregate = self._aggregate()
+        if self._start != start:
+            self._start = start
+            self._statistics = {quantity: Welford() for quantity in QUANTITIES}
+        for quantity, statistics in self._statistics.items():
+            value = getattr(reading, quantity)
+            if value is not None:
+                statistics.add(value)
+        return aggregate
+
+    def flush(self):
+        """
+        Emits the window in progress, e.g. when sampling stops.
+        :return: Aggregate, None if no reading was added since the last window.
+        """
+        with self._lock:
+            if self._start is None:
+                return None
+            aggregate = self._aggregate()
+            self._start = None
+        if self.callback is not None:
+            self.callback(aggregate)
+        return aggregate
+
+    def _aggregate(self):
+        return Aggregate(self._start, self._start + self.duration,
+                         *(self._statistics[quantity].statistics() for quantity in QUANTITIES))
+
+
+class SlidingWindow(Aggregator):
+    """
+    Summarizes the readings of the last duration seconds, updated with every reading. Evicted values are
+    removed from the running statistics, and minimum and maximum are tracked with monotonic queues, so every
+    update takes amortized constant time. At most max_samples readings are kept.
+    """
+
+    def __init__(self, duration, callback=None, max_samples=None):
+        """
+        :param duration: Length of the window in seconds.
+        :param max_samples: Optional, maximum number of readings in the window.
+        """
+        if duration <= 0:
+            raise SHT1xError('The window duration must be positive.')
+        super().__init__(callback)
+        self.duration = duration
+        self.max_samples = max_samples
+        # (sequence number, timestamp, values) of the readings in the window, numbered in the order they were added.
+        self._samples = deque()
+        self._added = 0
+        self._statistics = {quantity: Welford() for quantity in QUANTITIES}
+        # Per quantity, (sequence number, value) pairs with increasing values for the minimum, decreasing for the
+        # maximum. Readings can share a timestamp, so they are evicted by sequence number.
+        self._minimums = {quantity: deque() for quantity in QUANTITIES}
+        self._maximums = {quantity: deque() for quantity in QUANTITIES}
+
+    def _add(self, reading):
+        timestamp = reading.timestamp
+        sequence = self._added
+        self._added += 1
+        values = tuple(getattr(reading, quantity) for quantity in QUANTITIES)
+        self._samples.append((sequence, timestamp, values))
+        for quantity, value in zip(QUANTITIES, values):
+            if value is None:
+                continue
+            self._statistics[quantity].add(value)
+            minimums, maximums = self._minimums[quantity], self._maximums[quantity]
+            while minimums and minimums[-1][1] >= value:
+                minimums.pop()
+            minimums.append((sequence, value))
+            while maximums and maximums[-1][1] <= value:
+                maximums.pop()
+            maximums.append((sequence, value))
+
+        while (timestamp - self._samples[0][1] > self.duration or
+               self.max_samples is not None and len(self._samples) > self.max_samples):
+            self._evict()
+        return self._aggregate()
+
+    def _evict(self):
+        sequence, timestamp, values = self._samples.popleft()
+        for quantity, value in zip(QUANTITIES, values):
+            if value is None:
+                continue
+            self._statistics[quantity].remove(value)
+            for extremes in (self._minimums[quantity], self._maximums[quantity]):
+                if extremes and extremes[0][0] <= sequence:
+                    extremes.popleft()
+
+    def _aggregate(self):
+        results = []
+        for quantity in QUANTITIES:
+            statistics = self._statistics[quantity].statistics()
+            minimums, maximums = self._minimums[quantity], self._maximums[quantity]
+            results.append(statistics._replace(min=minimums[0][1] if minimums else None,
+                                               max=maximums[0][1] if maximums else None))
+        return Aggregate(self._samples[0][1], self._samples[-1][1], *results)
+
+
+class Oversampler(Aggregator):
+    """
+    Averages every n readings into a single Reading, timestamped with the first of them. The dew point is
+    calculated from the averaged temperature and humidity rather than averaged itself, since it is not linear in
+    either. crc_ok is False if any of the readings was flagged.
+    """
+
+    def __init__(self, n, callback=None):
+        """
+        :param n: Number of readings averaged.
+        """
+        if n < 1:
+            raise SHT1xError('Oversampling needs at least one reading.')
+        super().__init__(callback)
+        self.n = n
+        self._first = None
+        self._count = 0
+        self._sums = [0.0, 0.0, 0.0]
+        self._crc_ok = None
+
+    def _add(self, reading):
+        if self._count == 0:
+            self._first = reading
+            self._sums = [0.0, 0.0, 0.0]
+            self._crc_ok = reading.crc_ok
+        self._count += 1
+        self._sums[0] += reading.temperature_celsius
+        self._sums[1] += reading.temperature_fahrenheit
+        self._sums[2] += reading.humidity
+        if reading.crc_ok is not None:
+            self._crc_ok = reading.crc_ok and self._crc_ok is not False
+        if self._count < self.n:
+            return None
+
+        self._count = 0
+        celsius, fahrenheit, humidity = (total / self.n for total in self._sums)
+        return Reading(self._first.timestamp, celsius, fahrenheit, humidity, conversion.dew_point(celsius, humidity),
+                       self._first.resolution, self._crc_ok)
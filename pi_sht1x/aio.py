@@ -0,0 +1,199 @@
+"""
+asyncio interface to the SHT1x library. Sending commands and clocking out the result only takes a fraction of a
+millisecond; the conversion wait in between (up to 320ms) yields to the event loop, so sensors wired to separate
+pins convert concurrently:
+
+    sensors = [AsyncSHT1x(18, 23), AsyncSHT1x(24, 25)]
+    readings = await read_sensors(sensors)
+"""
+import asyncio
+import weakref
+
+from .backends import IN, HIGH, PUD_UP
+from .exceptions import SHT1xError, SHT1xTimeoutError
+from .sht1x import SHT1x
+
+# Per event loop, the asyncio lock of every SharedPins. The lock of the pins is reentrant, so on its own it doesn't
+# keep two coroutines on the event loop thread from interleaving their transactions.
+_pin_locks = weakref.WeakKeyDictionary()
+
+
+def pins_lock(sensor):
+    """
+    Returns the asyncio lock of the pins of an SHT1x object on the running event loop, shared by every AsyncSHT1x
+    using the same SCK line.
+    """
+    locks = _pin_locks.setdefault(asyncio.get_running_loop(), {})
+    lock = locks.get(sensor._pins)
+    if lock is None:
+        lock = locks[sensor._pins] = asyncio.Lock()
+    return lock
+
+
+class AsyncSHT1x:
+    """
+    Wraps a :class:`pi_sht1x.SHT1x` object and exposes its measurements as coroutines. Attributes that are not
+    defined here, such as ``temperature_celsius`` or ``resolution``, are read from the wrapped sensor.
+    """
+
+    def __init__(self, data_pin, sck_pin, **kwargs):
+        """
+        Creates and initializes the wrapped sensor, the keyword arguments are passed on to SHT1x.
+        """
+        self.sensor = SHT1x(data_pin, sck_pin, **kwargs)
+        self._locks = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_sensor(cls, sensor):
+        """
+        Wraps an already initialized SHT1x object.
+        :param sensor: SHT1x object.
+        :return: AsyncSHT1x.
+        """
+        async_sensor = cls.__new__(cls)
+        async_sensor.sensor = sensor
+        async_sensor._locks = weakref.WeakKeyDictionary()
+        return async_sensor
+
+    def __getattr__(self, name):
+        return getattr(self.sensor, name)
+
+    @property
+    def _lock(self):
+        """
+        asyncio lock of the wrapper on the running event loop. Locks are created inside the loop that uses them,
+        so a wrapper created outside of a loop, or used by several loops in turn, never waits on a lock bound to
+        another loop.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return self.sensor.__exit__(exc_type, exc_val, exc_tb)
+
+    async def read_temperature(self):
+        """
+        Reads the temperature, see SHT1x.read_temperature.
+        :return: Temperature in celsius.
+        """
+        async with self._lock:
+            raw_temperature = await self._measure(SHT1x.Commands['Temperature'])
+            return self.sensor._convert_temperature(raw_temperature)
+
+    async def read_humidity(self, temperature=None):
+        """
+        Reads the temperature compensated humidity, see SHT1x.read_humidity.
+        :param temperature: Optional, temperature in celsius used for compensation.
+        :return: Relative humidity.
+        """
+        if temperature is None:
+            if self.sensor.temperature_celsius is None:
+                await self.read_temperature()
+            temperature = self.sensor.temperature_celsius
+
+        async with self._lock:
+            raw_humidity = await self._measure(SHT1x.Commands['Humidity'])
+            return self.sensor._convert_humidity(raw_humidity, temperature)
+
+    async def calculate_dew_point(self, temperature=None, humidity=None):
+        """
+        Calculates the dew point, reading the temperature and humidity if they are not given.
+        :param temperature: Temperature in degrees celsius.
+        :param humidity: Humidity.
+        :return: Dew point in celsius.
+        """
+        if temperature is None:
+            if self.sensor.temperature_celsius is None:
+                await self.read_temperature()
+            temperature = self.sensor.temperature_celsius
+
+        if humidity is None:
+            if self.sensor.humidity is None:
+                await self.read_humidity(temperature)
+            humidity = self.sensor.humidity
+
+        return self.sensor.calculate_dew_point(temperature, humidity)
+
+    async def read_all(self):
+        """
+        Takes a fresh temperature and humidity measurement and calculates the dew point.
+        :return: Tuple of temperature (celsius), relative humidity and dew point.
+        """
+        temperature = await self.read_temperature()
+        humidity = await self.read_humidity(temperature)
+        return temperature, humidity, self.sensor.calculate_dew_point(temperature, humidity)
+
+    async def _measure(self, command):
+        """
+        Sends a measurement command, yields to the event loop until the sensor signals Data Ready and reads the
+        result using the protocol code of the wrapped sensor. Failed measurements are retried by the retry policy
+        of the sensor, if it has one.
+        :param command: Temperature or Humidity command.
+        :return: Raw 16-bit measurement value.
+        """
+        sensor = self.sensor
+        async with pins_lock(sensor):
+            if sensor.retry_policy is None:
+                return await self._measure_locked(command)
+            return await sensor.retry_policy.run_async(sensor, self._measure_locked, command)
+
+    async def _measure_locked(self, command):
+        sensor = self.sensor
+        # The pins may also be used by SHT1x objects on other threads, wait for their transactions without
+        # blocking the event loop.
+        while not sensor.lock.acquire(blocking=False):
+            await asyncio.sleep(sensor.POLL_INTERVAL)
+        metrics = sensor.metrics
+        started = metrics.clock() if metrics is not None else None
+        try:
+            sensor._prepare()
+            sensor._command = command
+            sensor._send_command(wait=False)
+            waiting = metrics.clock() if metrics is not None else None
+            await self._wait_for_result()
+            if metrics is not None:
+                metrics.observe('wait', metrics.clock() - waiting)
+            return sensor._read_measurement()
+        except SHT1xError as e:
+            if metrics is not None:
+                metrics.error(e)
+            raise
+        finally:
+            if metrics is not None:
+                metrics.observe('transaction', metrics.clock() - started)
+            sensor.lock.release()
+
+    async def _wait_for_result(self):
+        """
+        Polls the DATA line until the sensor pulls it low, sleeping on the event loop in between.
+        :return: None.
+        """
+        sensor = self.sensor
+        sensor._setup_pin(sensor.data_pin, IN, PUD_UP)
+        loop = asyncio.get_running_loop()
+        timeout = sensor.conversion_timeout()
+        deadline = loop.time() + timeout
+        poll_interval = min(sensor.POLL_INTERVAL, timeout / 10)
+
+        while sensor.backend.input(sensor.data_pin) == HIGH:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise SHT1xTimeoutError('Sensor has not completed measurement after {0:.0f}ms.\n{1}'
+                                        .format(timeout * 1000, sensor))
+            await asyncio.sleep(min(poll_interval, remaining))
+        sensor.logger.debug('Measurement complete.')
+
+
+async def read_sensors(sensors):
+    """
+    Reads temperature, humidity and dew point from several sensors concurrently.
+    :param sensors: Iterable of AsyncSHT1x objects.
+    :return: List of (temperature, humidity, dew point) tuples, in the order of the sensors.
+    """
+    return await asyncio.gather(*(sensor.read_all() for sensor in sensors))
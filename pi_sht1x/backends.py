@@ -0,0 +1,298 @@
+"""
+GPIO backends used by the SHT1x library to drive the DATA and SCK pins.
+"""
+import mmap
+import os
+import time
+
+from .exceptions import SHT1xError
+
+# Values match the constants exported by RPi.GPIO so they can be used interchangeably.
+OUT = 0
+IN = 1
+LOW = 0
+HIGH = 1
+BOARD = 10
+BCM = 11
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+RISING = 31
+FALLING = 32
+BOTH = 33
+
+
+class GPIOBackend:
+    """
+    Interface used by :class:`pi_sht1x.SHT1x` to talk to the GPIO pins. The method names and arguments mirror the
+    subset of the RPi.GPIO API used by the library, so a backend only has to implement these few calls.
+    """
+    name = None
+    # Time to hold SCK after every edge, None uses SHT1x.SCK_DELAY.
+    sck_delay = None
+
+    def setmode(self, mode):
+        """
+        Sets the pin numbering scheme.
+        :param mode: BOARD or BCM.
+        :return: None.
+        """
+        raise NotImplementedError
+
+    def setup(self, pin, direction, pull_up_down=PUD_OFF):
+        """
+        Configures the direction of a pin.
+        :param pin: Pin to configure.
+        :param direction: IN or OUT.
+        :param pull_up_down: Pull resistor used when the pin is an input: PUD_OFF, PUD_DOWN or PUD_UP.
+        :return: None.
+        """
+        raise NotImplementedError
+
+    def output(self, pin, state):
+        """
+        Drives an output pin.
+        :param pin: Pin to drive.
+        :param state: LOW or HIGH, any truthy value is treated as HIGH.
+        :return: None.
+        """
+        raise NotImplementedError
+
+    def input(self, pin):
+        """
+        Reads the level of a pin.
+        :param pin: Pin to read.
+        :return: LOW or HIGH.
+        """
+        raise NotImplementedError
+
+    def wait_for_edge(self, pin, edge, timeout=None):
+        """
+        Blocks until an edge is detected on an input pin. Backends without edge detection leave this
+        unimplemented and the library polls the pin instead.
+        :param pin: Pin to watch.
+        :param edge: RISING, FALLING or BOTH.
+        :param timeout: Maximum time to wait in milliseconds, None waits forever.
+        :return: The pin if an edge was detected, None on timeout.
+        """
+        raise NotImplementedError
+
+    def gpio_function(self, pin):
+        """
+        Returns the current function of a pin.
+        :param pin: Pin to query.
+        :return: IN, OUT or another RPi.GPIO function code.
+        """
+        raise NotImplementedError
+
+    def cleanup(self, pins=None):
+        """
+        Returns pins used by the backend to their default state.
+        :param pins: Pins to clean up, None cleans up every pin the backend has set up.
+        :return: None.
+        """
+        raise NotImplementedError
+
+
+class RPiGPIOBackend(GPIOBackend):
+    """
+    Backend using the RPi.GPIO package (http://pypi.python.org/pypi/RPi.GPIO). The package is imported when the
+    backend is created, not when pi_sht1x is imported, so hosts without it can still use the rest of the library.
+    """
+    name = 'RPi.GPIO'
+
+    def __init__(self):
+        try:
+            import RPi.GPIO as GPIO
+        except (ImportError, RuntimeError):
+            raise SHT1xError('Could not import the RPi.GPIO package (http://pypi.python.org/pypi/RPi.GPIO). Exiting.')
+        self.gpio = GPIO
+
+    def setmode(self, mode):
+        self.gpio.setmode(mode)
+
+    def setup(self, pin, direction, pull_up_down=PUD_OFF):
+        if direction == IN:
+            self.gpio.setup(pin, direction, pull_up_down=pull_up_down)
+        else:
+            self.gpio.setup(pin, direction)
+
+    def output(self, pin, state):
+        self.gpio.output(pin, state)
+
+    def input(self, pin):
+        return self.gpio.input(pin)
+
+    def wait_for_edge(self, pin, edge, timeout=None):
+        if timeout is None:
+            return self.gpio.wait_for_edge(pin, edge)
+        return self.gpio.wait_for_edge(pin, edge, timeout=timeout)
+
+    def gpio_function(self, pin):
+        return self.gpio.gpio_function(pin)
+
+    def cleanup(self, pins=None):
+        if pins is None:
+            self.gpio.cleanup()
+        else:
+            self.gpio.cleanup(list(pins))
+
+
+class GPIOMemBackend(GPIOBackend):
+    """
+    Backend driving the pins through the GPIO registers of the BCM283x/BCM2711, memory-mapped from /dev/gpiomem.
+    Every edge is a single 32-bit store to the SET or CLR register and every read a load from the LEV register,
+    without a C call or argument validation per edge. The Python overhead between two edges already exceeds the
+    minimum SCK high and low times of the SHT1x, so the backend needs no SCK delay.
+
+    Edge detection is not available, the library polls the DATA line instead. Any file of at least REGISTER_SIZE
+    bytes can be used as the register file, which allows testing the backend without a Raspberry Pi.
+    """
+    name = 'gpiomem'
+    sck_delay = 0
+
+    GPFSEL0 = 0x00
+    GPSET0 = 0x1c
+    GPCLR0 = 0x28
+    GPLEV0 = 0x34
+    GPPUD = 0x94
+    GPPUDCLK0 = 0x98
+    # BCM2711 (Raspberry Pi 4) pull-up/down registers, 2 bits per pin.
+    GPIO_PUP_PDN_CNTRL_REG0 = 0xe4
+    REGISTER_SIZE = 0xf4
+    # The last pull register of the BCM2711 reads 'gpio' on older chips.
+    BCM2835_MARKER = 0x6770696f
+
+    # Physical header pin to BCM GPIO number, for the 40-pin header.
+    BOARD_TO_BCM = {3: 2, 5: 3, 7: 4, 8: 14, 10: 15, 11: 17, 12: 18, 13: 27, 15: 22, 16: 23, 18: 24, 19: 10,
+                    21: 9, 22: 25, 23: 11, 24: 8, 26: 7, 27: 0, 28: 1, 29: 5, 31: 6, 32: 12, 33: 13, 35: 19,
+                    36: 16, 37: 26, 38: 20, 40: 21}
+
+    def __init__(self, path='/dev/gpiomem'):
+        """
+        :param path: Path of the GPIO register file.
+        """
+        self.path = path
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        except OSError as e:
+            raise SHT1xError('Could not open {0}: {1}'.format(path, e.strerror))
+        try:
+            # Character devices report a size of 0, /dev/gpiomem maps one page.
+            size = os.fstat(fd).st_size or mmap.PAGESIZE
+            if size < self.REGISTER_SIZE:
+                raise SHT1xError('{0} is too small to hold the GPIO registers.'.format(path))
+            self._mmap = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        self._registers = memoryview(self._mmap).cast('I')
+        self._bcm2711 = self._registers[self.GPIO_PUP_PDN_CNTRL_REG0 // 4 + 3] != self.BCM2835_MARKER
+        self._mode = BCM
+        self._pins = {}
+        self._used = set()
+
+    def setmode(self, mode):
+        if mode not in (BOARD, BCM):
+            raise SHT1xError('Unknown GPIO mode: {0}'.format(mode))
+        self._mode = mode
+        self._pins.clear()
+
+    def _pin(self, pin):
+        """
+        Register word indexes and bit mask of a pin: (SET index, CLR index, LEV index, mask, BCM number).
+        """
+        registers = self._pins.get(pin)
+        if registers is None:
+            gpio = pin if self._mode == BCM else self.BOARD_TO_BCM.get(pin)
+            if gpio is None or not 0 <= gpio < 54:
+                raise SHT1xError('Invalid pin: {0}'.format(pin))
+            bank, bit = divmod(gpio, 32)
+            registers = self._pins[pin] = (self.GPSET0 // 4 + bank, self.GPCLR0 // 4 + bank,
+                                           self.GPLEV0 // 4 + bank, 1 << bit, gpio)
+        return registers
+
+    def setup(self, pin, direction, pull_up_down=PUD_OFF):
+        gpio = self._pin(pin)[4]
+        self._setup_gpio(gpio, direction, pull_up_down)
+        self._used.add(gpio)
+
+    def _setup_gpio(self, gpio, direction, pull_up_down):
+        if direction == IN:
+            self._set_pull(gpio, pull_up_down)
+        index, shift = self.GPFSEL0 // 4 + gpio // 10, (gpio % 10) * 3
+        function = 0b001 if direction == OUT else 0b000
+        self._registers[index] = (self._registers[index] & ~(0b111 << shift)) | (function << shift)
+
+    def _set_pull(self, gpio, pull_up_down):
+        registers = self._registers
+        if self._bcm2711:
+            value = {PUD_OFF: 0, PUD_UP: 1, PUD_DOWN: 2}[pull_up_down]
+            index, shift = self.GPIO_PUP_PDN_CNTRL_REG0 // 4 + gpio // 16, (gpio % 16) * 2
+            registers[index] = (registers[index] & ~(0b11 << shift)) | (value << shift)
+        else:
+            # Control signal, then clock it into the pin, holding each for at least 150 cycles.
+            clock = self.GPPUDCLK0 // 4 + gpio // 32
+            registers[self.GPPUD // 4] = {PUD_OFF: 0, PUD_DOWN: 1, PUD_UP: 2}[pull_up_down]
+            time.sleep(0.00001)
+            registers[clock] = 1 << gpio % 32
+            time.sleep(0.00001)
+            registers[self.GPPUD // 4] = 0
+            registers[clock] = 0
+
+    def output(self, pin, state):
+        set_index, clear_index, level_index, mask, gpio = self._pin(pin)
+        self._registers[set_index if state else clear_index] = mask
+
+    def input(self, pin):
+        set_index, clear_index, level_index, mask, gpio = self._pin(pin)
+        return HIGH if self._registers[level_index] & mask else LOW
+
+    def gpio_function(self, pin):
+        gpio = self._pin(pin)[4]
+        function = (self._registers[self.GPFSEL0 // 4 + gpio // 10] >> (gpio % 10) * 3) & 0b111
+        return {0b000: IN, 0b001: OUT}.get(function, -1)
+
+    def cleanup(self, pins=None):
+        gpios = set(self._used) if pins is None else {self._pin(pin)[4] for pin in pins} & self._used
+        for gpio in gpios:
+            self._setup_gpio(gpio, IN, PUD_OFF)
+        self._used -= gpios
+
+    def close(self):
+        """
+        Unmaps the register file.
+        :return: None.
+        """
+        self._registers.release()
+        self._mmap.close()
+
+
+BACKENDS = {RPiGPIOBackend.name: RPiGPIOBackend, GPIOMemBackend.name: GPIOMemBackend}
+FALLBACKS = {GPIOMemBackend.name: RPiGPIOBackend.name}
+# Backends created by name, shared by every sensor asking for the same name.
+_named_backends = {}
+
+
+def get_backend(backend=None):
+    """
+    Resolves the backend argument of the library classes.
+    :param backend: GPIOBackend object, name of a backend in BACKENDS, or None for RPi.GPIO. A named backend is
+    created once and shared, like the GPIO pins it drives, so sensors on the same SCK line share its lock. When it
+    can't be created, its fallback in FALLBACKS is used instead (gpiomem falls back to RPi.GPIO).
+    :return: GPIOBackend object.
+    """
+    if backend is None:
+        backend = RPiGPIOBackend.name
+    if not isinstance(backend, str):
+        return backend
+    if backend not in BACKENDS:
+        raise SHT1xError('Unknown GPIO backend: {0}'.format(backend))
+    instance = _named_backends.get(backend)
+    if instance is None:
+        try:
+            instance = _named_backends[backend] = BACKENDS[backend]()
+        except SHT1xError:
+            if backend not in FALLBACKS:
+                raise
+            return get_backend(FALLBACKS[backend])
+    return instance
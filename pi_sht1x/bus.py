@@ -0,0 +1,249 @@
+"""
+Lockstep reads of several SHT1x sensors sharing one SCK line. The SHT1x protocol is clocked by the host, so
+sensors that share SCK but each have their own DATA pin can be driven by a single clock sequence: the command is
+sent to all of them at once and the MSB, LSB and CRC bytes of every sensor are sampled on the same clock edges.
+"""
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+
+from .backends import get_backend, OUT, IN, LOW, HIGH, BOARD, PUD_UP, FALLING
+from .exceptions import SHT1xError
+from .sht1x import SHT1x
+
+BusReading = namedtuple('BusReading', ['data_pin', 'raw', 'value', 'crc_ok', 'error'])
+BusReading.__doc__ = """
+Result of a lockstep measurement for one sensor. ``value`` is the converted measurement, ``crc_ok`` is None when
+CRC checking is disabled, and ``error`` holds the error message when the sensor did not complete the transaction,
+in which case ``raw`` and ``value`` are None.
+"""
+
+
+class SHT1xBus:
+    """
+    Group of SHT1x sensors wired to a shared SCK pin, each on its own DATA pin. All sensors are configured with
+    the same settings. Every sensor is available as an SHT1x object in ``sensors`` for individual transactions.
+    """
+
+    def __init__(self, data_pins, sck_pin, gpio_mode=BOARD, vdd='3.5V', resolution='High',
+                 heater=False, otp_no_reload=False, crc_check=True, logger=None, backend=None,
+                 wait_strategy='edge', sck_delay=None):
+        backend = get_backend(backend)
+        self.sck_pin = sck_pin
+        self.crc_check = crc_check
+        self.sensors = [SHT1x(data_pin, sck_pin, gpio_mode=gpio_mode, vdd=vdd, resolution=resolution, heater=heater,
+                              otp_no_reload=otp_no_reload, crc_check=crc_check, logger=logger, backend=backend,
+                              wait_strategy=wait_strategy, sck_delay=sck_delay)
+                        for data_pin in data_pins]
+        if not self.sensors:
+            raise SHT1xError('At least one data pin is required.')
+        self.backend = backend
+        self._clock = self.sensors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # The SCK line is cleaned up by the last sensor leaving it.
+        for sensor in self.sensors[1:]:
+            sensor.__exit__(None, None, None)
+        return self._clock.__exit__(exc_type, exc_val, exc_tb)
+
+    @property
+    def logger(self):
+        return self._clock.logger
+
+    def read_temperature(self):
+        """
+        Reads the temperature of all sensors in a single transaction.
+        :return: List of BusReading, one per sensor, with the temperature in celsius as value.
+        """
+        results = self._measure(SHT1x.Commands['Temperature'])
+        return [result if result.error else result._replace(value=sensor._convert_temperature(result.raw))
+                for sensor, result in zip(self.sensors, results)]
+
+    def read_humidity(self, temperatures=None):
+        """
+        Reads the humidity of all sensors in a single transaction.
+        :param temperatures: Optional list of temperatures, one per sensor, used for compensation. Defaults to the
+        last temperature read by each sensor, sensors without a temperature are read first.
+        :return: List of BusReading, one per sensor, with the relative humidity as value.
+        """
+        if temperatures is None:
+            if any(sensor.temperature_celsius is None for sensor in self.sensors):
+                self.read_temperature()
+            temperatures = [sensor.temperature_celsius for sensor in self.sensors]
+
+        results = self._measure(SHT1x.Commands['Humidity'])
+        return [result if result.error or temperature is None else
+                result._replace(value=sensor._convert_humidity(result.raw, temperature))
+                for sensor, result, temperature in zip(self.sensors, results, temperatures)]
+
+    def read_all(self):
+        """
+        Reads temperature and humidity of all sensors and calculates their dew points.
+        :return: List of (temperature, humidity, dew point) tuples, one per sensor. A reading that failed or did not
+        pass the CRC check is reported as its BusReading instead of a number.
+        """
+        temperatures = self.read_temperature()
+        humidities = self.read_humidity([reading.value for reading in temperatures])
+        readings = []
+        for sensor, temperature, humidity in zip(self.sensors, temperatures, humidities):
+            if temperature.error or humidity.error or temperature.crc_ok is False or humidity.crc_ok is False:
+                readings.append((temperature, humidity, None))
+            else:
+                readings.append((temperature.value, humidity.value,
+                                 sensor.calculate_dew_point(temperature.value, humidity.value)))
+        return readings
+
+    def _measure(self, command):
+        """
+        Runs one measurement transaction on all sensors, holding the pin locks of all of them. Settings changed by
+        other SHT1x objects on the same pins are restored first.
+        :param command: Temperature or Humidity command.
+        :return: List of BusReading with raw values, in the order of the sensors.
+        """
+        with ExitStack() as stack:
+            for sensor in self.sensors:
+                stack.enter_context(sensor.lock)
+            for sensor in self.sensors:
+                sensor._prepare()
+            return self._measure_locked(command)
+
+    def _measure_locked(self, command):
+        """
+        Runs one measurement transaction on all sensors. Sensors that fail to acknowledge the command or to
+        complete the conversion in time drop out of the transaction and get their connection reset afterwards.
+        :param command: Temperature or Humidity command.
+        :return: List of BusReading with raw values, in the order of the sensors.
+        """
+        errors = {}
+        for sensor in self.sensors:
+            sensor._command = command
+
+        self._transmission_start()
+        self._send_byte(command)
+        active = self._get_ack(self.sensors, errors)
+
+        for sensor in active:
+            if self.backend.input(sensor.data_pin) == LOW:
+                errors[sensor] = 'SHT1x is not in the proper measurement state: DATA line is LOW.'
+        active = [sensor for sensor in active if sensor not in errors]
+        active = self._wait_for_results(active, errors)
+
+        values = {sensor: msb << 8 for sensor, msb in zip(active, self._get_bytes(active))}
+        self._send_ack(active)
+        for sensor, lsb in zip(active, self._get_bytes(active)):
+            values[sensor] |= lsb
+
+        crc_values = {}
+        if self.crc_check:
+            self._send_ack(active)
+            crc_values = dict(zip(active, self._get_bytes(active)))
+        self._transmission_end(active)
+
+        results = []
+        for sensor in self.sensors:
+            if sensor in errors:
+                self.logger.error('Sensor on data pin {0}: {1}'.format(sensor.data_pin, errors[sensor]))
+                sensor.reset_connection()
+                results.append(BusReading(sensor.data_pin, None, None, None, errors[sensor]))
+                continue
+
+            crc_ok = None
+            if self.crc_check:
+                crc_ok = crc_values[sensor] == sensor._calculate_crc(values[sensor])
+                if not crc_ok:
+                    self.logger.error('CRC error on data pin {0}: value from sensor {1:08b}'
+                                      .format(sensor.data_pin, crc_values[sensor]))
+            results.append(BusReading(sensor.data_pin, values[sensor], None, crc_ok, None))
+        return results
+
+    def _toggle_clock(self, state):
+        self._clock._toggle_pin(self.sck_pin, state)
+
+    def _drive_data(self, sensors, state):
+        for sensor in sensors:
+            sensor._setup_pin(sensor.data_pin, OUT)
+            self.backend.output(sensor.data_pin, state)
+
+    def _transmission_start(self):
+        self._clock._setup_pin(self.sck_pin, OUT)
+        self._drive_data(self.sensors, HIGH)
+        self._toggle_clock(HIGH)
+        self._drive_data(self.sensors, LOW)
+        self._toggle_clock(LOW)
+        self._toggle_clock(HIGH)
+        self._drive_data(self.sensors, HIGH)
+        self._toggle_clock(LOW)
+
+    def _send_byte(self, data):
+        for i in range(8):
+            self._drive_data(self.sensors, data & (1 << 7 - i))
+            self._toggle_clock(HIGH)
+            self._toggle_clock(LOW)
+
+    def _get_ack(self, sensors, errors):
+        for sensor in sensors:
+            sensor._setup_pin(sensor.data_pin, IN, PUD_UP)
+        self._toggle_clock(HIGH)
+        for sensor in sensors:
+            if self.backend.input(sensor.data_pin) == HIGH:
+                errors[sensor] = 'SHT1x failed to properly receive command [{0:08b}]'.format(sensor._command)
+        self._toggle_clock(LOW)
+        return [sensor for sensor in sensors if sensor not in errors]
+
+    def _wait_for_results(self, sensors, errors):
+        """
+        Waits until every sensor has pulled its DATA line low. Backends only wait for the edge of a single pin, so
+        edge detection, when available, is used for the first pending sensor, and the other pending lines are
+        checked whenever it fires or poll_interval has passed.
+        :return: Sensors that completed their measurement.
+        """
+        timeout = max((sensor.conversion_timeout() for sensor in sensors), default=0)
+        deadline = time.monotonic() + timeout
+        poll_interval = min(SHT1x.POLL_INTERVAL, timeout / 10) if timeout else 0
+        use_edge = self._clock.wait_strategy == 'edge'
+
+        for sensor in sensors:
+            sensor._setup_pin(sensor.data_pin, IN, PUD_UP)
+        pending = [sensor for sensor in sensors if self.backend.input(sensor.data_pin) == HIGH]
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait = min(poll_interval, remaining)
+            if use_edge:
+                try:
+                    self.backend.wait_for_edge(pending[0].data_pin, FALLING, timeout=max(int(wait * 1000), 1))
+                except (NotImplementedError, RuntimeError):
+                    use_edge = False
+            if not use_edge:
+                time.sleep(wait)
+            pending = [sensor for sensor in pending if self.backend.input(sensor.data_pin) == HIGH]
+
+        for sensor in pending:
+            errors[sensor] = 'Sensor has not completed measurement after {0:.0f}ms.'.format(timeout * 1000)
+        return [sensor for sensor in sensors if sensor not in errors]
+
+    def _get_bytes(self, sensors):
+        for sensor in sensors:
+            sensor._setup_pin(sensor.data_pin, IN, PUD_UP)
+        data = [0] * len(sensors)
+        for i in range(8):
+            self._toggle_clock(HIGH)
+            for index, sensor in enumerate(sensors):
+                data[index] |= self.backend.input(sensor.data_pin) << (7 - i)
+            self._toggle_clock(LOW)
+        return data
+
+    def _send_ack(self, sensors):
+        self._drive_data(sensors, HIGH)
+        self._drive_data(sensors, LOW)
+        self._toggle_clock(HIGH)
+        self._toggle_clock(LOW)
+
+    def _transmission_end(self, sensors):
+        self._drive_data(sensors, HIGH)
+        self._toggle_clock(HIGH)
+        self._toggle_clock(LOW)
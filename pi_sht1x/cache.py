@@ -0,0 +1,100 @@
+"""
+Cache of the latest raw measurements of a sensor, with single-flight measurement across threads.
+"""
+import threading
+import time
+
+
+class _Flight:
+    """
+    Measurement in progress, waited on by the threads that asked for it while it was running.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class MeasurementCache:
+    """
+    Keeps the latest value of every quantity with the monotonic time its measurement started. A caller giving a
+    max_age is served from the cache when the value is recent enough, joins the measurement of that quantity if
+    another thread started one within max_age, and only takes a measurement itself otherwise. Callers without a
+    max_age always take their own measurement.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._values = {}
+        self._flights = {}
+
+    def get(self, quantity, measure, max_age=None):
+        """
+        Returns a value of the quantity no older than max_age.
+        :param quantity: Key of the quantity.
+        :param measure: Callable taking a new measurement.
+        :param max_age: Maximum age in seconds, at the time of the call, of the value, None always measures.
+        :return: Value.
+        """
+        with self._lock:
+            now = time.monotonic()
+            flight = None
+            if max_age is not None:
+                entry = self._values.get(quantity)
+                if entry is not None and now - entry[1] <= max_age:
+                    self.hits += 1
+                    return entry[0]
+                flight = self._flights.get(quantity)
+                if flight is not None and now - flight.started > max_age:
+                    flight = None
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                flight = self._flights[quantity] = _Flight(now)
+                leader = True
+
+        if not leader:
+            return flight.wait()
+        try:
+            flight.value = measure()
+            with self._lock:
+                entry = self._values.get(quantity)
+                if entry is None or entry[1] <= flight.started:
+                    self._values[quantity] = (flight.value, flight.started)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(quantity) is flight:
+                    del self._flights[quantity]
+            flight.done.set()
+
+    def age(self, quantity):
+        """
+        :return: Seconds since the quantity was last measured, None if it never was.
+        """
+        entry = self._values.get(quantity)
+        return None if entry is None else time.monotonic() - entry[1]
+
+    def clear(self):
+        """
+        Forgets all values, e.g. when a configuration change makes them meaningless.
+        :return: None.
+        """
+        with self._lock:
+            self._values.clear()
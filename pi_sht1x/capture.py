@@ -0,0 +1,256 @@
+"""
+Compact binary capture of raw SHT1x samples. The sampling loop only stores raw counts, CRC bytes, the status
+register and a monotonic timestamp in a fixed-width record buffer, which is flushed to an append-only file:
+
+    with RawCapture(sensor, 'samples.raw') as capture:
+        for i in range(1000):
+            capture.sample()
+
+Conversion is deferred to CaptureReader, which memory-maps capture files and converts the records on demand
+with the functions of pi_sht1x.conversion.
+"""
+import mmap
+import struct
+import time
+from collections import namedtuple
+from itertools import groupby
+
+from . import conversion
+from .exceptions import SHT1xError
+from .sht1x import SHT1x
+
+MAGIC = b'SHT1XRAW'
+VERSION = 1
+# magic, format version, record size, supply voltage
+HEADER = struct.Struct('<8sHHf')
+# monotonic timestamp, raw temperature, raw humidity, temperature CRC, humidity CRC, status register, flags
+RECORD = struct.Struct('<dHHBBBB')
+
+RawSample = namedtuple('RawSample', ['timestamp', 'raw_temperature', 'raw_humidity', 'crc_temperature',
+                                     'crc_humidity', 'status_register', 'flags'])
+
+
+def resolution(status_register):
+    """
+    Resolution a sample was measured at, from bit 0 of the status register stored with it.
+    :param status_register: Status register byte.
+    :return: (temperature bits, humidity bits).
+    """
+    return SHT1x.RESOLUTION['Low'] if status_register & 1 else SHT1x.RESOLUTION['High']
+
+
+class CaptureBuffer:
+    """
+    Preallocated buffer of fixed-width RECORD entries.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._data = bytearray(capacity * RECORD.size)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def full(self):
+        return self._count >= self.capacity
+
+    def append(self, timestamp, raw_temperature, raw_humidity, crc_temperature, crc_humidity, status_register,
+               flags=0):
+        """
+        Appends a record to the buffer.
+        :return: True when the buffer is full after appending.
+        """
+        if self.full:
+            raise SHT1xError('Capture buffer is full.')
+        RECORD.pack_into(self._data, self._count * RECORD.size, timestamp, raw_temperature, raw_humidity,
+                         crc_temperature, crc_humidity, status_register, flags)
+        self._count += 1
+        return self.full
+
+    def view(self):
+        """
+        Memory view of the records in the buffer, valid until the buffer is cleared.
+        """
+        return memoryview(self._data)[:self._count * RECORD.size]
+
+    def clear(self):
+        self._count = 0
+
+
+class CaptureWriter:
+    """
+    Appends buffered records to a capture file. A header is written when the file is created; appending to an
+    existing file requires the same format and supply voltage.
+    """
+
+    def __init__(self, path, vdd=3.5, capacity=1024):
+        self.path = path
+        self.vdd = vdd
+        self.buffer = CaptureBuffer(capacity)
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, vdd))
+        else:
+            record_size, file_vdd = _read_header(path)
+            if record_size != RECORD.size or file_vdd != vdd:
+                self._file.close()
+                raise SHT1xError('Capture file {0} does not match the format or supply voltage ({1}V) of the '
+                                 'capture.'.format(path, file_vdd))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def append(self, *record):
+        """
+        Appends a record, see CaptureBuffer.append. The buffer is written to the file when it is full.
+        """
+        if self.buffer.append(*record):
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered records to the file.
+        :return: None.
+        """
+        if len(self.buffer):
+            self._file.write(self.buffer.view())
+            self.buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class RawCapture:
+    """
+    Captures raw temperature and humidity samples from a sensor into a capture file, without converting them.
+    """
+
+    def __init__(self, sensor, path, capacity=1024):
+        self.sensor = sensor
+        self.writer = CaptureWriter(path, sensor.vdd, capacity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def sample(self):
+        """
+        Reads one raw temperature and humidity sample and appends it to the capture.
+        :return: None.
+        """
+        timestamp = time.monotonic()
+        raw_temperature, crc_temperature = self.sensor.read_raw('Temperature')
+        raw_humidity, crc_humidity = self.sensor.read_raw('Humidity')
+        self.writer.append(timestamp, raw_temperature, raw_humidity, crc_temperature, crc_humidity,
+                           self.sensor._status_register)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+
+class CaptureReader:
+    """
+    Read-only, memory-mapped view of a capture file. Records are only decoded when they are accessed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        record_size, self.vdd = _read_header(path)
+        if record_size != RECORD.size:
+            raise SHT1xError('Unsupported record size {0} in {1}.'.format(record_size, path))
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._records = memoryview(self._mmap)[HEADER.size:]
+        self._count = len(self._records) // RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('Capture record index out of range.')
+        return RawSample(*RECORD.unpack_from(self._records, index * RECORD.size))
+
+    def __iter__(self):
+        for record in RECORD.iter_unpack(self._records[:self._count * RECORD.size]):
+            yield RawSample(*record)
+
+    def columns(self, start=0, stop=None):
+        """
+        Decodes a range of records into columns: NumPy arrays backed by the mapping when NumPy is installed,
+        lists otherwise.
+        :param start: Index of the first record.
+        :param stop: Index after the last record, defaults to the end of the file.
+        :return: Dictionary keyed by the RawSample field names.
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        data = self._records[start * RECORD.size:stop * RECORD.size]
+        if conversion.numpy is not None:
+            numpy = conversion.numpy
+            dtype = numpy.dtype({'names': list(RawSample._fields),
+                                 'formats': ['<f8', '<u2', '<u2', 'u1', 'u1', 'u1', 'u1']})
+            records = numpy.frombuffer(data, dtype=dtype)
+            return {name: records[name] for name in RawSample._fields}
+        columns = {name: [] for name in RawSample._fields}
+        for name, values in zip(RawSample._fields, zip(*RECORD.iter_unpack(data))):
+            columns[name] = list(values)
+        return columns
+
+    def convert(self, chunk_size=65536):
+        """
+        Lazily converts the capture, chunk by chunk. Consecutive records measured at the same resolution are
+        converted together.
+        :param chunk_size: Maximum number of records converted at once.
+        :return: Generator of (timestamps, values) tuples, values being the dictionary returned by
+        pi_sht1x.conversion.convert.
+        """
+        for start in range(0, self._count, chunk_size):
+            columns = self.columns(start, start + chunk_size)
+            offset = 0
+            for bits, run in groupby(columns['status_register'], key=resolution):
+                length = sum(1 for _ in run)
+                end = offset + length
+                yield (columns['timestamp'][offset:end],
+                       conversion.convert(columns['raw_temperature'][offset:end],
+                                          columns['raw_humidity'][offset:end], self.vdd, bits))
+                offset = end
+
+    def close(self):
+        self._records.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # NumPy columns still reference the mapping, it is unmapped once they are garbage collected.
+            pass
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) != HEADER.size or not header.startswith(MAGIC):
+        raise SHT1xError('{0} is not a pi_sht1x capture file.'.format(path))
+    magic, version, record_size, vdd = HEADER.unpack(header)
+    if version != VERSION:
+        raise SHT1xError('Unsupported capture file version {0} in {1}.'.format(version, path))
+    return record_size, vdd
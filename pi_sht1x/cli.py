@@ -0,0 +1,292 @@
+"""
+The pi-sht1x command: reads one or more sensors and writes the readings to stdout as newline-delimited JSON or
+CSV, or benchmarks them.
+
+    pi-sht1x read --sensor greenhouse:18:23
+    pi-sht1x stream --sensor greenhouse:18:23 --sensor shed:24:25 --rate 2 --format csv > readings.csv
+    pi-sht1x bench --sensor greenhouse:18:23 --count 50
+
+Output is buffered and only flushed when no reading is waiting, so a fast stream costs no flush per line while a
+slow one still appears line by line.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+from .backends import BCM, BOARD, BACKENDS
+from .daemon import parse_sensor
+from .exceptions import SHT1xError
+from .logging import create_logger
+from .metrics import SensorMetrics, PHASES
+from .sampler import Sampler
+from .sht1x import SHT1x
+from .sinks import COLUMNS, record
+
+SIMULATED = 'simulated'
+
+
+class Choices(list):
+    def __contains__(self, item):
+        return super(Choices, self).__contains__(item.upper())
+
+
+def create_sensors(args, logger, metrics=False):
+    """
+    Creates the sensors given on the command line.
+    :return: Dictionary of sensor name to SHT1x object.
+    """
+    backend = args.backend
+    if backend == SIMULATED:
+        from .simulator import SimulatedBackend, SimulatedSHT1x
+        backend = SimulatedBackend([SimulatedSHT1x(data_pin, sck_pin, vdd=SHT1x.VDD[args.vdd.upper()])
+                                    for name, data_pin, sck_pin in args.sensor])
+    sensors = {}
+    try:
+        for name, data_pin, sck_pin in args.sensor:
+            sensors[name] = SHT1x(data_pin, sck_pin, gpio_mode=BCM if args.gpio_mode == 'BCM' else BOARD,
+                                  vdd=args.vdd, resolution=args.resolution, heater=args.heater,
+                                  otp_no_reload=args.otp_no_reload, crc_check=args.crc_check, logger=logger,
+                                  backend=backend, metrics=SensorMetrics() if metrics else None)
+    except SHT1xError:
+        close_sensors(sensors)
+        raise
+    return sensors
+
+
+def close_sensors(sensors):
+    for sensor in sensors.values():
+        sensor.__exit__(None, None, None)
+
+
+class Output:
+    """
+    Writes readings to a text stream as newline-delimited JSON objects or CSV rows with a header of COLUMNS.
+    """
+
+    def __init__(self, stream, output_format='json'):
+        self.stream = stream
+        self.format = output_format
+        self._writer = None
+        if output_format == 'csv':
+            self._writer = csv.writer(stream, lineterminator='\n')
+            self._writer.writerow(COLUMNS)
+
+    def write(self, reading, sensor=None):
+        values = record(reading, sensor)
+        if self._writer is not None:
+            self._writer.writerow(values)
+        else:
+            self.stream.write(json.dumps(dict(zip(COLUMNS, values))) + '\n')
+
+    def flush(self):
+        self.stream.flush()
+
+
+def read(sensors, output, attempts=3):
+    """
+    Takes a single reading of every sensor, trying each up to attempts times.
+    :param sensors: Dictionary of sensor name to SHT1x object.
+    :param output: Output the readings are written to.
+    :param attempts: Maximum number of measurements per sensor.
+    :return: List of the names of the sensors that could not be read.
+    """
+    failed = []
+    for name, sensor in sensors.items():
+        for attempt in range(attempts):
+            try:
+                reading = sensor.read()
+            except SHT1xError as e:
+                sensor.logger.warning('Reading %s failed: %s', name, e)
+                continue
+            output.write(reading, name)
+            break
+        else:
+            failed.append(name)
+    output.flush()
+    return failed
+
+
+def stream(sensors, output, rate=1.0, count=None, max_errors=None):
+    """
+    Samples every sensor at the rate on its own Sampler thread and writes the readings as they arrive.
+    :param sensors: Dictionary of sensor name to SHT1x object.
+    :param output: Output the readings are written to.
+    :param rate: Readings per second and sensor.
+    :param count: Measurements per sensor, failed ones included, None streams until interrupted.
+    :param max_errors: Stop sampling a sensor after this many consecutive failed measurements.
+    :return: Dictionary of sensor name to the stats of its sampler.
+    """
+    readings = queue.Queue()
+    samplers = {name: Sampler(sensor, rate, count=count, max_errors=max_errors) for name, sensor in sensors.items()}
+
+    def forward(name, sampler):
+        for reading in sampler:
+            readings.put((name, reading))
+
+    forwarders = [threading.Thread(target=forward, args=(name, sampler), name='SHT1x output', daemon=True)
+                  for name, sampler in samplers.items()]
+    for sampler in samplers.values():
+        sampler.start()
+    for forwarder in forwarders:
+        forwarder.start()
+    try:
+        while True:
+            try:
+                name, reading = readings.get(timeout=0.1)
+            except queue.Empty:
+                if not any(forwarder.is_alive() for forwarder in forwarders):
+                    break
+                continue
+            output.write(reading, name)
+            if readings.empty():
+                output.flush()
+    finally:
+        for sampler in samplers.values():
+            sampler.stop()
+        output.flush()
+    return {name: sampler.stats() for name, sampler in samplers.items()}
+
+
+def bench(sensors, count=20):
+    """
+    Reads every sensor count times as fast as possible.
+    :return: Dictionary of sensor name to its results: readings, errors, readings per second and the mean and
+    number of observations of every phase, see :mod:`pi_sht1x.metrics`.
+    """
+    results = {}
+    for name, sensor in sensors.items():
+        errors = 0
+        # Only count the benchmark transactions, not the Status Register write of the initialization.
+        sensor.metrics.reset()
+        started = time.perf_counter()
+        for i in range(count):
+            try:
+                sensor.read()
+            except SHT1xError:
+                errors += 1
+        elapsed = time.perf_counter() - started
+        phases = sensor.metrics.snapshot()['phases']
+        results[name] = {'readings': count - errors, 'errors': errors,
+                         'samples_per_second': (count - errors) / elapsed,
+                         'phases': {phase: {'count': phases[phase]['count'],
+                                            'mean_ms': phases[phase]['sum'] / phases[phase]['count'] * 1000
+                                            if phases[phase]['count'] else None}
+                                    for phase in PHASES}}
+    return results
+
+
+def print_bench(results, stream):
+    for name, result in results.items():
+        stream.write('{0}: {1} readings, {2} errors, {3:.2f} samples/s\n'.format(
+            name, result['readings'], result['errors'], result['samples_per_second']))
+        for phase, values in result['phases'].items():
+            if values['count']:
+                stream.write('  {0:<12} {1:>6} x {2:9.3f} ms\n'.format(phase, values['count'], values['mean_ms']))
+
+
+def main(argv=None):
+    vdd_choices = Choices(['5V', '4V', '3.5V', '3V', '2.5V'])
+    resolution_choices = Choices(['HIGH', 'LOW'])
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-s', '--sensor', type=parse_sensor, action='append', required=True,
+                        help='Sensor as name:data_pin:sck_pin, can be repeated.')
+    common.add_argument('-g', '--gpio-mode', choices=['BCM', 'BOARD'], default='BCM',
+                        help='GPIO pin numbering, either BOARD or BCM. Defaults to BCM.')
+    common.add_argument('-v', '--vdd', choices=vdd_choices, default='3.5V',
+                        help='Voltage used to power the sensors. Defaults to 3.5V.')
+    common.add_argument('-r', '--resolution', choices=resolution_choices, default='HIGH',
+                        help='Resolution used by the sensors, 14/12-bit or 12-8-bit. Defaults to High.')
+    common.add_argument('-e', '--heater', action='store_true',
+                        help='Used to turn the internal heater on (used for calibration).')
+    common.add_argument('-o', '--otp-no-reload', action='store_true',
+                        help='Used to enable OTP no reload, will save about 10ms per measurement.')
+    common.add_argument('-c', '--no-crc-check', dest='crc_check', action='store_false',
+                        help='Disables CRC checking.')
+    common.add_argument('-b', '--backend', choices=sorted(BACKENDS) + [SIMULATED], default=None,
+                        help='GPIO backend, defaults to RPi.GPIO. simulated runs against simulated sensors.')
+    common.add_argument('-d', '--debug', action='store_true', help='Enable debug logging.')
+    common.add_argument('-l', '--log-file', default=None,
+                        help='Also write the log to this rotating file, e.g. pi_sht1x.log.')
+
+    parser = argparse.ArgumentParser(prog='pi-sht1x', description='Reads the temperature and relative humidity '
+                                                                  'from the SHT1x series of sensors.')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+    for command, description in (('read', 'Takes a single reading of every sensor.'),
+                                 ('stream', 'Reads the sensors at a fixed rate.')):
+        subparser = commands.add_parser(command, parents=[common], help=description, description=description)
+        subparser.add_argument('-f', '--format', choices=['json', 'csv'], default='json',
+                               help='Output format, newline-delimited JSON or CSV. Defaults to json.')
+        if command == 'read':
+            subparser.add_argument('-a', '--attempts', type=int, default=3,
+                                   help='Measurements tried per sensor before giving up. Defaults to 3.')
+        else:
+            subparser.add_argument('--rate', type=float, default=1.0,
+                                   help='Readings per second and sensor. Defaults to 1.')
+            subparser.add_argument('-n', '--count', type=int, default=None,
+                                   help='Number of measurements per sensor, failed ones included. Streams until '
+                                        'interrupted by default.')
+            subparser.add_argument('-m', '--max-errors', type=int, default=None,
+                                   help='Stop reading a sensor after this many consecutive failed measurements.')
+    subparser = commands.add_parser('bench', parents=[common], help='Measures samples per second and the latency '
+                                                                    'of every phase of a transaction.')
+    subparser.add_argument('-n', '--count', type=int, default=20, help='Readings per sensor. Defaults to 20.')
+    subparser.add_argument('-f', '--format', choices=['text', 'json'], default='text',
+                           help='Output format. Defaults to text.')
+    args = parser.parse_args(argv)
+
+    level = logging.DEBUG if args.debug else logging.WARNING
+    if args.log_file is not None:
+        logger = create_logger('pi_sht1x.cli', log_file=args.log_file, level=level)
+    else:
+        logger = logging.getLogger('pi_sht1x.cli')
+        logger.setLevel(level)
+    if not any(type(handler) is logging.StreamHandler for handler in logger.handlers):
+        logger.addHandler(logging.StreamHandler(sys.stderr))
+
+    try:
+        sensors = create_sensors(args, logger, metrics=args.command == 'bench')
+    except SHT1xError as e:
+        logger.error('Could not initialize the sensors: %s', e)
+        return 1
+
+    try:
+        if args.command == 'bench':
+            results = bench(sensors, args.count)
+            if args.format == 'json':
+                sys.stdout.write(json.dumps(results) + '\n')
+            else:
+                print_bench(results, sys.stdout)
+            return 1 if any(result['errors'] for result in results.values()) else 0
+
+        output = Output(sys.stdout, args.format)
+        if args.command == 'read':
+            failed = read(sensors, output, args.attempts)
+            if failed:
+                logger.error('Could not read %s after %s attempts.', ', '.join(failed), args.attempts)
+            return 1 if failed else 0
+
+        stats = stream(sensors, output, args.rate, args.count, args.max_errors)
+        errors = sum(sampler_stats['errors'] for sampler_stats in stats.values())
+        if errors:
+            logger.warning('%s readings failed.', errors)
+        return 1 if errors else 0
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # The reader went away, e.g. piped into head. Point stdout at /dev/null so the flush at exit doesn't fail.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        close_sensors(sensors)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Client for the sensor daemon (:mod:`pi_sht1x.daemon`), with the measurement API of :class:`pi_sht1x.SHT1x`:
+
+    with SHT1xClient(sensor='greenhouse') as sensor:
+        temperature = sensor.read_temperature()
+        humidity = sensor.read_humidity(temperature)
+        sensor.calculate_dew_point(temperature, humidity)
+        print(sensor)
+"""
+import json
+import socket
+
+from . import conversion
+from . import exceptions
+from .exceptions import SHT1xError
+
+DEFAULT_SOCKET = '/run/pi-sht1x.sock'
+
+
+class SHT1xClient:
+    """
+    Reads a sensor through the daemon. The last values are kept in the same attributes as on SHT1x.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, sensor=None, timeout=5.0):
+        """
+        :param path: Path of the daemon socket.
+        :param sensor: Name of the sensor, None uses the daemon's first sensor.
+        :param timeout: Socket timeout in seconds.
+        """
+        self.path = path
+        self.sensor = sensor
+        self.timeout = timeout
+        self.temperature_celsius = None
+        self.temperature_fahrenheit = None
+        self.humidity = None
+        self.dew_point = None
+        self._socket = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read_temperature(self):
+        """
+        Reads the temperature, see SHT1x.read_temperature.
+        :return: Temperature in celsius.
+        """
+        result = self._request('read_temperature')
+        self.temperature_celsius = result['celsius']
+        self.temperature_fahrenheit = result['fahrenheit']
+        return self.temperature_celsius
+
+    def read_humidity(self, temperature=None):
+        """
+        Reads the temperature compensated humidity, see SHT1x.read_humidity.
+        :param temperature: Optional, temperature in celsius used for compensation. Defaults to the last
+        temperature read by this client, the sensor's own temperature is read when there is none.
+        :return: Relative humidity.
+        """
+        if temperature is None:
+            if self.temperature_celsius is None:
+                self.read_temperature()
+            temperature = self.temperature_celsius
+        self.humidity = self._request('read_humidity', temperature=temperature)
+        return self.humidity
+
+    def calculate_dew_point(self, temperature=None, humidity=None):
+        """
+        Calculates the dew point, reading the temperature and humidity if they are not given.
+        :param temperature: Temperature in degrees celsius.
+        :param humidity: Humidity.
+        :return: Dew point in celsius.
+        """
+        if temperature is None:
+            if self.temperature_celsius is None:
+                self.read_temperature()
+            temperature = self.temperature_celsius
+
+        if humidity is None:
+            if self.humidity is None:
+                self.read_humidity(temperature)
+            humidity = self.humidity
+
+        self.dew_point = conversion.dew_point(temperature, humidity)
+        return self.dew_point
+
+    def read_all(self):
+        """
+        Takes a fresh temperature and humidity measurement and calculates the dew point, in a single request.
+        :return: Tuple of temperature (celsius), relative humidity and dew point.
+        """
+        result = self._request('read_all')
+        self.temperature_celsius = result['celsius']
+        self.temperature_fahrenheit = result['fahrenheit']
+        self.humidity = result['humidity']
+        self.dew_point = result['dew_point']
+        return self.temperature_celsius, self.humidity, self.dew_point
+
+    def close(self):
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = self._file = None
+
+    def _request(self, method, **kwargs):
+        """
+        Sends a request to the daemon, reconnecting once if the connection was closed. After any other socket
+        error, a timeout included, the connection is closed and the next request opens a new one.
+        :return: Result of the request.
+        """
+        message = json.dumps({'sensor': self.sensor, 'method': method, 'args': kwargs}).encode('utf-8') + b'\n'
+        for attempt in range(2):
+            try:
+                if self._socket is None:
+                    self._connect()
+                self._socket.sendall(message)
+                line = self._file.readline()
+                if line:
+                    break
+            except ConnectionError:
+                pass
+            except OSError as e:
+                self.close()
+                raise SHT1xError('Request to the sensor daemon at {0} failed: {1}'.format(self.path, e))
+            self.close()
+        else:
+            raise SHT1xError('The daemon at {0} closed the connection.'.format(self.path))
+
+        response = json.loads(line.decode('utf-8'))
+        if 'error' in response:
+            # Re-raise SHT1xError subclasses as their own type, everything else as SHT1xError.
+            error = getattr(exceptions, response.get('type', ''), SHT1xError)
+            if not (isinstance(error, type) and issubclass(error, SHT1xError)):
+                error = SHT1xError
+            raise error(response['error'])
+        return response['result']
+
+    def _connect(self):
+        try:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            self._socket.connect(self.path)
+        except OSError as e:
+            self._socket = None
+            raise SHT1xError('Could not connect to the sensor daemon at {0}: {1}'.format(self.path, e))
+        self._file = self._socket.makefile('rb')
+
+    def __str__(self):
+        celsius = self.temperature_celsius if self.temperature_celsius is not None else '-'
+        fahrenheit = self.temperature_fahrenheit if self.temperature_fahrenheit is not None else '-'
+        humidity = self.humidity if self.humidity is not None else '-'
+        dew_point = self.dew_point if self.dew_point is not None else '-'
+
+        return 'Temperature: {0}°C [{1}°F]\nRelative Humidity: {2}%\nDew Point: {3}°C\n'.format(celsius, fahrenheit,
+                                                                                                humidity, dew_point)
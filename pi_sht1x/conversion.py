@@ -0,0 +1,214 @@
+"""
+Conversion of raw SHT1x counts into physical values. Every function accepts a single count or a sequence of
+counts: sequences are converted with NumPy when it is installed, and returned as NumPy arrays, otherwise they are
+converted in pure Python and returned as lists. Both give exactly the same values as the scalar path used by
+:class:`pi_sht1x.SHT1x`, including the rounding to two decimals.
+"""
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+RESOLUTION_HIGH = (14, 12)
+
+
+class COF():
+    D1_VDD_C = {5: -40.1, 4: -39.8, 3.5: -39.7, 3: -39.6, 2.5: -39.4}
+    D1_VDD_F = {5: -40.2, 4: -39.6, 3.5: -39.5, 3: -39.3, 2.5: -38.9}
+    D2_SO_C = {14: 0.01, 12: 0.04}
+    D2_SO_F = {14: 0.018, 12: 0.072}
+    C1_SO = {12: -2.0468, 8: -2.0468}
+    C2_SO = {12: 0.0367, 8: 0.5872}
+    C3_SO = {12: -0.0000015955, 8: -0.00040845}
+    T1_SO = {12: 0.01, 8: 0.01}
+    T2_SO = {12: 0.00008, 8: 0.00128}
+    # Magnus formula constants (tn, m) above and below 0°C.
+    MAGNUS_WATER = (243.12, 17.62)
+    MAGNUS_ICE = (272.62, 22.46)
+
+
+def celsius(raw_temperature, vdd=3.5, resolution=RESOLUTION_HIGH, decimals=2):
+    """
+    Converts raw temperature counts into degrees celsius.
+    :param raw_temperature: Raw count or sequence of raw counts.
+    :param vdd: Supply voltage of the sensor, one of the values of SHT1x.VDD.
+    :param resolution: Resolution the counts were measured at, [temperature bits, humidity bits].
+    :param decimals: Number of decimals to round to, None disables rounding.
+    :return: Temperature, or temperatures, in celsius.
+    """
+    return _linear(raw_temperature, COF.D2_SO_C[resolution[0]], COF.D1_VDD_C[vdd], decimals)
+
+
+def fahrenheit(raw_temperature, vdd=3.5, resolution=RESOLUTION_HIGH, decimals=2):
+    """
+    Converts raw temperature counts into degrees fahrenheit, see celsius for the parameters.
+    :return: Temperature, or temperatures, in fahrenheit.
+    """
+    return _linear(raw_temperature, COF.D2_SO_F[resolution[0]], COF.D1_VDD_F[vdd], decimals)
+
+
+def humidity(raw_humidity, temperature, resolution=RESOLUTION_HIGH, decimals=2):
+    """
+    Converts raw humidity counts into temperature compensated relative humidity.
+    :param raw_humidity: Raw count or sequence of raw counts.
+    :param temperature: Temperature in celsius used for compensation, a single value or one per count.
+    :param resolution: Resolution the counts were measured at, [temperature bits, humidity bits].
+    :param decimals: Number of decimals to round to, None disables rounding.
+    :return: Relative humidity, or humidities.
+    """
+    bits = resolution[1]
+    c1, c2, c3 = COF.C1_SO[bits], COF.C2_SO[bits], COF.C3_SO[bits]
+    t1, t2 = COF.T1_SO[bits], COF.T2_SO[bits]
+
+    def compensate(raw, temp):
+        linear_humidity = c1 + (c2 * raw) + (c3 * raw ** 2)
+        return (temp - 25) * (t1 + t2 * raw) + linear_humidity
+
+    if _is_scalar(raw_humidity):
+        return _round(compensate(raw_humidity, temperature), decimals)
+    if numpy is not None:
+        raw = numpy.asarray(raw_humidity, dtype=numpy.int64)
+        return _round_array(compensate(raw, numpy.asarray(temperature, dtype=float)), decimals)
+    temperatures = [temperature] * len(raw_humidity) if _is_scalar(temperature) else temperature
+    return [_round(compensate(raw, temp), decimals) for raw, temp in zip(raw_humidity, temperatures)]
+
+
+def dew_point(temperature, relative_humidity, decimals=2):
+    """
+    Calculates the dew point using the Magnus formula, with the constants for ice below 0°C.
+    :param temperature: Temperature, or temperatures, in celsius.
+    :param relative_humidity: Relative humidity, or humidities.
+    :param decimals: Number of decimals to round to, None disables rounding.
+    :return: Dew point, or dew points, in celsius.
+    """
+    def magnus(temp, log_humidity, tn, m):
+        ew = (m * temp) / (tn + temp)
+        return tn * ((log_humidity + ew) / (m - log_humidity - ew))
+
+    if _is_scalar(temperature) and _is_scalar(relative_humidity):
+        tn, m = COF.MAGNUS_ICE if temperature <= 0 else COF.MAGNUS_WATER
+        return _round(magnus(temperature, math.log(relative_humidity / 100.0), tn, m), decimals)
+
+    if numpy is not None:
+        temp, rh = numpy.broadcast_arrays(numpy.asarray(temperature, dtype=float),
+                                          numpy.asarray(relative_humidity, dtype=float))
+        ice = temp <= 0
+        tn = numpy.where(ice, COF.MAGNUS_ICE[0], COF.MAGNUS_WATER[0])
+        m = numpy.where(ice, COF.MAGNUS_ICE[1], COF.MAGNUS_WATER[1])
+        # math.log keeps the results bit-identical to the scalar path, numpy.log may differ in the last place.
+        log_humidity = numpy.fromiter(map(math.log, (rh / 100.0).ravel().tolist()), dtype=float,
+                                      count=rh.size).reshape(rh.shape)
+        return _round_array(magnus(temp, log_humidity, tn, m), decimals)
+
+    count = len(relative_humidity) if _is_scalar(temperature) else len(temperature)
+    temperatures = [temperature] * count if _is_scalar(temperature) else temperature
+    humidities = [relative_humidity] * count if _is_scalar(relative_humidity) else relative_humidity
+    return [dew_point(temp, rh, decimals) for temp, rh in zip(temperatures, humidities)]
+
+
+def convert(raw_temperature, raw_humidity, vdd=3.5, resolution=RESOLUTION_HIGH):
+    """
+    Converts matching sequences of raw temperature and humidity counts into all values provided by SHT1x. As in
+    SHT1x.read_humidity, humidity is compensated with the rounded celsius temperature.
+    :param raw_temperature: Sequence of raw temperature counts.
+    :param raw_humidity: Sequence of raw humidity counts, measured right after the temperatures.
+    :param vdd: Supply voltage of the sensor, one of the values of SHT1x.VDD.
+    :param resolution: Resolution the counts were measured at, [temperature bits, humidity bits].
+    :return: Dictionary of celsius, fahrenheit, humidity and dew_point arrays (lists without NumPy).
+    """
+    temperature = celsius(raw_temperature, vdd, resolution)
+    relative_humidity = humidity(raw_humidity, temperature, resolution)
+    return {'celsius': temperature,
+            'fahrenheit': fahrenheit(raw_temperature, vdd, resolution),
+            'humidity': relative_humidity,
+            'dew_point': dew_point(temperature, relative_humidity)}
+
+
+class ConversionTable:
+    """
+    Precomputed conversion for one supply voltage and resolution. The sensor only produces 14, 12 or 8-bit counts,
+    so every temperature, and the linear part and compensation slope of every humidity count, is tabulated once;
+    temperature compensation of humidity is then a single multiply-add. Results are identical to the functions
+    above. Use get_table to share tables between sensors.
+    """
+
+    def __init__(self, vdd=3.5, resolution=RESOLUTION_HIGH):
+        self.vdd = vdd
+        self.resolution = tuple(resolution)
+        temperature_bits, humidity_bits = self.resolution
+        temperature_counts = range(1 << temperature_bits)
+        humidity_counts = range(1 << humidity_bits)
+        c1, c2, c3 = COF.C1_SO[humidity_bits], COF.C2_SO[humidity_bits], COF.C3_SO[humidity_bits]
+        t1, t2 = COF.T1_SO[humidity_bits], COF.T2_SO[humidity_bits]
+
+        self._celsius = [celsius(raw, vdd, resolution) for raw in temperature_counts]
+        self._fahrenheit = [fahrenheit(raw, vdd, resolution) for raw in temperature_counts]
+        self._linear_humidity = [c1 + (c2 * raw) + (c3 * raw ** 2) for raw in humidity_counts]
+        self._humidity_slope = [t1 + t2 * raw for raw in humidity_counts]
+
+    def celsius(self, raw_temperature):
+        try:
+            return self._celsius[raw_temperature]
+        except IndexError:
+            return celsius(raw_temperature, self.vdd, self.resolution)
+
+    def fahrenheit(self, raw_temperature):
+        try:
+            return self._fahrenheit[raw_temperature]
+        except IndexError:
+            return fahrenheit(raw_temperature, self.vdd, self.resolution)
+
+    def humidity(self, raw_humidity, temperature):
+        try:
+            return round((temperature - 25) * self._humidity_slope[raw_humidity] +
+                         self._linear_humidity[raw_humidity], 2)
+        except IndexError:
+            return humidity(raw_humidity, temperature, self.resolution)
+
+
+_tables = {}
+
+
+def get_table(vdd=3.5, resolution=RESOLUTION_HIGH):
+    """
+    Returns the ConversionTable for the given supply voltage and resolution, building it on first use.
+    """
+    key = (vdd, tuple(resolution))
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = ConversionTable(vdd, resolution)
+    return table
+
+
+def _linear(raw, slope, offset, decimals):
+    if _is_scalar(raw):
+        return _round(raw * slope + offset, decimals)
+    if numpy is not None:
+        return _round_array(numpy.asarray(raw, dtype=numpy.int64) * slope + offset, decimals)
+    return [_round(value * slope + offset, decimals) for value in raw]
+
+
+def _is_scalar(value):
+    return not hasattr(value, '__len__') or (numpy is not None and numpy.ndim(value) == 0)
+
+
+def _round(value, decimals):
+    return value if decimals is None else round(float(value), decimals)
+
+
+def _round_array(values, decimals):
+    """
+    Rounds an array the way the built-in round does. numpy.round scales, rounds and unscales, which can pick the
+    other neighbour when the scaled value lies within floating point error of a rounding boundary, those few
+    values are rounded with the built-in round instead.
+    """
+    if decimals is None:
+        return values
+    rounded = numpy.round(values, decimals)
+    scaled = values * 10.0 ** decimals
+    boundary = numpy.flatnonzero(numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6)
+    for index in boundary:
+        rounded.flat[index] = round(float(values.flat[index]), decimals)
+    return rounded
@@ -0,0 +1,114 @@
+"""
+CRC-8 checking of SHT1x transmissions. Besides the lookup tables used by SHT1x to check every transmission as it
+is received, CRCValidator checks raw samples in batches, away from the thread talking to the sensor.
+"""
+from .exceptions import SHT1xError
+
+
+class CRC():
+    LOOK_UP = [0, 49, 98, 83, 196, 245, 166, 151, 185, 136, 219, 234, 125, 76, 31, 46, 67, 114, 33, 16, 135,
+               182, 229, 212, 250, 203, 152, 169, 62, 15, 92, 109, 134, 183, 228, 213, 66, 115, 32, 17, 63,
+               14, 93, 108, 251, 202, 153, 168, 197, 244, 167, 150, 1, 48, 99, 82, 124, 77, 30, 47, 184, 137,
+               218, 235, 61, 12, 95, 110, 249, 200, 155, 170, 132, 181, 230, 215, 64, 113, 34, 19, 126, 79,
+               28, 45, 186, 139, 216, 233, 199, 246, 165, 148, 3, 50, 97, 80, 187, 138, 217, 232, 127, 78, 29,
+               44, 2, 51, 96, 81, 198, 247, 164, 149, 248, 201, 154, 171, 60, 13, 94, 111, 65, 112, 35, 18,
+               133, 180, 231, 214, 122, 75, 24, 41, 190, 143, 220, 237, 195, 242, 161, 144, 7, 54, 101, 84,
+               57, 8, 91, 106, 253, 204, 159, 174, 128, 177, 226, 211, 68, 117, 38, 23, 252, 205, 158, 175,
+               56, 9, 90, 107, 69, 116, 39, 22, 129, 176, 227, 210, 191, 142, 221, 236, 123, 74, 25, 40, 6,
+               55, 100, 85, 194, 243, 160, 145, 71, 118, 37, 20, 131, 178, 225, 208, 254, 207, 156, 173, 58,
+               11, 88, 105, 4, 53, 102, 87, 192, 241, 162, 147, 189, 140, 223, 238, 121, 72, 27, 42, 193, 240,
+               163, 146, 5, 52, 103, 86, 120, 73, 26, 43, 188, 141, 222, 239, 130, 179, 224, 209, 70, 119, 36,
+               21, 59, 10, 89, 104, 255, 206, 157, 172]
+
+    # Bit-reversed value of every byte.
+    REVERSED = [int('{0:08b}'.format(byte)[::-1], 2) for byte in range(256)]
+    # CRC start value for every status register: its low nibble, bit-reversed into the high nibble.
+    START = [(reversed_byte >> 4) << 4 for reversed_byte in REVERSED]
+
+    @classmethod
+    def calculate(cls, status_register, command, data, measurement=True):
+        """
+        Calculates the CRC byte the sensor sends after a transmission.
+        :param status_register: Status register of the sensor when it sent the data.
+        :param command: Command the data answers.
+        :param data: 16-bit measurement, or the status register byte.
+        :param measurement: Indicates if the data is a measurement or the status register.
+        :return: CRC byte, bit reversed to match the byte sent by the sensor.
+        """
+        look_up = cls.LOOK_UP
+        crc = look_up[cls.START[status_register] ^ command]
+        if measurement:
+            crc = look_up[look_up[crc ^ (data >> 8)] ^ (data & 0xff)]
+        else:
+            crc = look_up[crc ^ data]
+        return cls.REVERSED[crc]
+
+
+# Bits of the flags byte of a raw sample.
+FLAG_TEMPERATURE_CRC = 0b00000001
+FLAG_HUMIDITY_CRC = 0b00000010
+FLAG_CRC = FLAG_TEMPERATURE_CRC | FLAG_HUMIDITY_CRC
+
+
+class CRCValidator:
+    """
+    Checks the CRC bytes of raw samples (pi_sht1x.capture.RawSample, or anything with the same fields) in
+    batches. The policy decides what happens to samples that fail the check:
+        flag: the sample is kept, with FLAG_TEMPERATURE_CRC and/or FLAG_HUMIDITY_CRC set in its flags.
+        drop: the sample is discarded.
+        retry: the sample is discarded and should be measured again, up to retries times before it is dropped.
+
+        validator = CRCValidator('drop')
+        with CaptureReader('samples.raw') as reader:
+            good, bad = validator.check(reader)
+    """
+    POLICIES = ('flag', 'drop', 'retry')
+    # SHT1x.Commands['Temperature'] and SHT1x.Commands['Humidity'].
+    TEMPERATURE = 0b00000011
+    HUMIDITY = 0b00000101
+
+    def __init__(self, policy='flag', retries=1):
+        """
+        :param policy: 'flag', 'drop' or 'retry'.
+        :param retries: Number of times a sample is measured again under the retry policy.
+        """
+        if policy not in self.POLICIES:
+            raise SHT1xError('Unknown CRC policy: {0}'.format(policy))
+        self.policy = policy
+        self.retries = retries
+        self.checked = 0
+        self.failed = 0
+
+    def flags(self, sample):
+        """
+        Checks both CRC bytes of a sample.
+        :return: CRC flag bits of the values that failed, 0 when both are valid.
+        """
+        calculate = CRC.calculate
+        status_register = sample.status_register
+        flags = 0
+        if calculate(status_register, self.TEMPERATURE, sample.raw_temperature) != sample.crc_temperature:
+            flags |= FLAG_TEMPERATURE_CRC
+        if calculate(status_register, self.HUMIDITY, sample.raw_humidity) != sample.crc_humidity:
+            flags |= FLAG_HUMIDITY_CRC
+        return flags
+
+    def check(self, samples):
+        """
+        Checks a batch of samples and applies the policy.
+        :param samples: Iterable of raw samples.
+        :return: Tuple of the list of samples to keep, flagged ones included under the flag policy, and the list
+        of samples that failed the check.
+        """
+        kept, failed = [], []
+        for sample in samples:
+            self.checked += 1
+            flags = self.flags(sample)
+            if not flags:
+                kept.append(sample)
+                continue
+            self.failed += 1
+            failed.append(sample)
+            if self.policy == 'flag':
+                kept.append(sample._replace(flags=sample.flags | flags))
+        return kept, failed
@@ -0,0 +1,218 @@
+"""
+Sensor daemon: a single process owns the sensors and serves their readings to any number of local clients over
+a Unix domain socket, see :mod:`pi_sht1x.client`. Requests for the same value that arrive while a measurement of
+it is running share that measurement instead of queueing up their own.
+
+    pi-sht1x-daemon --sensor greenhouse:18:23 --sensor shed:24:25 --gpio-mode BCM
+
+The protocol is newline-delimited JSON. A request names the sensor, the method and its keyword arguments:
+
+    {"sensor": "greenhouse", "method": "read_humidity", "args": {}}
+
+and is answered with {"result": ...}, or {"error": message, "type": exception class name}.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+
+from .aio import AsyncSHT1x
+from .backends import BCM, BOARD
+from .exceptions import SHT1xError
+from .logging import create_logger, LOG_FILE_NAME
+
+DEFAULT_SOCKET = '/run/pi-sht1x.sock'
+
+
+class SensorDaemon:
+    """
+    Serves the readings of one or more sensors on a Unix domain socket.
+    """
+    METHODS = ('read_temperature', 'read_humidity', 'calculate_dew_point', 'read_all')
+
+    def __init__(self, sensors, path=DEFAULT_SOCKET, mode=0o660):
+        """
+        :param sensors: Dictionary of sensor name to SHT1x or AsyncSHT1x object. The first sensor is used when a
+        request doesn't name one.
+        :param path: Path of the Unix domain socket.
+        :param mode: Permissions of the socket file.
+        """
+        if not sensors:
+            raise SHT1xError('The daemon needs at least one sensor.')
+        self.sensors = {name: sensor if isinstance(sensor, AsyncSHT1x) else AsyncSHT1x.from_sensor(sensor)
+                        for name, sensor in sensors.items()}
+        self.default_sensor = next(iter(self.sensors))
+        self.path = path
+        self.mode = mode
+        self.requests = 0
+        self.measurements = 0
+        self.coalesced = 0
+        self._inflight = {}
+        self._server = None
+
+    async def start(self):
+        """
+        Starts listening on the socket, replacing a stale socket file left by a previous run.
+        :return: None.
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_client, path=self.path)
+        os.chmod(self.path, self.mode)
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops serving, removes the socket file and releases the pins of the sensors.
+        :return: None.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        for sensor in self.sensors.values():
+            await sensor.__aexit__(None, None, None)
+
+    async def request(self, method, sensor=None, **kwargs):
+        """
+        Runs a request. The temperature and humidity measurements it needs are shared with other requests that
+        are waiting for the same measurement of the same sensor.
+        :param method: One of METHODS.
+        :param sensor: Name of the sensor, defaults to the first one.
+        :param kwargs: Keyword arguments of the method.
+        :return: JSON serializable result.
+        """
+        self.requests += 1
+        name = self.default_sensor if sensor is None else sensor
+        if name not in self.sensors:
+            raise SHT1xError('Unknown sensor: {0}'.format(name))
+        if method not in self.METHODS:
+            raise SHT1xError('Unknown method: {0}'.format(method))
+        return await getattr(self, '_' + method)(name, **kwargs)
+
+    async def _read_temperature(self, name):
+        sensor = self.sensors[name].sensor
+        celsius = sensor._convert_temperature(await self._measure(name, 'Temperature'))
+        return {'celsius': celsius, 'fahrenheit': sensor.temperature_fahrenheit}
+
+    async def _read_humidity(self, name, temperature=None):
+        if temperature is None:
+            temperature = (await self._read_temperature(name))['celsius']
+        return self.sensors[name].sensor._convert_humidity(await self._measure(name, 'Humidity'), temperature)
+
+    async def _calculate_dew_point(self, name, temperature=None, humidity=None):
+        if temperature is None:
+            temperature = (await self._read_temperature(name))['celsius']
+        if humidity is None:
+            humidity = await self._read_humidity(name, temperature)
+        return self.sensors[name].sensor.calculate_dew_point(temperature, humidity)
+
+    async def _read_all(self, name):
+        reading = await self._read_temperature(name)
+        reading['humidity'] = await self._read_humidity(name, reading['celsius'])
+        reading['dew_point'] = await self._calculate_dew_point(name, reading['celsius'], reading['humidity'])
+        return reading
+
+    async def _measure(self, name, measurement):
+        """
+        Takes a raw measurement, or joins the identical measurement that is already running.
+        :param name: Name of the sensor.
+        :param measurement: 'Temperature' or 'Humidity'.
+        :return: Raw 16-bit measurement value.
+        """
+        key = (name, measurement)
+        task = self._inflight.get(key)
+        if task is None:
+            self.measurements += 1
+            task = self._inflight[key] = asyncio.ensure_future(self._measure_raw(self.sensors[name], measurement))
+            task.add_done_callback(lambda done: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _measure_raw(sensor, measurement):
+        async with sensor._lock:
+            return await sensor._measure(sensor.Commands[measurement])
+
+    async def _serve_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line.decode('utf-8'))
+                    result = await self.request(message['method'], message.get('sensor'),
+                                                **message.get('args', {}))
+                    response = {'result': result}
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Malformed requests and bad arguments (a zero or huge humidity, say) are answered with the
+                    # error, the connection stays open for the next request.
+                    response = {'error': str(e), 'type': type(e).__name__}
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def parse_sensor(value):
+    """
+    Parses a --sensor argument of the form name:data_pin:sck_pin.
+    """
+    try:
+        name, data_pin, sck_pin = value.split(':')
+        return name, int(data_pin), int(sck_pin)
+    except ValueError:
+        raise argparse.ArgumentTypeError('Expected name:data_pin:sck_pin, got {0}'.format(value))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Owns SHT1x sensors and serves their readings to local clients '
+                                                 'over a Unix domain socket.')
+    parser.add_argument('-s', '--sensor', type=parse_sensor, action='append', required=True,
+                        help='Sensor as name:data_pin:sck_pin, can be repeated.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Path of the socket, defaults to {0}.'
+                        .format(DEFAULT_SOCKET))
+    parser.add_argument('--mode', type=lambda value: int(value, 8), default=0o660,
+                        help='Permissions of the socket file, in octal. Defaults to 660.')
+    parser.add_argument('-g', '--gpio-mode', choices=['BCM', 'BOARD'], default='BCM',
+                        help='GPIO pin numbering, defaults to BCM.')
+    parser.add_argument('-v', '--vdd', default='3.5V', help='Voltage used to power the sensors. Defaults to 3.5V.')
+    parser.add_argument('-r', '--resolution', default='High', help='Resolution, High or Low. Defaults to High.')
+    parser.add_argument('-b', '--backend', default=None, help='GPIO backend, RPi.GPIO or gpiomem.')
+    parser.add_argument('-l', '--log-file', default=LOG_FILE_NAME,
+                        help='Rotating log file of sensor errors, defaults to {0}.'.format(LOG_FILE_NAME))
+    args = parser.parse_args(argv)
+    logger = create_logger('pi_sht1x.daemon', log_file=args.log_file, queued=True)
+
+    async def run():
+        sensors = {name: AsyncSHT1x(data_pin, sck_pin, gpio_mode=BCM if args.gpio_mode == 'BCM' else BOARD,
+                                    vdd=args.vdd, resolution=args.resolution, backend=args.backend, logger=logger)
+                   for name, data_pin, sck_pin in args.sensor}
+        daemon = SensorDaemon(sensors, args.socket, args.mode)
+        await daemon.start()
+        loop = asyncio.get_running_loop()
+        stopped = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: stopped.done() or stopped.set_result(None))
+        await stopped
+        await daemon.close()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
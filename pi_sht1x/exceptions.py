@@ -0,0 +1,35 @@
+"""
+Exceptions raised by the pi_sht1x package.
+"""
+
+
+class SHT1xError(Exception):
+    pass
+
+
+class SHT1xAckError(SHT1xError):
+    """
+    The sensor did not acknowledge a command.
+    """
+    pass
+
+
+class SHT1xStateError(SHT1xError):
+    """
+    The sensor was not in the expected state, e.g. DATA was low right after a measurement command.
+    """
+    pass
+
+
+class SHT1xTimeoutError(SHT1xError):
+    """
+    The sensor did not signal the end of a measurement in time.
+    """
+    pass
+
+
+class SHT1xCRCError(SHT1xError):
+    """
+    The CRC byte sent by the sensor did not match the data.
+    """
+    pass
@@ -1,27 +1,67 @@
-from os import path
-from logging import getLogger, Formatter, WARNING
-from logging.handlers import RotatingFileHandler
+import atexit
+from queue import SimpleQueue
+from logging import getLogger, Formatter, NullHandler, WARNING
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 
 LOG_FORMAT = '[%(asctime)s] %(module)12s:%(funcName)12s:%(lineno)-4s %(levelname)-9s %(message)s'
 LOG_FILE_NAME = 'pi_sht1x.log'
 
+_listeners = {}
 
-def create_logger(name):
+
+def create_logger(name, log_file=None, level=WARNING, queued=False):
     """
     Creates a logger for the given application. This function also removes all attached handlers
     in case there was a logger with the same name.
+
+    :param name: Name of the logger.
+    :param log_file: Path of a rotating log file, e.g. LOG_FILE_NAME. Without one the logger only gets a NullHandler
+    and its records propagate to the handlers the application configured.
+    :param level: Level of the logger, messages below it are discarded before they are formatted.
+    :param queued: Hand log records to a queue that is written to the file by a background thread, so the caller
+    never blocks on file I/O. The listener thread is stopped, and the queue flushed, at interpreter exit or by
+    stop_logger.
+    :return: Logger.
     """
     logger = getLogger(name)
-    log_filename = path.join(path.dirname(path.realpath(__file__)), LOG_FILE_NAME)
-    log_formatter = Formatter(LOG_FORMAT)
+    stop_logger(name)
+    del logger.handlers[:]
+    logger.setLevel(level)
+    if log_file is None:
+        logger.addHandler(NullHandler())
+        return logger
 
-    file_handler = RotatingFileHandler(log_filename, mode='a', maxBytes=512000, backupCount=3)
-    file_handler.setLevel(WARNING)
-    file_handler.setFormatter(log_formatter)
+    file_handler = RotatingFileHandler(log_file, mode='a', maxBytes=512000, backupCount=3)
+    file_handler.setLevel(level)
+    file_handler.setFormatter(Formatter(LOG_FORMAT))
 
-    del logger.handlers[:]
-    logger.addHandler(file_handler)
-    logger.setLevel(WARNING)
+    if queued:
+        log_queue = SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        _listeners[name] = listener
+        logger.addHandler(QueueHandler(log_queue))
+    else:
+        logger.addHandler(file_handler)
 
     return logger
+
+
+def stop_logger(name):
+    """
+    Stops the background listener of a queued logger, writing out all records still in the queue.
+    :param name: Name of the logger.
+    :return: None.
+    """
+    listener = _listeners.pop(name, None)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+@atexit.register
+def _stop_listeners():
+    for name in list(_listeners):
+        stop_logger(name)
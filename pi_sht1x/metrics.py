@@ -0,0 +1,140 @@
+"""
+Counters and latency histograms of the SHT1x transactions, with a Prometheus text format renderer:
+
+    metrics = SensorMetrics()
+    sensor = SHT1x(18, 23, metrics=metrics)
+    sensor.read_temperature()
+    metrics.snapshot()['phases']['wait']['sum']
+    print(render_prometheus({'greenhouse': metrics}))
+
+Phases:
+    start: transmission start sequence.
+    command: command byte and the sensor's ACK.
+    wait: wait for Data Ready while the sensor converts.
+    read: data bytes of a measurement or the Status Register.
+    crc: reading and checking the CRC byte.
+    soft_reset: soft reset, including the 15ms wait and restoring the Status Register.
+    transaction: complete transaction, every attempt of a retried transaction counts as one.
+"""
+import bisect
+import time
+from collections import Counter
+
+from .exceptions import SHT1xAckError, SHT1xStateError, SHT1xTimeoutError, SHT1xCRCError
+
+PHASES = ('start', 'command', 'wait', 'read', 'crc', 'soft_reset', 'transaction')
+ERRORS = {SHT1xAckError: 'ack', SHT1xStateError: 'state', SHT1xTimeoutError: 'timeout', SHT1xCRCError: 'crc'}
+# Upper bounds in seconds, from the microseconds of bit-banging on gpiomem to a 14-bit conversion at 2.5V.
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """
+    Fixed bucket latency histogram. Counts are kept per bucket and only made cumulative when rendered.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        """
+        :return: Dictionary of count, sum and the cumulative count per upper bound, '+Inf' included.
+        """
+        cumulative, total = {}, 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            cumulative[bound] = total
+        return {'count': self.count, 'sum': self.sum, 'buckets': cumulative}
+
+
+class SensorMetrics:
+    """
+    Metrics of a single sensor. SHT1x records them while holding the lock of its pins, so updates need no
+    locking of their own.
+    """
+
+    def __init__(self, buckets=BUCKETS, clock=time.perf_counter):
+        """
+        :param buckets: Upper bounds of the latency histograms, in seconds.
+        :param clock: Clock used to time the phases.
+        """
+        self.buckets = tuple(buckets)
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """
+        Zeroes all counters and histograms.
+        :return: None.
+        """
+        self.phases = {phase: Histogram(self.buckets) for phase in PHASES}
+        self.commands = Counter()
+        self.errors = Counter()
+
+    def observe(self, phase, seconds):
+        self.phases[phase].observe(seconds)
+
+    def error(self, exception):
+        """
+        Counts a failed transaction by the type of its exception: 'ack', 'state', 'timeout', 'crc' or 'other'.
+        """
+        self.errors[ERRORS.get(type(exception), 'other')] += 1
+
+    def snapshot(self):
+        """
+        :return: Dictionary of the phase histograms, commands sent and errors per type.
+        """
+        errors = dict.fromkeys(list(ERRORS.values()) + ['other'], 0)
+        errors.update(self.errors)
+        return {'phases': {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+                'commands': dict(self.commands),
+                'errors': errors}
+
+
+def _labels(labels):
+    return ','.join('{0}="{1}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"')
+                                        .replace('\n', r'\n'))
+                    for name, value in labels)
+
+
+def render_prometheus(sensors, prefix='sht1x'):
+    """
+    Renders the metrics of one or more sensors in the Prometheus text exposition format.
+    :param sensors: Dictionary of sensor name, used as the sensor label, to SensorMetrics or SHT1x object.
+    :param prefix: Prefix of the metric names.
+    :return: String.
+    """
+    snapshots = [(name, getattr(sensor, 'metrics', sensor).snapshot()) for name, sensor in sensors.items()]
+    lines = ['# HELP {0}_phase_seconds Duration of the phases of SHT1x transactions.'.format(prefix),
+             '# TYPE {0}_phase_seconds histogram'.format(prefix)]
+    for name, snapshot in snapshots:
+        for phase, histogram in snapshot['phases'].items():
+            labels = [('sensor', name), ('phase', phase)]
+            for bound, count in histogram['buckets'].items():
+                lines.append('{0}_phase_seconds_bucket{{{1}}} {2}'.format(prefix, _labels(labels + [('le', bound)]),
+                                                                         count))
+            lines.append('{0}_phase_seconds_sum{{{1}}} {2!r}'.format(prefix, _labels(labels), histogram['sum']))
+            lines.append('{0}_phase_seconds_count{{{1}}} {2}'.format(prefix, _labels(labels), histogram['count']))
+
+    lines += ['# HELP {0}_commands_total Commands sent to the sensor.'.format(prefix),
+              '# TYPE {0}_commands_total counter'.format(prefix)]
+    for name, snapshot in snapshots:
+        for command, count in sorted(snapshot['commands'].items()):
+            lines.append('{0}_commands_total{{{1}}} {2}'.format(prefix, _labels([('sensor', name),
+                                                                                ('command', command)]), count))
+
+    lines += ['# HELP {0}_errors_total Failed transactions by type of error.'.format(prefix),
+              '# TYPE {0}_errors_total counter'.format(prefix)]
+    for name, snapshot in snapshots:
+        for error, count in snapshot['errors'].items():
+            lines.append('{0}_errors_total{{{1}}} {2}'.format(prefix, _labels([('sensor', name), ('type', error)]),
+                                                              count))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,129 @@
+"""
+Retrying of failed sensor transactions with escalating recovery.
+"""
+import time
+from collections import deque
+
+from .exceptions import SHT1xError
+
+
+class RetryPolicy:
+    """
+    Retries a failed transaction, recovering more thoroughly before every new attempt:
+        reread: the transaction is repeated as is, which is enough for one-off noise on the lines.
+        reset_connection: the serial interface is reset first, the status register keeps its content.
+        soft_reset: the sensor is reset and its status register restored from the settings of the SHT1x object.
+    The last step is repeated when there are more retries than steps. Besides the number of retries per
+    transaction, retries are limited by a budget per period, so a disconnected sensor fails fast instead of
+    multiplying the duration of every read.
+
+        sensor = SHT1x(18, 23, retry_policy=RetryPolicy(retries=3))
+    """
+    RECOVERY = ('reread', 'reset_connection', 'soft_reset')
+
+    def __init__(self, retries=3, recovery=RECOVERY, budget=30, period=60.0, errors=(SHT1xError,)):
+        """
+        :param retries: Maximum number of retries of a single transaction.
+        :param recovery: Recovery steps, in the order they are used, see SHT1x.recover.
+        :param budget: Maximum number of retries within period, None for no limit.
+        :param period: Length of the budget period in seconds.
+        :param errors: Exception types that are retried.
+        """
+        self.retries = retries
+        self.recovery = tuple(recovery)
+        self.budget = budget
+        self.period = period
+        self.errors = errors
+        self.attempts = 0
+        self.retried = 0
+        self.recovered = 0
+        self.failures = 0
+        self.recoveries = dict.fromkeys(self.recovery, 0)
+        self._spent = deque()
+
+    def run(self, sensor, operation, *args):
+        """
+        Runs a transaction, retrying it on failure.
+        :param sensor: SHT1x object the transaction is run on, used for recovery.
+        :param operation: Callable running the transaction.
+        :param args: Arguments of operation.
+        :return: Result of operation.
+        """
+        retry = 0
+        while True:
+            self.attempts += 1
+            try:
+                result = operation(*args)
+            except self.errors as e:
+                if not self._retry(sensor, e, retry):
+                    raise
+                retry += 1
+            else:
+                if retry:
+                    self.recovered += 1
+                return result
+
+    async def run_async(self, sensor, operation, *args):
+        """
+        Runs a transaction coroutine, retrying it on failure, see run. The recovery steps only take a few
+        milliseconds and run on the event loop thread.
+        :param operation: Coroutine function running the transaction.
+        :return: Result of operation.
+        """
+        retry = 0
+        while True:
+            self.attempts += 1
+            try:
+                result = await operation(*args)
+            except self.errors as e:
+                if not self._retry(sensor, e, retry):
+                    raise
+                retry += 1
+            else:
+                if retry:
+                    self.recovered += 1
+                return result
+
+    def _retry(self, sensor, error, retry):
+        """
+        Recovers from a failed attempt before the next one.
+        :param retry: Number of retries so far.
+        :return: False if the transaction is not retried.
+        """
+        if retry >= self.retries or not self._spend():
+            self.failures += 1
+            return False
+        step = self.recovery[min(retry, len(self.recovery) - 1)]
+        self.retried += 1
+        self.recoveries[step] += 1
+        sensor.logger.warning('%s: %s Retrying (%s of %s) after %s.', type(error).__name__, error, retry + 1,
+                              self.retries, step)
+        try:
+            sensor.recover(step)
+        except self.errors as recovery_error:
+            sensor.logger.error('Recovery by %s failed: %s', step, recovery_error)
+        return True
+
+    def stats(self):
+        """
+        :return: Dictionary of the policy counters.
+        """
+        stats = {'attempts': self.attempts, 'retried': self.retried, 'recovered': self.recovered,
+                 'failures': self.failures}
+        stats.update(('recovery_' + step, count) for step, count in self.recoveries.items())
+        return stats
+
+    def _spend(self):
+        """
+        Takes a retry from the budget.
+        :return: False when the budget of the current period is used up.
+        """
+        if self.budget is None:
+            return True
+        now = time.monotonic()
+        while self._spent and now - self._spent[0] > self.period:
+            self._spent.popleft()
+        if len(self._spent) >= self.budget:
+            return False
+        self._spent.append(now)
+        return True
@@ -0,0 +1,244 @@
+"""
+Continuous sampling of an SHT1x sensor on a background thread.
+"""
+import queue
+import threading
+import time
+
+from . import conversion
+from .adaptive import AdaptiveResolution
+from .capture import RawSample, resolution
+from .crc import CRCValidator, FLAG_CRC
+from .exceptions import SHT1xError
+from .sht1x import Reading
+
+
+class Sampler:
+    """
+    Reads a sensor at a fixed rate on a background thread and hands the readings to consumers through a bounded
+    queue. Measurements are scheduled on a monotonic grid (start + n * interval), so the rate doesn't drift by the
+    time a measurement takes. When a measurement overruns the next slot, the slots that passed are skipped and
+    counted as missed deadlines instead of being caught up in a burst.
+
+    Back-pressure policies when the queue is full:
+        drop-oldest: the oldest queued reading is discarded to make room (counted in dropped).
+        block: the sampling thread waits for the consumer, missing deadlines if it can't keep up.
+
+    With a CRC policy, the sampling thread only takes raw samples. Their CRCs are checked in batches, and the
+    samples converted, on a second thread, see :class:`pi_sht1x.crc.CRCValidator` for the policies.
+
+        with Sampler(sensor, rate=2) as sampler:
+            for reading in sampler:
+                print(reading)
+    """
+    POLICIES = ('drop-oldest', 'block')
+
+    BATCH_SIZE = 16
+
+    def __init__(self, sensor, rate=1.0, queue_size=64, policy='drop-oldest', count=None, adaptive=False,
+                 crc_policy=None, max_errors=None):
+        """
+        :param sensor: SHT1x object, read with its read method.
+        :param rate: Target number of readings per second.
+        :param queue_size: Maximum number of readings waiting for a consumer.
+        :param policy: Back-pressure policy, 'drop-oldest' or 'block'.
+        :param count: Stop after this many measurements, failed ones included, None samples until stop is called.
+        :param adaptive: Read through an AdaptiveResolution controller targeting the rate, the sensor is switched
+        to low resolution while high resolution readings don't fit in the sampling interval.
+        :param crc_policy: Defer CRC checking to a second thread, handling bad samples with the given
+        CRCValidator policy: 'flag', 'drop' or 'retry'. None reads through sensor.read.
+        :param max_errors: Stop after this many consecutive failed measurements, None keeps trying.
+        """
+        if policy not in self.POLICIES:
+            raise SHT1xError('Unknown back-pressure policy: {0}'.format(policy))
+        if rate <= 0:
+            raise SHT1xError('The sampling rate must be positive.')
+        if adaptive and crc_policy is not None:
+            raise SHT1xError('Adaptive resolution reads converted values, it can not be combined with a CRC policy.')
+        self.sensor = AdaptiveResolution(sensor, rate=rate) if adaptive else sensor
+        self.interval = 1.0 / rate
+        self.policy = policy
+        self.count = count
+        self.max_errors = max_errors
+        self.readings = queue.Queue(maxsize=queue_size)
+        self.samples = 0
+        self.dropped = 0
+        self.missed_deadlines = 0
+        self.errors = 0
+        self.last_error = None
+        self.validator = CRCValidator(crc_policy) if crc_policy is not None else None
+        self.crc_dropped = 0
+        self._raw = queue.Queue(maxsize=queue_size)
+        self._retries = queue.Queue()
+        self._stop = threading.Event()
+        self._closing = threading.Event()
+        self._thread = None
+        self._checker = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __iter__(self):
+        """
+        Yields readings as they arrive, until the sampler has stopped and the queue is drained.
+        """
+        while True:
+            try:
+                yield self.readings.get(timeout=self.interval)
+            except queue.Empty:
+                if not self.running:
+                    return
+
+    @property
+    def running(self):
+        return any(thread is not None and thread.is_alive() for thread in (self._thread, self._checker))
+
+    def start(self):
+        """
+        Starts the sampling thread.
+        :return: None.
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._closing.clear()
+        self._thread = threading.Thread(target=self._run, name='SHT1x sampler', daemon=True)
+        self._thread.start()
+        if self.validator is not None:
+            self._checker = threading.Thread(target=self._check, name='SHT1x CRC checker', daemon=True)
+            self._checker.start()
+
+    def stop(self, timeout=None):
+        """
+        Stops the sampling thread, waiting for the running measurement to complete. Queued readings remain
+        available to consumers.
+        :param timeout: Maximum time to wait for the thread, in seconds.
+        :return: None.
+        """
+        self._stop.set()
+        self._closing.set()
+        for thread in (self._thread, self._checker):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def stats(self):
+        """
+        :return: Dictionary of the sampler counters.
+        """
+        stats = {'samples': self.samples, 'dropped': self.dropped, 'missed_deadlines': self.missed_deadlines,
+                 'errors': self.errors, 'queued': self.readings.qsize()}
+        if self.validator is not None:
+            stats.update(crc_failed=self.validator.failed, crc_dropped=self.crc_dropped)
+        return stats
+
+    def _run(self):
+        deadline = time.monotonic()
+        attempts = 0
+        consecutive_errors = 0
+        while not self._stop.is_set():
+            attempts += 1
+            if self._sample():
+                self.samples += 1
+                consecutive_errors = 0
+            else:
+                consecutive_errors += 1
+            if self.count is not None and attempts >= self.count:
+                break
+            if self.max_errors is not None and consecutive_errors >= self.max_errors:
+                self.sensor.logger.error('Sampling stopped after %s consecutive errors.', consecutive_errors)
+                break
+            while not self._retries.empty() and not self._stop.is_set():
+                self._sample(self._retries.get_nowait())
+
+            deadline += self.interval
+            now = time.monotonic()
+            if now > deadline:
+                missed = int((now - deadline) // self.interval) + 1
+                self.missed_deadlines += missed
+                deadline += missed * self.interval
+            self._stop.wait(deadline - now)
+        self._stop.set()
+
+    def _sample(self, attempt=0):
+        """
+        Takes one reading, or one raw sample when CRCs are checked by the checker thread.
+        :param attempt: Number of times the sample was retried.
+        :return: True on success.
+        """
+        try:
+            if self.validator is None:
+                self._put(self.sensor.read())
+            else:
+                timestamp = time.time()
+                raw_temperature, crc_temperature = self.sensor.read_raw('Temperature')
+                raw_humidity, crc_humidity = self.sensor.read_raw('Humidity')
+                self._raw.put((RawSample(timestamp, raw_temperature, raw_humidity, crc_temperature, crc_humidity,
+                                         self.sensor._status_register, 0), attempt))
+            return True
+        except SHT1xError as e:
+            self.errors += 1
+            self.last_error = e
+            self.sensor.logger.error('Sampling failed: %s', e)
+            return False
+
+    def _check(self):
+        """
+        Checks and converts the raw samples in batches, until the sampling thread has stopped and all samples are
+        processed.
+        """
+        while True:
+            try:
+                batch = [self._raw.get(timeout=self.interval)]
+            except queue.Empty:
+                if self._thread.is_alive():
+                    continue
+                return
+            while len(batch) < self.BATCH_SIZE and not self._raw.empty():
+                batch.append(self._raw.get_nowait())
+
+            attempts = {id(sample): attempt for sample, attempt in batch}
+            kept, failed = self.validator.check(sample for sample, attempt in batch)
+            for sample in kept:
+                reading = self._convert(sample)
+                self.sensor._publish(reading)
+                self._put(reading)
+            for sample in failed:
+                attempt = attempts.get(id(sample), 0)
+                if self.validator.policy == 'retry' and attempt < self.validator.retries and self._thread.is_alive():
+                    self._retries.put(attempt + 1)
+                elif self.validator.policy != 'flag':
+                    self.crc_dropped += 1
+                    self.sensor.logger.error('Dropped sample with CRC error: %s', sample)
+
+    def _convert(self, sample):
+        bits = resolution(sample.status_register)
+        table = conversion.get_table(self.sensor.vdd, bits)
+        temperature = table.celsius(sample.raw_temperature)
+        humidity = table.humidity(sample.raw_humidity, temperature)
+        return Reading(sample.timestamp, temperature, table.fahrenheit(sample.raw_temperature), humidity,
+                       conversion.dew_point(temperature, humidity), tuple(bits), not sample.flags & FLAG_CRC)
+
+    def _put(self, reading):
+        if self.policy == 'block':
+            while not self._closing.is_set():
+                try:
+                    self.readings.put(reading, timeout=self.interval)
+                    return
+                except queue.Full:
+                    pass
+            return
+
+        while True:
+            try:
+                self.readings.put_nowait(reading)
+                return
+            except queue.Full:
+                try:
+                    self.readings.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
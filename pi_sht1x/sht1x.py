@@ -3,47 +3,94 @@ SHT1x library
 """
 import time
 import math
+import threading
+import weakref
+from collections import namedtuple
+from logging import INFO
+
+from . import conversion
+from .cache import MeasurementCache
+from .backends import get_backend, OUT, IN, LOW, HIGH, BOARD, PUD_OFF, PUD_UP, FALLING
+from .conversion import COF
+from .crc import CRC
+from .exceptions import SHT1xError, SHT1xAckError, SHT1xStateError, SHT1xTimeoutError, SHT1xCRCError
 
+GPIO_FUNCS = {-1: 'GPIO.UNKNOWN', 0: 'GPIO.OUT', 1: 'GPIO.IN', 10: 'GPIO.BOARD', 11: 'GPIO.BCM',
+              40: 'GPIO.SERIAL', 41: "GPIO.SPI", 42: "GPIO.I2C", 43: "GPIO.HARD_PWM"}
 
-class SHT1xError(Exception):
-    pass
-
+Reading = namedtuple('Reading', ['timestamp', 'temperature_celsius', 'temperature_fahrenheit', 'humidity',
+                                 'dew_point', 'resolution', 'crc_ok'])
+Reading.__doc__ = """
+Complete reading returned by SHT1x.read, timestamp is the wall-clock time (time.time) the measurement started and
+resolution the (temperature bits, humidity bits) it was measured at. crc_ok is None when the CRC was not checked,
+and False for readings kept by the 'flag' CRC policy of a Sampler.
+"""
 
-try:
-    import RPi.GPIO as GPIO
-except ImportError:
-    raise SHT1xError('Could not import the RPi.GPIO package (http://pypi.python.org/pypi/RPi.GPIO). Exiting.')
+# SharedPins by backend object, then by SCK pin. Backends are held weakly, their entries go away with them.
+_shared_pins = weakref.WeakKeyDictionary()
+_shared_pins_guard = threading.Lock()
+
+
+class SharedPins:
+    """
+    State shared by every SHT1x object driving the same SCK line through the same backend object: the lock
+    serializing their transactions, the object that held it last and the last known Status Register of the
+    sensor on each DATA pin, None when unknown. Sensors sharing SCK, like those of an SHT1xBus, are clocked by
+    each other's transactions, so the lock covers the SCK line rather than a DATA/SCK pair. users holds the SHT1x
+    objects still using the SCK line, it is only cleaned up when the last of them is done with it.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.owner = None
+        self.status_registers = {}
+        self.users = weakref.WeakSet()
+
+
+def shared_pins(backend, sck_pin):
+    """
+    Returns the SharedPins of an SCK line.
+    """
+    with _shared_pins_guard:
+        lines = _shared_pins.get(backend)
+        if lines is None:
+            lines = _shared_pins[backend] = {}
+        pins = lines.get(sck_pin)
+        if pins is None:
+            pins = lines[sck_pin] = SharedPins()
+    return pins
+
+
+class PinsLock:
+    """
+    Lock of an SHT1x object on its SharedPins. The lock is reentrant, transactions nest during initialization and
+    recovery. When another object used the pins since this one last held the lock, the object drops what it
+    cached about them, see SHT1x._take_over.
+    """
+
+    def __init__(self, sensor, pins):
+        self._sensor = weakref.ref(sensor)
+        self.pins = pins
+
+    def acquire(self, blocking=True, timeout=-1):
+        if not self.pins.lock.acquire(blocking, timeout):
+            return False
+        if self.pins.owner is not self._sensor:
+            self.pins.owner = self._sensor
+            sensor = self._sensor()
+            if sensor is not None:
+                sensor._take_over()
+        return True
 
-GPIO_FUNCS = {-1: 'GPIO.UNKNOWN', 0: 'GPIO.OUT', 1: 'GPIO.IN', 10: 'GPIO.BOARD', 11: 'GPIO.BCM',
-              40: 'GPIO.SERIAL', 41: "GPIO.SPI", 42: "GPIO.I2C", 43: "GPIO.HARD_PWM"}
+    def release(self):
+        self.pins.lock.release()
 
+    def __enter__(self):
+        self.acquire()
+        return self
 
-class COF():
-    D1_VDD_C = {5: -40.1, 4: -39.8, 3.5: -39.7, 3: -39.6, 2.5: -39.4}
-    D1_VDD_F = {5: -40.2, 4: -39.6, 3.5: -39.5, 3: -39.3, 2.5: -38.9}
-    D2_SO_C = {14: 0.01, 12: 0.04}
-    D2_SO_F = {14: 0.018, 12: 0.072}
-    C1_SO = {12: -2.0468, 8: -2.0468}
-    C2_SO = {12: 0.0367, 8: 0.5872}
-    C3_SO = {12: -0.0000015955, 8: -0.00040845}
-    T1_SO = {12: 0.01, 8: 0.01}
-    T2_SO = {12: 0.00008, 8: 0.00128}
-
-
-class CRC():
-    LOOK_UP = [0, 49, 98, 83, 196, 245, 166, 151, 185, 136, 219, 234, 125, 76, 31, 46, 67, 114, 33, 16, 135,
-               182, 229, 212, 250, 203, 152, 169, 62, 15, 92, 109, 134, 183, 228, 213, 66, 115, 32, 17, 63,
-               14, 93, 108, 251, 202, 153, 168, 197, 244, 167, 150, 1, 48, 99, 82, 124, 77, 30, 47, 184, 137,
-               218, 235, 61, 12, 95, 110, 249, 200, 155, 170, 132, 181, 230, 215, 64, 113, 34, 19, 126, 79,
-               28, 45, 186, 139, 216, 233, 199, 246, 165, 148, 3, 50, 97, 80, 187, 138, 217, 232, 127, 78, 29,
-               44, 2, 51, 96, 81, 198, 247, 164, 149, 248, 201, 154, 171, 60, 13, 94, 111, 65, 112, 35, 18,
-               133, 180, 231, 214, 122, 75, 24, 41, 190, 143, 220, 237, 195, 242, 161, 144, 7, 54, 101, 84,
-               57, 8, 91, 106, 253, 204, 159, 174, 128, 177, 226, 211, 68, 117, 38, 23, 252, 205, 158, 175,
-               56, 9, 90, 107, 69, 116, 39, 22, 129, 176, 227, 210, 191, 142, 221, 236, 123, 74, 25, 40, 6,
-               55, 100, 85, 194, 243, 160, 145, 71, 118, 37, 20, 131, 178, 225, 208, 254, 207, 156, 173, 58,
-               11, 88, 105, 4, 53, 102, 87, 192, 241, 162, 147, 189, 140, 223, 238, 121, 72, 27, 42, 193, 240,
-               163, 146, 5, 52, 103, 86, 120, 73, 26, 43, 188, 141, 222, 239, 130, 179, 224, 209, 70, 119, 36,
-               21, 59, 10, 89, 104, 255, 206, 157, 172]
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
 
 
 class SHT1x:
@@ -53,43 +100,85 @@ class SHT1x:
                 'WriteStatusRegister': 0b00000110,
                 'SoftReset': 0b00011110,
                 'NoOp': 0b00000000}
+    COMMAND_NAMES = dict(zip(Commands.values(), Commands.keys()))
     RESOLUTION = {'High': [14, 12], 'Low': [12, 8]}
     VDD = {'5V': 5, '4V': 4, '3.5V': 3.5, '3V': 3, '2.5V': 2.5}
-
-    def __init__(self, data_pin, sck_pin, gpio_mode=GPIO.BOARD, vdd='3.5V', resolution='High',
-                 heater=False, otp_no_reload=False, crc_check=True, logger=None):
+    MEASUREMENT_TIME = {8: 0.02, 12: 0.08, 14: 0.32}
+    VDD_TIMING_MARGIN = {5: 0.1, 4: 0.1, 3.5: 0.15, 3: 0.2, 2.5: 0.3}
+    WAIT_STRATEGIES = ('edge', 'poll')
+    POLL_INTERVAL = .01
+    SCK_DELAY = 0.0000001
+    START_EDGES = 7
+
+    def __init__(self, data_pin, sck_pin, gpio_mode=BOARD, vdd='3.5V', resolution='High',
+                 heater=False, otp_no_reload=False, crc_check=True, logger=None, backend=None,
+                 wait_strategy='edge', sck_delay=None, retry_policy=None, metrics=None):
+        if wait_strategy not in self.WAIT_STRATEGIES:
+            raise SHT1xError('Unknown wait strategy: {0}'.format(wait_strategy))
+
+        self.backend = get_backend(backend)
+        if sck_delay is None:
+            sck_delay = self.backend.sck_delay if self.backend.sck_delay is not None else self.SCK_DELAY
+        self._sck_delay = sck_delay
         self.data_pin = data_pin
         self.sck_pin = sck_pin
         self.gpio_mode = gpio_mode
-        self.vdd = self.VDD.get(vdd.upper(), self.VDD['3.5V'])
+        self._vdd = self.VDD.get(vdd.upper(), self.VDD['3.5V'])
         self._resolution = self.RESOLUTION.get(resolution.capitalize(), self.RESOLUTION['High'])
         self._heater = heater
         self._otp_no_reload = otp_no_reload
+        self._conversion_table = None
         self.crc_check = crc_check
+        self.wait_strategy = wait_strategy
+        self.retry_policy = retry_policy
+        self.metrics = metrics
+        self._subscribers = []
         self._command = self.Commands['NoOp']
         self._status_register = 0b00000000
+        self._status_register_cached = False
         self.temperature_celsius = None
         self.temperature_fahrenheit = None
         self.humidity = None
         self.dew_point = None
         self._logger = logger
-
-        GPIO.setmode(self.gpio_mode)
+        self._log_info = self.logger.isEnabledFor(INFO)
+        self._pin_config = {}
+        self._waveforms = {}
+        self.gpio_setup_calls = 0
+        self.cache = MeasurementCache()
+        self._pins = shared_pins(self.backend, sck_pin)
+        self._configuration_stale = False
+        self.lock = PinsLock(self, self._pins)
+        with self.lock:
+            self._pins.users.add(self)
+
+        self.backend.setmode(self.gpio_mode)
         self.initialize_sensor()
 
         self.logger.info('Initial configuration:\nData Pin: {0}\nClock Pin: {1}\nGPIO mode: {2}\nVdd: {3}\n'
-                         'Resolution: {4}\nHeater: {5}\nOTP no reload: {6}\nCRC check: {7}'
+                         'Resolution: {4}\nHeater: {5}\nOTP no reload: {6}\nCRC check: {7}\nBackend: {8}\n'
+                         'Wait strategy: {9}'
                          .format(self.data_pin, self.sck_pin, GPIO_FUNCS[gpio_mode], self.vdd, resolution,
-                                 self._heater, self._otp_no_reload, self.crc_check))
+                                 self._heater, self._otp_no_reload, self.crc_check, self.backend.name,
+                                 self.wait_strategy))
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.logger.info('GPIO channel function status:\nData pin [{0}]: {1}\nClock pin [{2}]: {3}'
-                         .format(self.data_pin, GPIO_FUNCS[GPIO.gpio_function(self.data_pin)],
-                                 self.sck_pin, GPIO_FUNCS[GPIO.gpio_function(self.sck_pin)]))
-        GPIO.cleanup()
+                         .format(self.data_pin, GPIO_FUNCS[self.backend.gpio_function(self.data_pin)],
+                                 self.sck_pin, GPIO_FUNCS[self.backend.gpio_function(self.sck_pin)]))
+        # Only this sensor's pins, other users of the backend keep theirs. SCK is left alone while other sensors
+        # still share it.
+        with self.lock:
+            self._pins.users.discard(self)
+            if self._pins.users:
+                self.backend.cleanup([self.data_pin])
+            else:
+                self.backend.cleanup([self.data_pin, self.sck_pin])
+            self._pin_config.clear()
+            self._pins.owner = None
         if exc_type is not None:
             self.logger.error('Exception in with block: {0}\n{1}\n{2}'.format(exc_type, exc_val, exc_tb))
             return False
@@ -100,8 +189,7 @@ class SHT1x:
 
     @heater.setter
     def heater(self, value):
-        self._heater = value
-        self.initialize_sensor()
+        self.configure(heater=value)
 
     @property
     def otp_no_reload(self):
@@ -109,8 +197,7 @@ class SHT1x:
 
     @otp_no_reload.setter
     def otp_no_reload(self, value):
-        self._otp_no_reload = value
-        self.initialize_sensor()
+        self.configure(otp_no_reload=value)
 
     @property
     def resolution(self):
@@ -118,8 +205,39 @@ class SHT1x:
 
     @resolution.setter
     def resolution(self, value):
-        self._resolution = value
-        self.initialize_sensor()
+        self.configure(resolution=value)
+
+    @property
+    def vdd(self):
+        return self._vdd
+
+    @vdd.setter
+    def vdd(self, value):
+        self._vdd = value
+        self._conversion_table = None
+
+    @property
+    def sck_delay(self):
+        """
+        Time in seconds to hold SCK after every edge, 0 disables the delay.
+        """
+        return self._sck_delay
+
+    @sck_delay.setter
+    def sck_delay(self, value):
+        self._sck_delay = value
+        # The compiled command waveforms include the delay.
+        self._waveforms.clear()
+
+    @property
+    def conversion_table(self):
+        """
+        The :class:`pi_sht1x.conversion.ConversionTable` for the current vdd and resolution, built when it is first
+        needed and replaced whenever either of them changes.
+        """
+        if self._conversion_table is None:
+            self._conversion_table = conversion.get_table(self._vdd, self._resolution)
+        return self._conversion_table
 
     @property
     def logger(self):
@@ -143,8 +261,50 @@ class SHT1x:
 
         :return: None.
         """
-        self.reset_connection()
+        with self.lock:
+            self.reset_connection()
 
+            mask = self._status_register_mask()
+            if self._log_info:
+                self.logger.info('Initializing sensor using bit mask: {0:08b}'.format(mask))
+            self._write_status_register(mask)
+
+    def configure(self, heater=None, otp_no_reload=None, resolution=None):
+        """
+        Changes any combination of the heater, OTP no reload and resolution settings with a single write of the
+        Status Register. Nothing is written when the cached Status Register already holds the settings.
+        :param heater: Heater on or off, None keeps the current setting.
+        :param otp_no_reload: No reload from OTP on or off, None keeps the current setting.
+        :param resolution: 'High', 'Low' or a RESOLUTION value, None keeps the current setting.
+        :return: True if the Status Register was written.
+        """
+        if heater is not None:
+            self._heater = heater
+        if otp_no_reload is not None:
+            self._otp_no_reload = otp_no_reload
+        if resolution is not None:
+            if isinstance(resolution, str):
+                resolution = self.RESOLUTION[resolution.capitalize()]
+            if list(resolution) != list(self._resolution):
+                self._conversion_table = None
+            self._resolution = list(resolution)
+
+        with self.lock:
+            mask = self._status_register_mask()
+            if self._status_register_cached and self._status_register & 0b00000111 == mask:
+                return False
+            self.reset_connection()
+            if self._log_info:
+                self.logger.info('Configuring sensor using bit mask: {0:08b}'.format(mask))
+            self._write_status_register(mask)
+            self.cache.clear()
+            return True
+
+    def _status_register_mask(self):
+        """
+        Builds the writable bits of the Status Register from the heater, OTP no reload and resolution settings.
+        :return: Status Register mask.
+        """
         mask = 0
         if self._heater:
             mask += 4
@@ -152,29 +312,40 @@ class SHT1x:
             mask += 2
         if self._resolution[0] == self.RESOLUTION['Low'][0]:
             mask += 1
+        return mask
 
-        self.logger.info('Initializing sensor using bit mask: {0:08b}'.format(mask))
-        self._write_status_register(mask)
-
-    def read_temperature(self):
+    def read_temperature(self, max_age=None):
         """
         Sends command to the SHT1x sensor to read the temperature. Values for both celsius and fahrenheit are
         calculated.
+        :param max_age: Optional, accept a temperature measured up to max_age seconds ago instead of measuring.
         :return: String.
         """
-        self._command = self.Commands['Temperature']
-        self._send_command()
-        raw_temperature = self._read_measurement()
+        return self._convert_temperature(self._cached_measure('Temperature', max_age))
 
-        self.temperature_celsius = round(raw_temperature * COF.D2_SO_C[self._resolution[0]] +
-                                         COF.D1_VDD_C[self.vdd], 2)
-        self.temperature_fahrenheit = round(raw_temperature * COF.D2_SO_F[self._resolution[0]] +
-                                            COF.D1_VDD_F[self.vdd], 2)
+    def _convert_temperature(self, raw_temperature):
+        """
+        Converts a raw temperature reading and stores the celsius and fahrenheit values.
+        :param raw_temperature: Raw temperature value read from the sensor.
+        :return: Temperature in celsius.
+        """
+        return self._convert_temperatures(raw_temperature)[0]
 
-        self.logger.info('Temperature: {0}°C [{1}°F]'.format(self.temperature_celsius, self.temperature_fahrenheit))
-        return self.temperature_celsius
+    def _convert_temperatures(self, raw_temperature):
+        """
+        Converts a raw temperature reading, see _convert_temperature.
+        :return: Tuple of the temperature in celsius and fahrenheit.
+        """
+        table = self.conversion_table
+        celsius, fahrenheit = table.celsius(raw_temperature), table.fahrenheit(raw_temperature)
+        # The attributes only report the last values, the caller gets its own through the return value, whatever
+        # other threads read in the meantime.
+        self.temperature_celsius, self.temperature_fahrenheit = celsius, fahrenheit
+
+        self.logger.info('Temperature: %s°C [%s°F]', celsius, fahrenheit)
+        return celsius, fahrenheit
 
-    def read_humidity(self, temperature=None):
+    def read_humidity(self, temperature=None, max_age=None):
         """
         Sends command to the SHT1x sensor to read the temperature compensated humidity. If the read_temperature
         function has not been called previously and the temperature parameter is not used, it will read the
@@ -182,109 +353,266 @@ class SHT1x:
 
         :param temperature: Optional, temperature, in celsius, used to compensate when temperatures are significantly
         different from 25C (~77F) when calculating relative humidity.
+        :param max_age: Optional, accept a humidity, and compensation temperature, measured up to max_age seconds
+        ago instead of measuring.
         :return: String.
         """
         if temperature is None:
-            if self.temperature_celsius is None:
-                self.read_temperature()
             temperature = self.temperature_celsius
+            if max_age is not None or temperature is None:
+                temperature = self.read_temperature(max_age)
 
-        self._command = self.Commands['Humidity']
-        self._send_command()
-        raw_humidity = self._read_measurement()
-
-        linear_humidity = COF.C1_SO[self._resolution[1]] + (COF.C2_SO[self._resolution[1]] * raw_humidity) + (
-            COF.C3_SO[self._resolution[1]] * raw_humidity ** 2)
+        return self._convert_humidity(self._cached_measure('Humidity', max_age), temperature)
 
-        self.humidity = round((temperature - 25) * (
-            COF.T1_SO[self._resolution[1]] + COF.T2_SO[self._resolution[1]] * raw_humidity) + linear_humidity, 2)
+    def _convert_humidity(self, raw_humidity, temperature):
+        """
+        Converts a raw humidity reading into temperature compensated relative humidity and stores it.
+        :param raw_humidity: Raw humidity value read from the sensor.
+        :param temperature: Temperature, in celsius, used for compensation.
+        :return: Relative humidity.
+        """
+        humidity = self.humidity = self.conversion_table.humidity(raw_humidity, temperature)
 
-        self.logger.info('Relative Humidity: {0}%'.format(self.humidity))
-        return self.humidity
+        self.logger.info('Relative Humidity: %s%%', humidity)
+        return humidity
 
-    def calculate_dew_point(self, temperature=None, humidity=None):
+    def calculate_dew_point(self, temperature=None, humidity=None, max_age=None):
         """
         Calculates the dew point, based on the given temperature and humidity. If the temperature or humidity are not
         given it will read in the values from the sensor.
 
         :param temperature: Temperature in degrees celsius.
         :param humidity: Humidity.
+        :param max_age: Optional, use a temperature and humidity measured up to max_age seconds ago, measuring them
+        again if they are older. Without max_age, the last values are used whatever their age.
         :return:
         """
         if temperature is None:
-            if self.temperature_celsius is None:
-                self.read_temperature()
             temperature = self.temperature_celsius
+            if max_age is not None or temperature is None:
+                temperature = self.read_temperature(max_age)
 
         if humidity is None:
-            if self.humidity is None:
-                self.read_humidity(self.temperature_celsius)
             humidity = self.humidity
+            if max_age is not None or humidity is None:
+                humidity = self.read_humidity(temperature, max_age)
 
-        tn = 243.12
-        m = 17.62
-        if self.temperature_celsius <= 0:
-            tn = 272.62
-            m = 22.46
+        dew_point = self.dew_point = conversion.dew_point(temperature, humidity)
 
-        log_humidity = math.log(humidity / 100.0)
-        ew = (m * temperature) / (tn + temperature)
-        self.dew_point = round(tn * ((log_humidity + ew) / (m - log_humidity - ew)), 2)
+        self.logger.info('Dew Point: %s°C', dew_point)
+        return dew_point
+
+    def read(self, max_age=None):
+        """
+        Reads temperature and humidity, and calculates the dew point.
+        :param max_age: Optional, accept values measured up to max_age seconds ago instead of measuring.
+        :return: Reading.
+        """
+        timestamp = time.time()
+        resolution = tuple(self._resolution)
+        temperature, fahrenheit = self._convert_temperatures(self._cached_measure('Temperature', max_age))
+        humidity = self.read_humidity(temperature, max_age)
+        dew_point = self.calculate_dew_point(temperature, humidity)
+        reading = Reading(timestamp, temperature, fahrenheit, humidity, dew_point, resolution,
+                          True if self.crc_check else None)
+        self._publish(reading)
+        return reading
+
+    def subscribe(self, callback):
+        """
+        Registers a callback receiving every Reading the sensor produces, through read or a Sampler, e.g. to feed
+        the sinks of :mod:`pi_sht1x.sinks`. Callbacks run on the reading thread and should return quickly.
+        :param callback: Callable taking a Reading.
+        :return: None.
+        """
+        self._subscribers = self._subscribers + [callback]
 
-        self.logger.info('Dew Point: {0}°C'.format(self.dew_point))
-        return self.dew_point
+    def unsubscribe(self, callback):
+        """
+        Removes a callback registered with subscribe.
+        :return: None.
+        """
+        self._subscribers = [subscriber for subscriber in self._subscribers if subscriber != callback]
+
+    def _publish(self, reading):
+        # The list is replaced, never modified, on (un)subscribe, so it can be iterated without a lock.
+        for callback in self._subscribers:
+            try:
+                callback(reading)
+            except Exception as e:
+                self.logger.error('Reading subscriber %r failed: %s', callback, e)
+
+    def stream(self, rate=1.0, queue_size=64, policy='drop-oldest', count=None, adaptive=False, crc_policy=None,
+               max_errors=None):
+        """
+        Samples the sensor at a fixed rate on a background thread, see :class:`pi_sht1x.sampler.Sampler`. The
+        sampler runs until the generator is closed, count measurements were taken or max_errors failed in a row.
+        :param rate: Target number of readings per second.
+        :param queue_size: Maximum number of readings waiting to be consumed.
+        :param policy: Back-pressure policy when the queue is full, 'drop-oldest' or 'block'.
+        :param count: Number of measurements to take, failed ones included, None streams until the generator is
+        closed.
+        :param adaptive: Lower the resolution when high resolution readings can't keep up with the rate, see
+        :class:`pi_sht1x.adaptive.AdaptiveResolution`.
+        :param crc_policy: Check CRCs in batches off the sampling thread, with the given CRCValidator policy.
+        :param max_errors: Stop after this many consecutive failed measurements, None keeps trying.
+        :return: Generator of Reading.
+        """
+        from pi_sht1x.sampler import Sampler
+        with Sampler(self, rate, queue_size, policy, count, adaptive, crc_policy, max_errors) as sampler:
+            yield from sampler
 
-    def _send_command(self, measurement=True):
+    def _send_command(self, measurement=True, wait=True):
         """
         Sends the given command to the SHT1x sensor and verifies acknowledgement. If the command is for
         taking a measurement it will also ensure that the measurement is taking place and waits for the
         measurement to complete.
 
         :param measurement: Indicates if the command is for taking a measurement for temperature or humidity.
+        :param wait: Wait for the measurement to complete, callers passing False have to wait for the Data Ready
+        signal themselves before reading the measurement.
         :return: None.
         """
-        command_name = [key for key in self.Commands.keys() if self.Commands[key] == self._command]
-        if not command_name:
+        self._log_info = self.logger.isEnabledFor(INFO)
+        command_name = self.COMMAND_NAMES.get(self._command)
+        if command_name is None:
             message = "The command was not found: {0}".format(self._command)
             self.logger.error(message)
             raise SHT1xError(message)
 
-        self._transmission_start()
-        self._send_byte(self._command)
-        self._get_ack(command_name)
+        waveform = self._waveforms.get(self._command)
+        if waveform is None:
+            waveform = self._waveforms[self._command] = self._compile_command(self._command)
+
+        self._setup_pin(self.data_pin, OUT)
+        metrics = self.metrics
+        if metrics is None:
+            self._replay(waveform)
+            self._get_ack(command_name)
+        else:
+            metrics.commands[command_name] += 1
+            started = metrics.clock()
+            self._replay(waveform[:self.START_EDGES])
+            sent = metrics.clock()
+            self._replay(waveform[self.START_EDGES:])
+            self._get_ack(command_name)
+            metrics.observe('start', sent - started)
+            metrics.observe('command', metrics.clock() - sent)
 
         if measurement:
-            ack = GPIO.input(self.data_pin)
+            ack = self.backend.input(self.data_pin)
             self.logger.info('SHT1x is taking measurement.')
-            if ack == GPIO.LOW:
+            if ack == LOW:
                 message = 'SHT1x is not in the proper measurement state: DATA line is LOW.'
                 self.logger.error(message)
-                raise SHT1xError(message)
+                raise SHT1xStateError(message)
+
+            if wait:
+                self._timed('wait', self._wait_for_result)
 
-            self._wait_for_result()
+    def _replay(self, waveform):
+        """
+        Sets the pins to the states of a compiled waveform, see _compile_command.
+        :param waveform: List of (pin, state, delay) tuples.
+        :return: None.
+        """
+        output = self.backend.output
+        sleep = time.sleep
+        for pin, state, delay in waveform:
+            output(pin, state)
+            if delay:
+                sleep(delay)
+
+    def _timed(self, phase, operation, *args):
+        """
+        Runs a phase of a transaction, recording its duration when the sensor has metrics.
+        :param phase: Phase name, see :mod:`pi_sht1x.metrics`.
+        :param operation: Callable running the phase.
+        :param args: Arguments of operation.
+        :return: Result of operation.
+        """
+        metrics = self.metrics
+        if metrics is None:
+            return operation(*args)
+        started = metrics.clock()
+        try:
+            return operation(*args)
+        finally:
+            metrics.observe(phase, metrics.clock() - started)
+
+    def _compile_command(self, command):
+        """
+        Compiles the transmission start sequence followed by the command byte into a flat list of pin operations,
+        the same edges _send_byte produces for the command, so _send_command can replay them without recomputing
+        bit masks or dispatching every edge through _toggle_pin. The first START_EDGES operations are the
+        transmission start: DATA falls while SCK is high, SCK pulses low and DATA rises again while SCK is high.
+        :param command: Command byte.
+        :return: List of (pin, state, delay) tuples, delay being the time to sleep after setting the pin.
+        """
+        data, sck = self.data_pin, self.sck_pin
+        edges = [(data, HIGH), (sck, HIGH), (data, LOW), (sck, LOW), (sck, HIGH), (data, HIGH), (sck, LOW)]
+        for i in range(8):
+            edges += [(data, HIGH if command & (1 << 7 - i) else LOW), (sck, HIGH), (sck, LOW)]
+        return [(pin, state, self._sck_delay if pin == sck else 0) for pin, state in edges]
 
     def _wait_for_result(self):
         """
-        Waits for the sensor to complete measurement. The time to complete depends
-        on the number of bits used for measurement:
+        Waits for the sensor to complete measurement, signalled by the sensor pulling the DATA line low. The time
+        to complete depends on the number of bits used for measurement:
             8-bit:  20ms
             12-bit: 80ms
             14-bit: 320ms
-        Raises an exception if the Data Ready signal hasn't been received after 350 milliseconds.
+        With the 'edge' wait strategy the call blocks on the falling edge of the DATA line, otherwise the line is
+        polled. Raises an exception if the Data Ready signal hasn't been received within the conversion timeout.
         :return: None
         """
-        GPIO.setup(self.data_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        data_ready = GPIO.HIGH
-
-        for i in range(35):
-            time.sleep(.01)
-            data_ready = GPIO.input(self.data_pin)
-            if data_ready == GPIO.LOW:
-                self.logger.debug('Measurement complete.')
+        self._setup_pin(self.data_pin, IN, PUD_UP)
+        timeout = self.conversion_timeout()
+        deadline = time.monotonic() + timeout
+
+        data_ready = self.backend.input(self.data_pin)
+        if data_ready == HIGH and self.wait_strategy == 'edge':
+            data_ready = self._wait_for_edge(timeout)
+
+        poll_interval = min(self.POLL_INTERVAL, timeout / 10)
+        while data_ready == HIGH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 break
+            time.sleep(min(poll_interval, remaining))
+            data_ready = self.backend.input(self.data_pin)
 
-        if data_ready == GPIO.HIGH:
-            raise SHT1xError('Sensor has not completed measurement after max time allotment.\n{0}'.format(self))
+        if data_ready == HIGH:
+            raise SHT1xTimeoutError('Sensor has not completed measurement after {0:.0f}ms.\n{1}'.format(timeout * 1000,
+                                                                                                    self))
+        self.logger.debug('Measurement complete.')
+
+    def _wait_for_edge(self, timeout):
+        """
+        Blocks until the DATA line falls or the timeout expires. Falls back to polling for the lifetime of the
+        object if the backend does not support edge detection.
+        :param timeout: Maximum time to wait, in seconds.
+        :return: Level of the DATA line.
+        """
+        try:
+            self.backend.wait_for_edge(self.data_pin, FALLING, timeout=max(int(math.ceil(timeout * 1000)), 1))
+        except (NotImplementedError, RuntimeError) as e:
+            self.logger.warning('Edge detection unavailable, falling back to polling: %s', e)
+            self.wait_strategy = 'poll'
+
+        return self.backend.input(self.data_pin)
+
+    def conversion_timeout(self, command=None):
+        """
+        Maximum time a measurement may take before the sensor is considered unresponsive. It is derived from the
+        data sheet conversion time for the active resolution, plus a margin that grows as the supply voltage
+        drops and the sensor's internal oscillator slows down.
+        :param command: Measurement command, defaults to the command being executed.
+        :return: Timeout in seconds.
+        """
+        command = self._command if command is None else command
+        bits = self._resolution[0] if command == self.Commands['Temperature'] else self._resolution[1]
+        return self.MEASUREMENT_TIME[bits] * (1 + self.VDD_TIMING_MARGIN[self.vdd])
 
     def _read_measurement(self):
         """
@@ -292,6 +620,20 @@ class SHT1x:
         will be read and verified, otherwise the transmission will end.
         :return: 16-bit value.
         """
+        value = self._timed('read', self._read_data)
+
+        if self.crc_check:
+            self._timed('crc', self._validate_crc, value)
+        else:
+            self._transmission_end()
+
+        return value
+
+    def _read_data(self):
+        """
+        Reads the MSB and LSB of a measurement, leaving the transmission open for the CRC byte.
+        :return: 16-bit value.
+        """
         # Get the MSB
         value = self._get_byte()
         value <<= 8
@@ -300,27 +642,105 @@ class SHT1x:
 
         # Get the LSB
         value |= self._get_byte()
+        return value
 
-        if self.crc_check:
-            self._validate_crc(value)
+    def read_raw(self, measurement='Temperature'):
+        """
+        Takes a measurement and returns it unconverted, together with the CRC byte sent by the sensor. The CRC is
+        not validated here, which leaves the check to whoever processes the raw data.
+        :param measurement: 'Temperature' or 'Humidity'.
+        :return: Tuple of the raw 16-bit value and the CRC byte.
+        """
+        return self._transaction(self._measure_raw, self.Commands[measurement])
+
+    def _cached_measure(self, measurement, max_age=None):
+        """
+        Takes a raw measurement through the cache: a value up to max_age seconds old is reused, and threads giving a
+        max_age join a measurement of the same quantity started within it.
+        :param measurement: 'Temperature' or 'Humidity'.
+        :param max_age: Maximum age in seconds of a cached value, None always measures.
+        :return: Raw 16-bit measurement value.
+        """
+        return self.cache.get(measurement, lambda: self._transaction(self._measure, self.Commands[measurement]),
+                              max_age)
+
+    def _transaction(self, operation, *args):
+        """
+        Runs a transaction, through the retry policy if there is one, holding the lock of the pins.
+        """
+        with self.lock:
+            self._prepare()
+            if self.metrics is not None:
+                operation, args = self._metered, (operation,) + args
+            if self.retry_policy is None:
+                return operation(*args)
+            return self.retry_policy.run(self, operation, *args)
+
+    def _metered(self, operation, *args):
+        """
+        Runs a single attempt of a transaction, recording its duration and the type of error it failed with.
+        """
+        metrics = self.metrics
+        started = metrics.clock()
+        try:
+            return operation(*args)
+        except SHT1xError as e:
+            metrics.error(e)
+            raise
+        finally:
+            metrics.observe('transaction', metrics.clock() - started)
+
+    def _take_over(self):
+        """
+        Called with the lock held when another SHT1x object used the pins since this one last held it. The pin
+        directions may have changed, and the Status Register is whatever the other object last knew it to be. If
+        that doesn't match the heater, OTP no reload and resolution settings of this object, they are written
+        again before its next transaction. SCK is set up again, the other object may have cleaned it up.
+        :return: None.
+        """
+        self._pin_config.clear()
+        self._setup_pin(self.sck_pin, OUT)
+        known = self._pins.status_registers.get(self.data_pin)
+        if known is None:
+            self._status_register_cached = False
+            self._configuration_stale = True
         else:
-            self._transmission_end()
+            self._status_register = known
+            self._status_register_cached = True
+            self._configuration_stale = known & 0b00000111 != self._status_register_mask()
 
-        return value
+    def _prepare(self):
+        """
+        Restores the settings of this object if another object on the same pins changed them, see _take_over.
+        :return: None.
+        """
+        if self._configuration_stale:
+            self.reset_connection()
+            self._write_status_register(self._status_register_mask())
+
+    def _measure(self, command):
+        self._command = command
+        self._send_command()
+        return self._read_measurement()
+
+    def _measure_raw(self, command):
+        self._command = command
+        self._send_command()
+        value = self._timed('read', self._read_data)
+        return value, self._timed('crc', self._read_crc)
 
     def _get_byte(self):
         """
         Reads a single byte from the SHT1x sensor.
         :return: 8-bit value.
         """
-        GPIO.setup(self.data_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        GPIO.setup(self.sck_pin, GPIO.OUT)
+        self._setup_pin(self.data_pin, IN, PUD_UP)
 
         data = 0b00000000
         for i in range(8):
-            self._toggle_pin(self.sck_pin, GPIO.HIGH)
-            data |= GPIO.input(self.data_pin) << (7 - i)
-            self._toggle_pin(self.sck_pin, GPIO.LOW)
+            self._toggle_pin(self.sck_pin, HIGH)
+            data |= self.backend.input(self.data_pin) << (7 - i)
+            self._toggle_pin(self.sck_pin, LOW)
 
         return data
 
@@ -330,53 +750,54 @@ class SHT1x:
         :param data: Byte of data to send.
         :return: None
         """
-        GPIO.setup(self.data_pin, GPIO.OUT)
-        GPIO.setup(self.sck_pin, GPIO.OUT)
+        self._setup_pin(self.data_pin, OUT)
 
         for i in range(8):
             self._toggle_pin(self.data_pin, data & (1 << 7 - i))
-            self._toggle_pin(self.sck_pin, GPIO.HIGH)
-            self._toggle_pin(self.sck_pin, GPIO.LOW)
+            self._toggle_pin(self.sck_pin, HIGH)
+            self._toggle_pin(self.sck_pin, LOW)
 
-    def _toggle_pin(self, pin, state):
+    def _setup_pin(self, pin, direction, pull_up_down=PUD_OFF):
         """
-        Toggles the state of the specified pin. If the specified pin is the SCK pin, it will sleep
-        for 100ns after setting its new state.
-        :param pin: Pin to toggle state.
-        :param state: State to change the pin, GPIO.LOW or GPIO.HIGH.
+        Configures the direction and pull resistor of a pin. The configuration of each pin is cached and the
+        backend is only called when it actually changes; every call that reaches the backend is counted in
+        gpio_setup_calls. SCK is configured as an output by reset_connection and _take_over and never changes
+        otherwise.
+        :param pin: Pin to configure.
+        :param direction: IN or OUT.
+        :param pull_up_down: Pull resistor used when the pin is an input.
         :return: None.
         """
-        GPIO.output(pin, state)
-        if pin == self.sck_pin:
-            time.sleep(0.0000001)
+        config = (direction, pull_up_down)
+        if self._pin_config.get(pin) == config:
+            return
+
+        self.backend.setup(pin, direction, pull_up_down=pull_up_down)
+        self._pin_config[pin] = config
+        self.gpio_setup_calls += 1
 
-    def _transmission_start(self):
+    def _toggle_pin(self, pin, state):
         """
-        Sends the transmission start sequence to the sensor to initiate communication.
-        :return: None
+        Toggles the state of the specified pin. If the specified pin is the SCK pin, it will sleep
+        for sck_delay (100ns by default) after setting its new state.
+        :param pin: Pin to toggle state.
+        :param state: State to change the pin, LOW or HIGH.
+        :return: None.
         """
-        GPIO.setup(self.data_pin, GPIO.OUT)
-        GPIO.setup(self.sck_pin, GPIO.OUT)
-
-        self._toggle_pin(self.data_pin, GPIO.HIGH)
-        self._toggle_pin(self.sck_pin, GPIO.HIGH)
-        self._toggle_pin(self.data_pin, GPIO.LOW)
-        self._toggle_pin(self.sck_pin, GPIO.LOW)
-        self._toggle_pin(self.sck_pin, GPIO.HIGH)
-        self._toggle_pin(self.data_pin, GPIO.HIGH)
-        self._toggle_pin(self.sck_pin, GPIO.LOW)
+        self.backend.output(pin, state)
+        if pin == self.sck_pin and self._sck_delay:
+            time.sleep(self._sck_delay)
 
     def _transmission_end(self):
         """
         Sends skip ACK by keeping the DATA line high to bypass CRC and end transmission.
         :return: None.
         """
-        GPIO.setup(self.data_pin, GPIO.OUT)
-        GPIO.setup(self.sck_pin, GPIO.OUT)
+        self._setup_pin(self.data_pin, OUT)
 
-        self._toggle_pin(self.data_pin, GPIO.HIGH)
-        self._toggle_pin(self.sck_pin, GPIO.HIGH)
-        self._toggle_pin(self.sck_pin, GPIO.LOW)
+        self._toggle_pin(self.data_pin, HIGH)
+        self._toggle_pin(self.sck_pin, HIGH)
+        self._toggle_pin(self.sck_pin, LOW)
 
     def _get_ack(self, command_name):
         """
@@ -384,49 +805,61 @@ class SHT1x:
         :param command_name: Command issued to the sensor.
         :return: None
         """
-        GPIO.setup(self.data_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-        GPIO.setup(self.sck_pin, GPIO.OUT)
+        self._setup_pin(self.data_pin, IN, PUD_UP)
 
-        self._toggle_pin(self.sck_pin, GPIO.HIGH)
+        self._toggle_pin(self.sck_pin, HIGH)
 
-        ack = GPIO.input(self.data_pin)
-        self.logger.info('Command {0} [{1:08b}] acknowledged: {1}'.format(command_name, self._command, ack))
-        if ack == GPIO.HIGH:
+        ack = self.backend.input(self.data_pin)
+        if self._log_info:
+            self.logger.info('Command {0} [{1:08b}] acknowledged: {2}'.format(command_name, self._command, ack))
+        if ack == HIGH:
             message = 'SHT1x failed to properly receive command [{0} - {1:08b}]'.format(command_name, self._command)
             self.logger.error(message)
-            raise SHT1xError(message)
+            raise SHT1xAckError(message)
 
-        self._toggle_pin(self.sck_pin, GPIO.LOW)
+        self._toggle_pin(self.sck_pin, LOW)
 
     def _send_ack(self):
         """
         Sends ACK to the SHT1x confirming byte measurement data was received by the caller.
         :return: None.
         """
-        GPIO.setup(self.data_pin, GPIO.OUT)
-        GPIO.setup(self.sck_pin, GPIO.OUT)
+        self._setup_pin(self.data_pin, OUT)
 
-        self._toggle_pin(self.data_pin, GPIO.HIGH)
-        self._toggle_pin(self.data_pin, GPIO.LOW)
-        self._toggle_pin(self.sck_pin, GPIO.HIGH)
-        self._toggle_pin(self.sck_pin, GPIO.LOW)
+        self._toggle_pin(self.data_pin, HIGH)
+        self._toggle_pin(self.data_pin, LOW)
+        self._toggle_pin(self.sck_pin, HIGH)
+        self._toggle_pin(self.sck_pin, LOW)
 
-    def read_status_register(self):
+    def read_status_register(self, cached=False):
         """
-        Retrieves the contents of the Status Register as a binary integer.
-        :return: None.
+        Reads the contents of the Status Register from the sensor as a binary integer, including the read-only bits
+        (bit 6 is set when VDD dropped below 2.47V).
+        :param cached: Return the writable bits 0-2 as last read or written instead, without a transaction, unless a
+        soft reset or a failed transaction invalidated them. The read-only bits are 0 in the cached value.
+        :return: Status Register.
         """
+        if cached and self._status_register_cached:
+            return self._status_register & 0b00000111
+        return self._transaction(self._read_status_register)
+
+    def _read_status_register(self):
         self._command = self.Commands['ReadStatusRegister']
+        self._status_register_cached = False
         self._send_command(measurement=False)
-        self._status_register = self._get_byte()
-        self.logger.debug("Status Register read: {0:08b}".format(self._status_register))
+        self._pins.status_registers[self.data_pin] = None
+        self._status_register = self._timed('read', self._get_byte)
 
         if self.crc_check:
-            self._validate_crc(self._status_register, measurement=False)
+            self._timed('crc', self._validate_crc, self._status_register, False)
         else:
             self._transmission_end()
 
-        self.logger.info("Read Status Register: {0:08b}".format(self._status_register))
+        if self._log_info:
+            self.logger.info("Read Status Register: {0:08b}".format(self._status_register))
+        # Only the writable bits are cached, the read-only ones can change at any time.
+        self._status_register_cached = True
+        self._pins.status_registers[self.data_pin] = self._status_register & 0b00000111
         return self._status_register
 
     def _write_status_register(self, mask):
@@ -452,78 +885,91 @@ class SHT1x:
         """
         self._command = self.Commands['WriteStatusRegister']
         self._send_command(measurement=False)
-        self.logger.info("Writing Status Register: {0:08b}".format(mask))
+        if self._log_info:
+            self.logger.info("Writing Status Register: {0:08b}".format(mask))
 
+        self._status_register_cached = False
+        self._pins.status_registers[self.data_pin] = None
         self._send_byte(mask)
         self._get_ack('WriteStatusRegister')
         self._status_register = mask
+        self._status_register_cached = True
+        self._pins.status_registers[self.data_pin] = mask & 0b00000111
+        self._configuration_stale = False
 
     def reset_status_register(self):
         """
         Resets the Status Register to its default values.
         :return: None.
         """
-        self._write_status_register(self.Commands['NoOp'])
+        with self.lock:
+            self._write_status_register(self.Commands['NoOp'])
 
     def _reverse_byte(self, data):
         """
-        Reverses the byte. Uses the method from Rich Schroeppel:
-            http://graphics.stanford.edu/~seander/bithacks.html#ReverseByteWith64BitsDiv
+        Reverses the byte, using the precomputed CRC.REVERSED table.
         :param data: Byte to be reversed.
         :return: Byte
         """
-        return (data * 8623620610 & 1136090292240) % 1023
+        return CRC.REVERSED[data]
 
     def _reverse_status_register(self):
         """
         Reverses the Status Register byte.
         :return: Status Register byte reversed
         """
-        sr_reversed = self._reverse_byte(self._status_register)
-        crc_register = (sr_reversed >> 4) << 4
-        self.logger.info("Status register reversed: {0:08b}".format(crc_register))
+        return CRC.START[self._status_register]
 
-        return crc_register
-
-    def _validate_crc(self, data, measurement=True):
+    def _calculate_crc(self, data, measurement=True, command=None):
         """
-        Performs CRC validation using Byte-wise calculation.
+        Calculates the CRC value the sensor is expected to send for the given data, using Byte-wise calculation.
         :param data: Data retrieved from the SHT1x sensor, either measurement data or from the Status Register.
         :param measurement: Indicates if the data parameter is from a measurement or from reading the Status Register.
-        :return: None.
+        :param command: Command the data answers, defaults to the command being executed.
+        :return: CRC value, bit reversed to match the byte sent by the sensor.
+        """
+        command = self._command if command is None else command
+        crc_final_reversed = CRC.calculate(self._status_register, command, data, measurement)
+        if self._log_info:
+            self.logger.info('Sensor data (MSB and LSB): {0:016b}\nCRC start value: {1:08b}\n'
+                             'CRC calculated value (reversed): {2:08b}'.format(data, self._reverse_status_register(),
+                                                                                crc_final_reversed))
+        return crc_final_reversed
+
+    def _read_crc(self):
+        """
+        Acknowledges the last data byte, reads the CRC byte and ends the transmission.
+        :return: CRC byte as sent by the sensor.
         """
         self._send_ack()
         crc_value = self._get_byte()
         self._transmission_end()
-        self.logger.info('CRC value from sensor: {0:08b}'.format(crc_value))
+        return crc_value
 
-        crc_start_value = self._reverse_status_register()
-        self.logger.info('CRC start value: {0:08b}'.format(crc_start_value))
-
-        crc_lookup = CRC.LOOK_UP[int(crc_start_value ^ self._command)]
-        self.logger.info('CRC command lookup value: {0:08b}'.format(crc_lookup))
-
-        self.logger.info('Sensor data (MSB and LSB): {0:016b}'.format(data))
-        if measurement:
-            crc_lookup = CRC.LOOK_UP[int(crc_lookup ^ (data >> 8))]
-            self.logger.info('CRC MSB lookup value: {0:08b}'.format(crc_lookup))
-
-            crc_final = CRC.LOOK_UP[int(crc_lookup ^ (data & 0b0000000011111111))]
-            self.logger.info('CRC LSB lookup value: {0:08b}'.format(crc_final))
-        else:
-            crc_final = CRC.LOOK_UP[int(crc_lookup ^ data)]
-            self.logger.info('CRC data lookup value: {0:08b}'.format(crc_final))
-
-        crc_final_reversed = self._reverse_byte(crc_final)
-        self.logger.info('CRC calculated value (reversed): {0:08b}'.format(crc_final_reversed))
+    def _validate_crc(self, data, measurement=True):
+        """
+        Performs CRC validation using Byte-wise calculation.
+        :param data: Data retrieved from the SHT1x sensor, either measurement data or from the Status Register.
+        :param measurement: Indicates if the data parameter is from a measurement or from reading the Status Register.
+        :return: None.
+        """
+        crc_value = self._read_crc()
+        crc_final_reversed = self._calculate_crc(data, measurement)
+        if self._log_info:
+            self.logger.info('CRC value from sensor: {0:08b}'.format(crc_value))
 
         if crc_value != crc_final_reversed:
-            self.soft_reset()
-            message = 'CRC error! Sensor has been reset, please try again.\n' \
-                      'CRC value from sensor: {0:08b}\nCRC calculated value: {1:08b}'.format(crc_value,
-                                                                                             crc_final_reversed)
+            message = 'CRC value from sensor: {0:08b}\nCRC calculated value: {1:08b}'.format(crc_value,
+                                                                                          crc_final_reversed)
+            if self.retry_policy is None:
+                # Without a retry policy the sensor is reset right away, keeping its heater, OTP and resolution
+                # settings. A retry policy escalates to a reset itself when re-reading doesn't help.
+                self.soft_reset(restore=True)
+                message = 'CRC error! Sensor has been reset, please try again.\n' + message
+            else:
+                message = 'CRC error!\n' + message
             self.logger.error(message)
-            raise SHT1xError(message)
+            raise SHT1xCRCError(message)
 
         return
 
@@ -532,24 +978,52 @@ class SHT1x:
         Resets the serial interface to the Sht1x sensor. The status register preserves its content.
         :return: None.
         """
-        GPIO.setup(self.data_pin, GPIO.OUT)
-        GPIO.setup(self.sck_pin, GPIO.OUT)
+        with self.lock:
+            self._setup_pin(self.data_pin, OUT)
+            self._setup_pin(self.sck_pin, OUT)
 
-        self._toggle_pin(self.data_pin, GPIO.HIGH)
-        for i in range(10):
-            self._toggle_pin(self.sck_pin, GPIO.HIGH)
-            self._toggle_pin(self.sck_pin, GPIO.LOW)
+            self._toggle_pin(self.data_pin, HIGH)
+            for i in range(10):
+                self._toggle_pin(self.sck_pin, HIGH)
+                self._toggle_pin(self.sck_pin, LOW)
 
-    def soft_reset(self):
+    def soft_reset(self, restore=False):
         """
         Performs a soft reset of the SHT1x sensor. This resets the interface, clears the status register to
         default values, and waits 15ms (11ms is the recommended minimum) before next command.
+        :param restore: Write the heater, OTP no reload and resolution settings of the object back to the status
+        register after the reset.
         :return: None.
         """
+        with self.lock:
+            self._timed('soft_reset', self._soft_reset, restore)
+
+    def _soft_reset(self, restore):
         self._command = self.Commands['SoftReset']
         self._send_command(measurement=False)
         time.sleep(.015)
         self._status_register = 0b00000000
+        self._status_register_cached = False
+        self._pins.status_registers[self.data_pin] = 0b00000000
+        self._configuration_stale = False
+        self.cache.clear()
+        if restore:
+            self.initialize_sensor()
+
+    def recover(self, step):
+        """
+        Recovers from a failed transaction, see :class:`pi_sht1x.retry.RetryPolicy`.
+        :param step: 'reread' (nothing to do), 'reset_connection' or 'soft_reset' (restoring the status register).
+        :return: None.
+        """
+        self._status_register_cached = False
+        if step == 'reset_connection':
+            self.reset_connection()
+        elif step == 'soft_reset':
+            self.reset_connection()
+            self.soft_reset(restore=True)
+        elif step != 'reread':
+            raise SHT1xError('Unknown recovery step: {0}'.format(step))
 
     def __str__(self):
         celsius = self.temperature_celsius if self.temperature_celsius is not None else '-'
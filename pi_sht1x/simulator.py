@@ -0,0 +1,348 @@
+"""
+In-process simulation of the SHT1x serial protocol. The simulated sensor follows the bus at the level of single
+SCK and DATA edges, so the library can be exercised and profiled on machines without GPIO hardware:
+
+    backend = SimulatedBackend()
+    backend.attach(SimulatedSHT1x(18, 23, temperature=21.5, humidity=40.0))
+    with SHT1x(18, 23, gpio_mode=BCM, backend=backend) as sensor:
+        sensor.read_temperature()
+"""
+import math
+import time
+
+from .backends import GPIOBackend, OUT, IN, LOW, HIGH, PUD_OFF, PUD_DOWN, FALLING, BOTH
+from .sht1x import SHT1x, COF, CRC
+
+IDLE = 'idle'
+COMMAND = 'command'
+COMMAND_ACK = 'command-ack'
+MEASURING = 'measuring'
+WRITE = 'write'
+WRITE_ACK = 'write-ack'
+SEND = 'send'
+HOST_ACK = 'host-ack'
+
+
+def _reverse_byte(data):
+    return (data * 8623620610 & 1136090292240) % 1023
+
+
+class SimulatedSHT1x:
+    """
+    Protocol state machine of a single SHT1x sensor wired to a DATA and a SCK pin. The sensor converts the
+    configured physical ``temperature`` (°C) and ``humidity`` (%RH) into raw counts using the same coefficients
+    as the library, for the supply voltage ``vdd`` and the resolution selected in its status register.
+    """
+    RESET_CLOCKS = 9
+    MIN_CONVERSION_TIME = 0.001
+
+    def __init__(self, data_pin, sck_pin, temperature=25.0, humidity=50.0, vdd=3.5, time_scale=1.0,
+                 clock=time.monotonic):
+        """
+        :param data_pin: DATA pin the sensor is wired to.
+        :param sck_pin: SCK pin the sensor is wired to.
+        :param temperature: Temperature reported by the sensor, in celsius.
+        :param humidity: Relative humidity reported by the sensor.
+        :param vdd: Supply voltage of the sensor, one of the values of SHT1x.VDD.
+        :param time_scale: Factor applied to the conversion times. Conversions never complete in less than
+        MIN_CONVERSION_TIME, so the host can still see the DATA line released after the command.
+        :param clock: Monotonic clock used to time conversions.
+        """
+        self.data_pin = data_pin
+        self.sck_pin = sck_pin
+        self.temperature = temperature
+        self.humidity = humidity
+        self.vdd = vdd
+        self.time_scale = time_scale
+        self.clock = clock
+        self.status_register = 0b00000000
+        self.commands_received = 0
+        self.measurements = 0
+        self._state = IDLE
+        self._drive = HIGH
+        self._sck = LOW
+        self._shift = 0
+        self._bits = 0
+        self._command = None
+        self._ready_at = None
+        self._out_bytes = []
+        self._out_bit = 0
+        self._host_acked = False
+        self._start_armed = False
+        self._reset_clocks = 0
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def resolution(self):
+        return SHT1x.RESOLUTION['Low'] if self.status_register & 1 else SHT1x.RESOLUTION['High']
+
+    def data_level(self):
+        """
+        Level the sensor drives on the open-drain DATA line, HIGH when the line is released.
+        """
+        return self._drive
+
+    def conversion_time(self, command):
+        bits = self.resolution[0] if command == SHT1x.Commands['Temperature'] else self.resolution[1]
+        return max(SHT1x.MEASUREMENT_TIME[bits] * self.time_scale, self.MIN_CONVERSION_TIME)
+
+    def raw_temperature(self):
+        bits = self.resolution[0]
+        raw = round((self.temperature - COF.D1_VDD_C[self.vdd]) / COF.D2_SO_C[bits])
+        return min(max(raw, 0), (1 << bits) - 1)
+
+    def raw_humidity(self):
+        bits = self.resolution[1]
+        compensation = self.temperature - 25
+        a = COF.C3_SO[bits]
+        b = COF.C2_SO[bits] + compensation * COF.T2_SO[bits]
+        c = COF.C1_SO[bits] + compensation * COF.T1_SO[bits] - self.humidity
+        discriminant = max(b * b - 4 * a * c, 0)
+        raw = round((-b + math.sqrt(discriminant)) / (2 * a))
+        return min(max(raw, 0), (1 << bits) - 1)
+
+    def crc(self, command, data):
+        """
+        Computes the CRC byte transmitted after ``data``, following the same byte-wise calculation as the library.
+        :param command: Command the data answers.
+        :param data: List of bytes sent by the sensor.
+        :return: CRC byte, bit reversed as it is sent on the wire.
+        """
+        crc = (_reverse_byte(self.status_register & 0b00001111) >> 4) << 4
+        crc = CRC.LOOK_UP[crc ^ command]
+        for byte in data:
+            crc = CRC.LOOK_UP[crc ^ byte]
+        return _reverse_byte(crc)
+
+    def update(self):
+        """
+        Advances time dependent state, signalling Data Ready once a conversion has completed.
+        :return: None.
+        """
+        if self._state == MEASURING and self.clock() >= self._ready_at:
+            if self._command == SHT1x.Commands['Temperature']:
+                raw = self.raw_temperature()
+            else:
+                raw = self.raw_humidity()
+            data = [raw >> 8, raw & 0xFF]
+            self.measurements += 1
+            self._send(data + [self.crc(self._command, data)])
+
+    def time_to_ready(self):
+        """
+        Seconds until the running conversion completes, None if no conversion is running.
+        """
+        if self._state != MEASURING:
+            return None
+        return max(self._ready_at - self.clock(), 0)
+
+    def data_edge(self, level, sck):
+        """
+        Called by the backend when the host changes the level of the DATA line.
+        :param level: New level of the DATA line.
+        :param sck: Current level of the SCK line.
+        :return: None.
+        """
+        if sck != HIGH or self._state == MEASURING:
+            return
+        if level == LOW:
+            self._start_armed = True
+        elif self._start_armed:
+            self._start_armed = False
+            self._receive(COMMAND)
+
+    def clock_edge(self, level, data):
+        """
+        Called by the backend when the host changes the level of the SCK line.
+        :param level: New level of the SCK line.
+        :param data: Current level of the DATA line.
+        :return: None.
+        """
+        if level == self._sck:
+            return
+        self._sck = level
+        self.update()
+        if level == HIGH:
+            self._rising_edge(data)
+        else:
+            self._falling_edge()
+
+    def _rising_edge(self, data):
+        if self._state != MEASURING:
+            self._reset_clocks = self._reset_clocks + 1 if data else 0
+            if self._reset_clocks >= self.RESET_CLOCKS:
+                self._idle()
+                return
+
+        if self._state in (COMMAND, WRITE):
+            self._shift = ((self._shift << 1) | (1 if data else 0)) & 0xFF
+            self._bits += 1
+        elif self._state == HOST_ACK:
+            self._host_acked = not data
+
+    def _falling_edge(self):
+        if self._state == COMMAND and self._bits == 8:
+            self._command = self._shift
+            self.commands_received += 1
+            if self._command in SHT1x.Commands.values() and self._command != SHT1x.Commands['NoOp']:
+                self._state = COMMAND_ACK
+                self._drive = LOW
+            else:
+                self._idle()
+        elif self._state == COMMAND_ACK:
+            self._drive = HIGH
+            self._execute()
+        elif self._state == WRITE and self._bits == 8:
+            self.status_register = (self.status_register & 0b11111000) | (self._shift & 0b00000111)
+            self._state = WRITE_ACK
+            self._drive = LOW
+        elif self._state == WRITE_ACK:
+            self._idle()
+        elif self._state == SEND:
+            self._out_bit += 1
+            if self._out_bit < 8:
+                self._drive = (self._out_bytes[0] >> (7 - self._out_bit)) & 1
+            else:
+                self._state = HOST_ACK
+                self._drive = HIGH
+        elif self._state == HOST_ACK:
+            self._out_bytes.pop(0)
+            if self._host_acked and self._out_bytes:
+                self._send(self._out_bytes)
+            else:
+                self._idle()
+
+    def _execute(self):
+        if self._command in (SHT1x.Commands['Temperature'], SHT1x.Commands['Humidity']):
+            self._state = MEASURING
+            self._ready_at = self.clock() + self.conversion_time(self._command)
+        elif self._command == SHT1x.Commands['ReadStatusRegister']:
+            self._send([self.status_register, self.crc(self._command, [self.status_register])])
+        elif self._command == SHT1x.Commands['WriteStatusRegister']:
+            self._receive(WRITE)
+        else:
+            self.status_register = 0b00000000
+            self._idle()
+
+    def _receive(self, state):
+        self._state = state
+        self._drive = HIGH
+        self._shift = 0
+        self._bits = 0
+
+    def _send(self, data):
+        self._state = SEND
+        self._out_bytes = list(data)
+        self._out_bit = 0
+        self._drive = (self._out_bytes[0] >> 7) & 1
+
+    def _idle(self):
+        self._state = IDLE
+        self._drive = HIGH
+        self._ready_at = None
+        self._out_bytes = []
+        self._reset_clocks = 0
+
+
+class SimulatedBackend(GPIOBackend):
+    """
+    GPIO backend connecting the library to one or more :class:`SimulatedSHT1x` sensors. DATA lines are modelled
+    as open-drain lines: the level seen on a pin is the AND of the host and every sensor driving it, and a
+    released line floats HIGH unless the host enables the pull-down.
+    """
+    name = 'simulated'
+
+    def __init__(self, sensors=()):
+        self.mode = None
+        self.sensors = []
+        self._functions = {}
+        self._pulls = {}
+        self._outputs = {}
+        for sensor in sensors:
+            self.attach(sensor)
+
+    def attach(self, sensor):
+        """
+        Wires a simulated sensor to the backend.
+        :param sensor: SimulatedSHT1x instance.
+        :return: The sensor.
+        """
+        self.sensors.append(sensor)
+        return sensor
+
+    def level(self, pin):
+        """
+        Current level of the given line, taking the host and all attached sensors into account.
+        """
+        if self._functions.get(pin, IN) == OUT:
+            level = self._outputs.get(pin, LOW)
+        else:
+            level = LOW if self._pulls.get(pin, PUD_OFF) == PUD_DOWN else HIGH
+        for sensor in self.sensors:
+            if sensor.data_pin == pin:
+                sensor.update()
+                level &= sensor.data_level()
+        return level
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pin, direction, pull_up_down=PUD_OFF):
+        previous = self.level(pin)
+        self._functions[pin] = direction
+        self._pulls[pin] = pull_up_down
+        self._changed(pin, previous)
+
+    def output(self, pin, state):
+        if self._functions.get(pin, IN) != OUT:
+            raise RuntimeError('The GPIO channel has not been set up as an OUTPUT')
+        previous = self.level(pin)
+        self._outputs[pin] = HIGH if state else LOW
+        self._changed(pin, previous)
+
+    def input(self, pin):
+        return self.level(pin)
+
+    def wait_for_edge(self, pin, edge, timeout=None):
+        """
+        Sleeps until the attached sensors complete their conversion and pull the line low. Only falling edges
+        caused by a conversion can occur while the host is waiting, any other wait times out.
+        """
+        delays = [sensor.time_to_ready() for sensor in self.sensors if sensor.data_pin == pin]
+        delays = [delay for delay in delays if delay is not None]
+        timeout = None if timeout is None else timeout / 1000
+        if edge in (FALLING, BOTH) and delays and self.level(pin) == HIGH:
+            delay = min(delays)
+            if timeout is None or delay <= timeout:
+                time.sleep(delay)
+                if self.level(pin) == LOW:
+                    return pin
+                return None
+        if timeout is None:
+            raise RuntimeError('Waiting forever for an edge that the simulation will never produce')
+        time.sleep(timeout)
+        return None
+
+    def gpio_function(self, pin):
+        return self._functions.get(pin, IN)
+
+    def cleanup(self, pins=None):
+        for pin in list(self._functions) if pins is None else pins:
+            previous = self.level(pin)
+            self._functions.pop(pin, None)
+            self._pulls.pop(pin, None)
+            self._outputs.pop(pin, None)
+            self._changed(pin, previous)
+
+    def _changed(self, pin, previous):
+        level = self.level(pin)
+        if level == previous:
+            return
+        for sensor in self.sensors:
+            if sensor.sck_pin == pin:
+                sensor.clock_edge(level, self.level(sensor.data_pin))
+            elif sensor.data_pin == pin:
+                sensor.data_edge(level, self.level(sensor.sck_pin))
@@ -0,0 +1,369 @@
+"""
+Buffered output of readings to CSV, SQLite and InfluxDB line protocol files. Sinks collect readings in memory and
+write them in batches, when batch_size readings are buffered or the oldest has waited flush_interval seconds, so
+storage I/O is amortized over many samples. A SinkWriter feeds one or more sinks from a background thread,
+subscribed to the readings of the sensors attached to it:
+
+    with SinkWriter([CSVSink('readings.csv'), SQLiteSink('readings.db')]) as writer:
+        writer.attach(sensor, 'greenhouse')
+        for reading in sensor.stream(rate=1):
+            pass
+"""
+import csv
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+COLUMNS = ('sensor', 'timestamp', 'temperature_celsius', 'temperature_fahrenheit', 'humidity', 'dew_point',
+           'temperature_bits', 'humidity_bits', 'crc_ok')
+
+
+def record(reading, sensor=None):
+    """
+    Flattens a reading into a tuple of COLUMNS.
+    :param reading: Reading.
+    :param sensor: Name of the sensor, None if there is only one.
+    :return: Tuple.
+    """
+    temperature_bits, humidity_bits = reading.resolution
+    return (sensor, reading.timestamp, reading.temperature_celsius, reading.temperature_fahrenheit,
+            reading.humidity, reading.dew_point, temperature_bits, humidity_bits, reading.crc_ok)
+
+
+class Sink:
+    """
+    Base class of the sinks, buffering records until they are flushed. Subclasses write a batch of records in
+    _write and release their resources in _close.
+
+    A batch that fails to be written stays buffered and is retried flush_interval later, so a file sink may write
+    part of it twice. While writes keep failing, at most max_buffered records are kept, the oldest are dropped
+    and counted in dropped.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=30.0, max_buffered=None):
+        """
+        :param batch_size: Number of buffered readings that triggers a flush.
+        :param flush_interval: Maximum time in seconds a reading stays buffered.
+        :param max_buffered: Maximum number of buffered readings while writes fail, defaults to 10 batches.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered if max_buffered is not None else batch_size * 10
+        self.written = 0
+        self.flushes = 0
+        self.dropped = 0
+        self._buffer = []
+        self._buffered_at = None
+        self._failing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, reading, sensor=None):
+        """
+        Buffers a reading, flushing the buffer when it is full or has been waiting for flush_interval.
+        :param reading: Reading.
+        :param sensor: Name of the sensor.
+        :return: None.
+        """
+        if not self._buffer:
+            self._buffered_at = time.monotonic()
+        self._buffer.append(record(reading, sensor))
+        if len(self._buffer) > self.max_buffered:
+            self._drop(len(self._buffer) - self.max_buffered)
+        # After a failed write, wait for flush_interval instead of retrying with every reading.
+        if len(self._buffer) >= self.batch_size and not self._failing or self.flush_due():
+            self.flush()
+
+    def flush_due(self):
+        """
+        :return: True when buffered readings have waited for flush_interval.
+        """
+        return bool(self._buffer) and time.monotonic() - self._buffered_at >= self.flush_interval
+
+    def flush(self):
+        """
+        Writes the buffered readings. They are only removed from the buffer once written.
+        :return: None.
+        """
+        if not self._buffer:
+            return
+        try:
+            self._write(self._buffer)
+        except Exception:
+            self._failing = True
+            self._buffered_at = time.monotonic()
+            raise
+        self.written += len(self._buffer)
+        self.flushes += 1
+        self._buffer = []
+        self._failing = False
+
+    def close(self):
+        """
+        Flushes the buffered readings and closes the sink.
+        :return: None.
+        """
+        try:
+            self.flush()
+        except Exception:
+            self._drop(len(self._buffer))
+            raise
+        finally:
+            self._close()
+
+    def _drop(self, count):
+        del self._buffer[:count]
+        self.dropped += count
+
+    def _write(self, records):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class _FileSink(Sink):
+    """
+    Sink appending to a text file, flushed to the OS after every batch and optionally synced to storage.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=30.0, fsync=False, max_buffered=None):
+        """
+        :param path: Path of the file, appended to if it exists.
+        :param fsync: Sync the file to storage after every batch.
+        """
+        super().__init__(batch_size, flush_interval, max_buffered)
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+
+class CSVSink(_FileSink):
+    """
+    Writes readings to a CSV file with a header row of COLUMNS.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=30.0, fsync=False, max_buffered=None):
+        super().__init__(path, batch_size, flush_interval, fsync, max_buffered)
+        self._writer = csv.writer(self._file)
+        if self._file.tell() == 0:
+            self._writer.writerow(COLUMNS)
+            self._sync()
+
+    def _write(self, records):
+        self._writer.writerows(records)
+        self._sync()
+
+
+class LineProtocolSink(_FileSink):
+    """
+    Writes readings in the InfluxDB line protocol, with nanosecond timestamps:
+
+        sht1x,sensor=greenhouse temperature_celsius=21.5,...,humidity_bits=12i,crc_ok=true 1700000000000000000
+    """
+    FIELDS = ('temperature_celsius', 'temperature_fahrenheit', 'humidity', 'dew_point')
+
+    def __init__(self, path, measurement='sht1x', tags=None, batch_size=500, flush_interval=30.0, fsync=False,
+                 max_buffered=None):
+        """
+        :param measurement: Measurement name.
+        :param tags: Dictionary of tags added to every line, besides the sensor name.
+        """
+        super().__init__(path, batch_size, flush_interval, fsync, max_buffered)
+        self.measurement = self._escape(measurement)
+        self._tags = ''.join(',{0}={1}'.format(self._escape(key), self._escape(value))
+                             for key, value in sorted((tags or {}).items()))
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace('\\', '\\\\').replace(',', r'\,').replace('=', r'\=').replace(' ', r'\ ')
+
+    def line(self, values):
+        """
+        Formats a record as a line.
+        :param values: Tuple of COLUMNS.
+        :return: String, without the line feed.
+        """
+        values = dict(zip(COLUMNS, values))
+        tags = self._tags if values['sensor'] is None else ',sensor={0}{1}'.format(self._escape(values['sensor']),
+                                                                                  self._tags)
+        fields = ['{0}={1!r}'.format(field, float(values[field])) for field in self.FIELDS
+                  if values[field] is not None]
+        fields.append('temperature_bits={0}i,humidity_bits={1}i'.format(values['temperature_bits'],
+                                                                         values['humidity_bits']))
+        if values['crc_ok'] is not None:
+            fields.append('crc_ok={0}'.format('true' if values['crc_ok'] else 'false'))
+        return '{0}{1} {2} {3}'.format(self.measurement, tags, ','.join(fields), int(values['timestamp'] * 1e9))
+
+    def _write(self, records):
+        self._file.write(''.join(self.line(values) + '\n' for values in records))
+        self._sync()
+
+
+class SQLiteSink(Sink):
+    """
+    Inserts readings into an SQLite table, one transaction with a single executemany per batch.
+    """
+
+    def __init__(self, path, table='readings', batch_size=500, flush_interval=30.0, max_buffered=None):
+        """
+        :param path: Path of the database file.
+        :param table: Table the readings are inserted into, created if it doesn't exist.
+        """
+        super().__init__(batch_size, flush_interval, max_buffered)
+        self.path = path
+        self.table = table
+        # Sinks are usually created on one thread and written by a SinkWriter thread.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS "{0}" (sensor TEXT, timestamp REAL, '
+                                     'temperature_celsius REAL, temperature_fahrenheit REAL, humidity REAL, '
+                                     'dew_point REAL, temperature_bits INTEGER, humidity_bits INTEGER, '
+                                     'crc_ok INTEGER)'.format(table))
+        self._insert = 'INSERT INTO "{0}" ({1}) VALUES ({2})'.format(table, ', '.join(COLUMNS),
+                                                                      ', '.join('?' * len(COLUMNS)))
+
+    def _write(self, records):
+        with self._connection:
+            self._connection.executemany(self._insert, records)
+
+    def _close(self):
+        self._connection.close()
+
+
+class SinkWriter:
+    """
+    Writes readings to sinks on a background thread. Producers only put readings on a bounded queue, readings that
+    don't fit are dropped and counted rather than delaying the sampling thread. The sinks are closed, flushing
+    their buffers, when the writer stops.
+    """
+    _STOP = object()
+    ERRORS = (OSError, sqlite3.Error, csv.Error)
+
+    def __init__(self, sinks, queue_size=4096):
+        """
+        :param sinks: Sinks to write to, owned by the writer from now on.
+        :param queue_size: Maximum number of readings waiting for the writer thread.
+        """
+        self.sinks = list(sinks)
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._subscriptions = []
+        self._thread = None
+        # Wake up often enough to honour the shortest flush interval while no readings arrive.
+        self._poll_interval = min([sink.flush_interval for sink in self.sinks] + [1.0])
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts the writer thread.
+        :return: None.
+        """
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name='SHT1x sink writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Detaches from the sensors, writes the queued readings and closes the sinks.
+        :param timeout: Maximum time to wait for the thread, in seconds.
+        :return: None.
+        """
+        for sensor, callback in self._subscriptions:
+            sensor.unsubscribe(callback)
+        self._subscriptions = []
+        if self.running:
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def attach(self, sensor, name=None):
+        """
+        Writes every reading of the sensor, see SHT1x.subscribe.
+        :param sensor: SHT1x object.
+        :param name: Name of the sensor in the written records.
+        :return: None.
+        """
+        def callback(reading):
+            self.write(reading, name)
+        sensor.subscribe(callback)
+        self._subscriptions.append((sensor, callback))
+
+    def write(self, reading, sensor=None):
+        """
+        Queues a reading for the sinks, without blocking.
+        :param reading: Reading.
+        :param sensor: Name of the sensor.
+        :return: False if the queue was full and the reading dropped.
+        """
+        try:
+            self._queue.put_nowait((reading, sensor))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def stats(self):
+        """
+        :return: Dictionary of the writer counters.
+        """
+        return {'written': self.written, 'dropped': self.dropped, 'errors': self.errors,
+                'queued': self._queue.qsize(), 'flushes': sum(sink.flushes for sink in self.sinks),
+                'sink_dropped': sum(sink.dropped for sink in self.sinks)}
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self._poll_interval)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                break
+            for sink in self.sinks:
+                try:
+                    if item is not None:
+                        sink.write(*item)
+                    if sink.flush_due():
+                        sink.flush()
+                except self.ERRORS as e:
+                    self._failed(e)
+            if item is not None:
+                self.written += 1
+
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except self.ERRORS as e:
+                self._failed(e)
+
+    def _failed(self, error):
+        # A failing sink must not stop the others, its error is counted and kept for the caller.
+        self.errors += 1
+        self.last_error = error
@@ -24,7 +24,7 @@ classifiers = ['Development Status :: 5 - Production/Stable',
                'Intended Audience :: System Administrators',
                'License :: OSI Approved :: MIT License',
                'Operating System :: POSIX :: Linux',
-               'Programming Language :: Python :: 3.4',
+               'Programming Language :: Python :: 3.7',
                'Programming Language :: Python :: 3 :: Only',
                'Topic :: Home Automation',
                'Topic :: Scientific/Engineering :: Atmospheric Science',
@@ -46,9 +46,22 @@ setup(
     include_package_data=True,
     download_url=download_url,
     packages=['pi_sht1x', 'examples'],
+    python_requires='>=3.7',
+    # RPi.GPIO only builds on the Raspberry Pi, other hosts can use the simulated and gpiomem backends, or install
+    # the rpi extra.
     install_requires=[
-        'RPi.GPIO>=0.7.0',
+        "RPi.GPIO>=0.7.0; sys_platform == 'linux' and (platform_machine == 'armv6l' or platform_machine == 'armv7l'"
+        " or platform_machine == 'aarch64')",
     ],
+    extras_require={
+        'rpi': ['RPi.GPIO>=0.7.0'],
+    },
+    entry_points={
+        'console_scripts': [
+            'pi-sht1x=pi_sht1x.cli:main',
+            'pi-sht1x-daemon=pi_sht1x.daemon:main',
+        ],
+    },
     classifiers=classifiers,
     keywords='sht sensor sht1x sensirion T temperature humidity RH dew-point celsius measurement'
              ' gpio serial 2-wire crc crc-8 hardware driver ic'
@@ -0,0 +1,45 @@
+import pytest
+
+from pi_sht1x import SHT1x, SimulatedBackend, SimulatedSHT1x
+
+DATA_PIN = 18
+SCK_PIN = 23
+# Long enough that the host always samples the DATA line before a simulated conversion completes.
+TIME_SCALE = 0.05
+
+
+@pytest.fixture
+def simulated():
+    return SimulatedSHT1x(DATA_PIN, SCK_PIN, temperature=21.0, humidity=40.0, time_scale=TIME_SCALE)
+
+
+@pytest.fixture
+def backend(simulated):
+    return SimulatedBackend([simulated])
+
+
+@pytest.fixture
+def sensor(backend):
+    with SHT1x(DATA_PIN, SCK_PIN, backend=backend) as sensor:
+        yield sensor
+
+
+
+@pytest.fixture
+def corrupt_crc(simulated):
+    """
+    Makes the simulated sensor send a wrong CRC byte for the given numbers of CRC bytes sent from now on,
+    counting from 1.
+    """
+    crc = simulated.crc
+    sent = [0]
+
+    def corrupt(numbers):
+        sent[0] = 0
+
+        def wrong_crc(command, data):
+            sent[0] += 1
+            return crc(command, data) ^ (1 if sent[0] in numbers else 0)
+        simulated.crc = wrong_crc
+    yield corrupt
+    simulated.crc = crc
@@ -0,0 +1,54 @@
+import random
+import statistics
+
+import pytest
+
+from pi_sht1x import Oversampler, SlidingWindow, TumblingWindow
+from pi_sht1x.sht1x import Reading
+
+
+def reading(timestamp, celsius, humidity=40.0, dew_point=7.0):
+    return Reading(timestamp, celsius, celsius * 1.8 + 32, humidity, dew_point, (14, 12), True)
+
+
+def test_sliding_window_with_equal_timestamps():
+    window = SlidingWindow(60, max_samples=3)
+    for celsius in (20.0, 25.0, 21.0, 22.0, 23.0):
+        aggregate = window.add(reading(1000.0, celsius))
+    # 20.0 and 25.0 were evicted, both share their timestamp with the readings left in the window.
+    assert (aggregate.temperature_celsius.min, aggregate.temperature_celsius.max) == (21.0, 23.0)
+    assert aggregate.temperature_celsius.count == 3
+
+
+def test_sliding_window_matches_a_full_recomputation():
+    rng = random.Random(1)
+    window, readings = SlidingWindow(10), []
+    timestamp = 0.0
+    for i in range(200):
+        # Several readings per timestamp now and then.
+        timestamp += rng.choice((0.0, 0.5, 1.0, 3.0))
+        readings.append(reading(timestamp, round(rng.uniform(15, 25), 2)))
+        aggregate = window.add(readings[-1])
+        values = [r.temperature_celsius for r in readings if timestamp - r.timestamp <= 10]
+        assert aggregate.temperature_celsius.count == len(values)
+        assert aggregate.temperature_celsius.min == min(values)
+        assert aggregate.temperature_celsius.max == max(values)
+        assert aggregate.temperature_celsius.mean == pytest.approx(statistics.mean(values))
+
+
+def test_tumbling_window_emits_on_the_next_window():
+    window = TumblingWindow(60)
+    assert window.add(reading(120.0, 20.0)) is None
+    assert window.add(reading(150.0, 22.0)) is None
+    aggregate = window.add(reading(180.0, 30.0))
+    assert (aggregate.start, aggregate.end) == (120.0, 180.0)
+    assert aggregate.temperature_celsius.mean == pytest.approx(21.0)
+    assert window.flush().temperature_celsius.count == 1
+
+
+def test_oversampler_averages_n_readings():
+    oversampler = Oversampler(2)
+    assert oversampler.add(reading(1.0, 20.0, humidity=40.0)) is None
+    averaged = oversampler.add(reading(2.0, 22.0, humidity=42.0))
+    assert averaged.timestamp == 1.0
+    assert (averaged.temperature_celsius, averaged.humidity) == pytest.approx((21.0, 41.0))
@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+
+from pi_sht1x import AsyncSHT1x, SimulatedBackend, SimulatedSHT1x, read_sensors
+
+
+def test_read_all(sensor):
+    temperature, humidity, dew_point = asyncio.run(AsyncSHT1x.from_sensor(sensor).read_all())
+    assert temperature == pytest.approx(21.0, abs=0.05)
+    assert humidity == pytest.approx(40.0, abs=0.1)
+    assert dew_point == pytest.approx(sensor.calculate_dew_point(temperature, humidity))
+
+
+def test_wrapper_is_used_by_several_event_loops(backend):
+    wrapper = AsyncSHT1x(18, 23, backend=backend)
+
+    async def read():
+        return await asyncio.gather(wrapper.read_temperature(), wrapper.read_temperature())
+
+    assert asyncio.run(read()) == pytest.approx([21.0] * 2, abs=0.05)
+    assert asyncio.run(read()) == pytest.approx([21.0] * 2, abs=0.05)
+
+
+def test_wrappers_on_the_same_pins_do_not_overlap(sensor):
+    async def read():
+        first, second = AsyncSHT1x.from_sensor(sensor), AsyncSHT1x.from_sensor(sensor)
+        return await asyncio.gather(*(wrapper.read_temperature() for wrapper in (first, second, first, second)))
+
+    assert asyncio.run(read()) == pytest.approx([21.0] * 4, abs=0.05)
+
+
+def test_sensors_on_separate_pins_convert_concurrently():
+    pins = [(18, 23), (24, 25), (8, 7)]
+    backend = SimulatedBackend([SimulatedSHT1x(data_pin, sck_pin, time_scale=0.5) for data_pin, sck_pin in pins])
+    sensors = [AsyncSHT1x(data_pin, sck_pin, backend=backend) for data_pin, sck_pin in pins]
+    sequential = time.monotonic()
+    asyncio.run(sensors[0].read_all())
+    sequential = time.monotonic() - sequential
+
+    started = time.monotonic()
+    readings = asyncio.run(read_sensors(sensors))
+    assert len(readings) == 3
+    # Three sensors read in less time than two read one after the other.
+    assert time.monotonic() - started < sequential * 2
@@ -0,0 +1,51 @@
+import pytest
+
+from pi_sht1x import SHT1xBus, SimulatedBackend, SimulatedSHT1x
+
+DATA_PINS = (1, 2, 3)
+SCK_PIN = 5
+
+
+@pytest.fixture
+def simulated_sensors():
+    return [SimulatedSHT1x(data_pin, SCK_PIN, temperature=20.0 + data_pin, time_scale=0.05)
+            for data_pin in DATA_PINS]
+
+
+@pytest.fixture
+def bus(simulated_sensors):
+    with SHT1xBus(DATA_PINS, SCK_PIN, backend=SimulatedBackend(simulated_sensors)) as bus:
+        yield bus
+
+
+def test_read_temperature(bus):
+    readings = bus.read_temperature()
+    assert [reading.data_pin for reading in readings] == list(DATA_PINS)
+    assert [reading.value for reading in readings] == pytest.approx([21.0, 22.0, 23.0], abs=0.05)
+    assert all(reading.crc_ok and reading.error is None for reading in readings)
+
+
+def test_read_all(bus):
+    for temperature, humidity, dew_point in bus.read_all():
+        assert humidity == pytest.approx(50.0, abs=0.1)
+        assert dew_point is not None
+
+
+def test_sensor_without_ack_drops_out(bus, simulated_sensors):
+    # Without a sensor on its DATA pin, the pull-up keeps the line high and the command is not acknowledged.
+    bus.backend.sensors.remove(simulated_sensors[1])
+    readings = bus.read_temperature()
+    assert readings[1].error.startswith('SHT1x failed to properly receive command')
+    assert readings[1].value is None
+    assert [readings[0].value, readings[2].value] == pytest.approx([21.0, 23.0], abs=0.05)
+
+    bus.backend.attach(simulated_sensors[1])
+    assert bus.read_temperature()[1].value == pytest.approx(22.0, abs=0.05)
+
+
+def test_crc_error_is_flagged(bus, simulated_sensors):
+    crc = simulated_sensors[2].crc
+    simulated_sensors[2].crc = lambda command, data: crc(command, data) ^ 1
+    readings = bus.read_temperature()
+    assert readings[2].crc_ok is False
+    assert readings[0].crc_ok is True
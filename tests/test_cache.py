@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from pi_sht1x.cache import MeasurementCache
+
+
+def slow(calls, seconds=0.1, value=42):
+    def measure():
+        calls.append(time.monotonic())
+        time.sleep(seconds)
+        return value
+    return measure
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_max_age_is_served_from_the_cache(sensor, simulated):
+    sensor.read_temperature()
+    measurements = simulated.measurements
+    assert sensor.read_temperature(max_age=5) == pytest.approx(21.0, abs=0.05)
+    assert simulated.measurements == measurements
+    sensor.read_temperature()
+    assert simulated.measurements == measurements + 1
+
+
+def test_values_are_timestamped_when_the_measurement_starts():
+    cache, calls = MeasurementCache(), []
+    cache.get('Temperature', slow(calls))
+    assert cache.age('Temperature') >= 0.1
+
+
+def test_callers_without_max_age_measure_themselves():
+    cache, calls = MeasurementCache(), []
+    run_threads(lambda: cache.get('Temperature', slow(calls)), 4)
+    assert len(calls) == 4
+    assert cache.coalesced == 0
+
+
+def test_callers_with_max_age_join_the_running_measurement():
+    cache, calls, results = MeasurementCache(), [], []
+    run_threads(lambda: results.append(cache.get('Temperature', slow(calls, 0.2), max_age=1)), 4)
+    assert results == [42] * 4
+    assert len(calls) == 1
+    assert cache.coalesced == 3
+
+
+def test_errors_reach_the_joined_callers():
+    cache, errors = MeasurementCache(), []
+
+    def fail():
+        time.sleep(0.2)
+        raise OSError('failed')
+
+    def get():
+        try:
+            cache.get('Temperature', fail, max_age=1)
+        except OSError as e:
+            errors.append(e)
+
+    run_threads(get, 3)
+    assert len(errors) == 3
+    assert cache.age('Temperature') is None
@@ -0,0 +1,34 @@
+import io
+import json
+
+from pi_sht1x import cli
+
+
+def test_read(capsys):
+    assert cli.main(['read', '--sensor', 'greenhouse:18:23', '--backend', 'simulated']) == 0
+    reading = json.loads(capsys.readouterr().out)
+    assert reading['sensor'] == 'greenhouse'
+    assert reading['crc_ok'] is True
+
+
+def test_read_gives_up_on_a_dead_sensor(sensor, backend):
+    backend.sensors.clear()
+    output = io.StringIO()
+    assert cli.read({'greenhouse': sensor}, cli.Output(output), attempts=2) == ['greenhouse']
+    assert output.getvalue() == ''
+
+
+def test_bench_only_counts_benchmark_transactions(capsys):
+    assert cli.main(['bench', '--sensor', 'greenhouse:18:23', '--backend', 'simulated', '--count', '2',
+                     '--format', 'json']) == 0
+    result = json.loads(capsys.readouterr().out)['greenhouse']
+    assert result['readings'] == 2
+    assert result['phases']['transaction']['count'] == 4
+
+
+def test_stream_csv_from_several_sensors(capsys):
+    assert cli.main(['stream', '--sensor', 'a:18:23', '--sensor', 'b:24:25', '--backend', 'simulated',
+                     '--rate', '20', '--count', '2', '--format', 'csv']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith('sensor,timestamp,temperature_celsius')
+    assert sorted(line.split(',')[0] for line in lines[1:]) == ['a', 'a', 'b', 'b']
@@ -0,0 +1,60 @@
+import pytest
+
+from pi_sht1x import conversion
+from pi_sht1x.sht1x import SHT1x
+
+PROFILES = [(vdd, tuple(resolution)) for vdd in SHT1x.VDD.values() for resolution in SHT1x.RESOLUTION.values()]
+
+
+def scalar_values(vdd, resolution):
+    temperature_bits, humidity_bits = resolution
+    raw_temperatures = range(1 << temperature_bits)
+    raw_humidities = range(1 << humidity_bits)
+    return ([conversion.celsius(raw, vdd, resolution) for raw in raw_temperatures],
+            [conversion.fahrenheit(raw, vdd, resolution) for raw in raw_temperatures],
+            [conversion.humidity(raw, 25.0, resolution) for raw in raw_humidities])
+
+
+@pytest.mark.parametrize('vdd, resolution', PROFILES)
+def test_vectorized_conversion_matches_scalar(vdd, resolution):
+    numpy = pytest.importorskip('numpy')
+    temperature_bits, humidity_bits = resolution
+    raw_temperatures = numpy.arange(1 << temperature_bits)
+    raw_humidities = numpy.arange(1 << humidity_bits)
+    celsius, fahrenheit, humidity = scalar_values(vdd, resolution)
+
+    assert conversion.celsius(raw_temperatures, vdd, resolution).tolist() == celsius
+    assert conversion.fahrenheit(raw_temperatures, vdd, resolution).tolist() == fahrenheit
+    assert conversion.humidity(raw_humidities, 25.0, resolution).tolist() == humidity
+
+
+def test_vectorized_humidity_and_dew_point_match_scalar():
+    numpy = pytest.importorskip('numpy')
+    raw_temperatures = numpy.arange(0, 1 << 14, 4)
+    raw_humidities = numpy.arange(len(raw_temperatures)) % (1 << 12)
+    temperatures = conversion.celsius(raw_temperatures)
+    humidities = conversion.humidity(raw_humidities, temperatures)
+    expected = [conversion.humidity(int(raw), float(temperature))
+                for raw, temperature in zip(raw_humidities, temperatures)]
+    assert humidities.tolist() == expected
+
+    valid = humidities > 0
+    dew_points = conversion.dew_point(temperatures[valid], humidities[valid])
+    assert dew_points.tolist() == [conversion.dew_point(float(temperature), float(humidity))
+                                   for temperature, humidity in zip(temperatures[valid], humidities[valid])]
+
+
+def test_pure_python_conversion_matches_scalar(monkeypatch):
+    monkeypatch.setattr(conversion, 'numpy', None)
+    celsius, fahrenheit, humidity = scalar_values(3.5, (14, 12))
+    assert conversion.celsius(list(range(1 << 14))) == celsius
+    assert conversion.fahrenheit(list(range(1 << 14))) == fahrenheit
+    assert conversion.humidity(list(range(1 << 12)), 25.0) == humidity
+
+
+def test_array_rounding_matches_round_at_half_way_values():
+    numpy = pytest.importorskip('numpy')
+    values = numpy.arange(-40000, 120000) / 1000 + 0.0005
+    assert conversion._round_array(values, 2).tolist() == [round(float(value), 2) for value in values]
+    values = numpy.arange(-4000, 12000) / 100 + 0.005
+    assert conversion._round_array(values, 2).tolist() == [round(float(value), 2) for value in values]
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+
+from pi_sht1x import SensorDaemon, SHT1xClient, SHT1xError
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def daemon(sensor, loop, tmp_path):
+    daemon = SensorDaemon({'greenhouse': sensor}, str(tmp_path / 'sht1x.sock'))
+    asyncio.run_coroutine_threadsafe(daemon.start(), loop).result()
+    yield daemon
+    asyncio.run_coroutine_threadsafe(daemon.close(), loop).result()
+
+
+def send(path, *requests):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client, client.makefile('rwb') as stream:
+        client.settimeout(5)
+        client.connect(path)
+        responses = []
+        for request in requests:
+            stream.write(json.dumps(request).encode('utf-8') + b'\n')
+            stream.flush()
+            responses.append(json.loads(stream.readline().decode('utf-8')))
+        return responses
+
+
+def test_client(daemon):
+    with SHT1xClient(daemon.path) as client:
+        assert client.read_temperature() == pytest.approx(21.0, abs=0.05)
+        temperature, humidity, dew_point = client.read_all()
+        assert humidity == pytest.approx(40.0, abs=0.5)
+        with pytest.raises(SHT1xError):
+            SHT1xClient(daemon.path, sensor='shed').read_temperature()
+
+
+def test_bad_requests_keep_the_connection(daemon):
+    dew_point = {'method': 'calculate_dew_point', 'args': {'temperature': -272.62, 'humidity': 50}}
+    unknown = {'method': 'read_pressure'}
+    not_a_request = ['read_temperature']
+    errors = send(daemon.path, dew_point, unknown, not_a_request, {'method': 'read_temperature'})
+    assert [error.get('type') for error in errors] == ['ZeroDivisionError', 'SHT1xError', 'TypeError', None]
+    assert errors[-1]['result']['celsius'] == pytest.approx(21.0, abs=0.05)
+
+
+def test_concurrent_requests_share_a_measurement(sensor, tmp_path):
+    daemon = SensorDaemon({'greenhouse': sensor}, str(tmp_path / 'sht1x.sock'))
+
+    async def read():
+        return await asyncio.gather(*(daemon.request('read_temperature') for i in range(3)))
+
+    readings = asyncio.run(read())
+    assert [reading['celsius'] for reading in readings] == pytest.approx([21.0] * 3, abs=0.05)
+    assert (daemon.requests, daemon.measurements, daemon.coalesced) == (3, 1, 2)
+
+
+def test_client_reconnects_after_a_timeout(tmp_path):
+    path = str(tmp_path / 'sht1x.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+
+    def serve():
+        # The first connection never answers, the second one does.
+        silent, _ = server.accept()
+        connection, _ = server.accept()
+        with silent, connection, connection.makefile('rwb') as stream:
+            stream.readline()
+            stream.write(b'{"result": {"celsius": 21.0, "fahrenheit": 69.8}}\n')
+            stream.flush()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    with server, SHT1xClient(path, timeout=0.1) as client:
+        with pytest.raises(SHT1xError):
+            client.read_temperature()
+        assert client.read_temperature() == 21.0
+    thread.join()
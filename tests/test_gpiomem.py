@@ -0,0 +1,103 @@
+import sys
+import types
+
+import pytest
+
+from pi_sht1x import SHT1xError, backends
+from pi_sht1x.backends import (BACKENDS, BOARD, HIGH, IN, LOW, OUT, PUD_UP, GPIOMemBackend, RPiGPIOBackend,
+                               get_backend)
+
+PAGE_SIZE = 4096
+
+
+@pytest.fixture
+def registers(tmp_path):
+    path = tmp_path / 'gpiomem'
+    path.write_bytes(bytes(PAGE_SIZE))
+    return path
+
+
+@pytest.fixture
+def gpiomem(registers):
+    backend = GPIOMemBackend(str(registers))
+    yield backend
+    backend.close()
+
+
+def register(backend, offset):
+    return backend._registers[offset // 4]
+
+
+def test_setup_sets_the_function_select_bits(gpiomem):
+    gpiomem.setup(23, OUT)
+    # GPIO 23 is bits 9-11 of GPFSEL2.
+    assert register(gpiomem, GPIOMemBackend.GPFSEL0 + 8) == 0b001 << 9
+    assert gpiomem.gpio_function(23) == OUT
+    gpiomem.setup(23, IN, pull_up_down=PUD_UP)
+    assert register(gpiomem, GPIOMemBackend.GPFSEL0 + 8) == 0
+    assert gpiomem.gpio_function(23) == IN
+
+
+def test_setup_keeps_the_other_pins_of_the_register(gpiomem):
+    gpiomem.setup(20, OUT)
+    gpiomem.setup(23, OUT)
+    gpiomem.setup(20, IN)
+    assert register(gpiomem, GPIOMemBackend.GPFSEL0 + 8) == 0b001 << 9
+
+
+def test_output_writes_the_set_and_clear_registers(gpiomem):
+    gpiomem.setup(18, OUT)
+    gpiomem.output(18, HIGH)
+    assert register(gpiomem, GPIOMemBackend.GPSET0) == 1 << 18
+    gpiomem.output(18, LOW)
+    assert register(gpiomem, GPIOMemBackend.GPCLR0) == 1 << 18
+
+
+def test_input_reads_the_level_register(gpiomem):
+    gpiomem.setup(18, IN)
+    assert gpiomem.input(18) == LOW
+    gpiomem._registers[GPIOMemBackend.GPLEV0 // 4] = 1 << 18
+    assert gpiomem.input(18) == HIGH
+    assert gpiomem.input(17) == LOW
+
+
+def test_board_numbering(gpiomem):
+    gpiomem.setmode(BOARD)
+    gpiomem.setup(16, OUT)
+    gpiomem.output(16, HIGH)
+    # Header pin 16 is GPIO 23.
+    assert register(gpiomem, GPIOMemBackend.GPSET0) == 1 << 23
+    with pytest.raises(SHT1xError):
+        gpiomem.setup(1, OUT)
+
+
+def test_cleanup_returns_pins_to_inputs(gpiomem):
+    gpiomem.setup(18, OUT)
+    gpiomem.setup(23, OUT)
+    gpiomem.cleanup([18])
+    assert gpiomem.gpio_function(18) == IN
+    assert gpiomem.gpio_function(23) == OUT
+    gpiomem.cleanup()
+    assert gpiomem.gpio_function(23) == IN
+
+
+def test_register_file_too_small(tmp_path):
+    path = tmp_path / 'gpiomem'
+    path.write_bytes(bytes(16))
+    with pytest.raises(SHT1xError):
+        GPIOMemBackend(str(path))
+
+
+def test_falls_back_to_rpi_gpio(tmp_path, monkeypatch):
+    gpio = types.ModuleType('RPi.GPIO')
+    rpi = types.ModuleType('RPi')
+    rpi.GPIO = gpio
+    monkeypatch.setitem(sys.modules, 'RPi', rpi)
+    monkeypatch.setitem(sys.modules, 'RPi.GPIO', gpio)
+    monkeypatch.setitem(BACKENDS, GPIOMemBackend.name, lambda: GPIOMemBackend(str(tmp_path / 'missing')))
+    monkeypatch.setattr(backends, '_named_backends', {})
+
+    backend = get_backend(GPIOMemBackend.name)
+    assert isinstance(backend, RPiGPIOBackend)
+    assert backend.gpio is gpio
+    assert get_backend(GPIOMemBackend.name) is get_backend() is backend
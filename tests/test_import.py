@@ -0,0 +1,11 @@
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_import_does_not_need_rpi_gpio():
+    # A fresh interpreter, so modules imported by other tests don't count.
+    code = ('import sys, pi_sht1x\n'
+            'pi_sht1x.SHT1x, pi_sht1x.COF, pi_sht1x.SHT1xClient\n'
+            'assert "RPi" not in sys.modules, sorted(sys.modules)\n')
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=str(Path(__file__).parents[1]))
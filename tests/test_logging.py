@@ -0,0 +1,20 @@
+import logging
+
+from pi_sht1x import SHT1x
+from pi_sht1x.logging import create_logger, stop_logger
+
+
+def test_default_logger_only_has_a_null_handler():
+    logger = create_logger('pi_sht1x.test_default')
+    assert [type(handler) for handler in logger.handlers] == [logging.NullHandler]
+
+
+def test_queued_log_file(tmp_path, backend, simulated):
+    path = tmp_path / 'sensor.log'
+    logger = create_logger('pi_sht1x.test_queued', log_file=str(path), level=logging.INFO, queued=True)
+    sensor = SHT1x(18, 23, backend=backend, logger=logger)
+    sensor.read_temperature()
+    stop_logger('pi_sht1x.test_queued')
+    log = path.read_text()
+    assert 'Writing Status Register' in log
+    assert 'Temperature' in log
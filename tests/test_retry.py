@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from pi_sht1x import AsyncSHT1x, RetryPolicy, SHT1xCRCError
+
+
+def test_retry_recovers(sensor, simulated, corrupt_crc):
+    sensor.retry_policy = policy = RetryPolicy()
+    corrupt_crc({1, 2})
+    assert sensor.read_temperature() == pytest.approx(21.0, abs=0.05)
+    assert policy.stats()['recovered'] == 1
+    assert policy.recoveries == {'reread': 1, 'reset_connection': 1, 'soft_reset': 0}
+
+
+def test_retry_restores_the_status_register(sensor, simulated, corrupt_crc):
+    sensor.configure(heater=True, resolution='Low')
+    sensor.retry_policy = RetryPolicy()
+    corrupt_crc({1, 2, 3})
+    sensor.read_temperature()
+    assert sensor.retry_policy.recoveries['soft_reset'] == 1
+    assert simulated.status_register & 0b111 == 0b101
+
+
+def test_retry_gives_up(sensor, corrupt_crc):
+    sensor.retry_policy = policy = RetryPolicy(retries=2)
+    corrupt_crc(set(range(1, 10)))
+    with pytest.raises(SHT1xCRCError):
+        sensor.read_temperature()
+    assert policy.stats()['attempts'] == 3
+    assert policy.stats()['failures'] == 1
+
+
+def test_retry_budget(sensor, corrupt_crc):
+    sensor.retry_policy = policy = RetryPolicy(retries=5, budget=1)
+    corrupt_crc(set(range(1, 10)))
+    with pytest.raises(SHT1xCRCError):
+        sensor.read_temperature()
+    assert policy.stats()['retried'] == 1
+
+
+def test_async_retry(sensor, corrupt_crc):
+    sensor.retry_policy = policy = RetryPolicy()
+    corrupt_crc({1, 2})
+    assert asyncio.run(AsyncSHT1x.from_sensor(sensor).read_temperature()) == pytest.approx(21.0, abs=0.05)
+    assert policy.stats()['recovered'] == 1
+
@@ -0,0 +1,35 @@
+import time
+
+from pi_sht1x import Sampler
+
+
+def disconnect(backend):
+    backend.sensors.clear()
+
+
+def test_count(sensor):
+    with Sampler(sensor, rate=20, count=3) as sampler:
+        readings = list(sampler)
+    assert len(readings) == 3
+    assert sampler.stats()['errors'] == 0
+
+
+def test_count_ends_on_a_dead_sensor(sensor, backend):
+    disconnect(backend)
+    started = time.monotonic()
+    with Sampler(sensor, rate=5, count=1) as sampler:
+        assert list(sampler) == []
+    assert sampler.stats()['errors'] == 1
+    assert time.monotonic() - started < 5
+
+
+def test_max_errors_ends_sampling(sensor, backend):
+    disconnect(backend)
+    with Sampler(sensor, rate=50, max_errors=3) as sampler:
+        assert list(sampler) == []
+    assert sampler.stats()['errors'] == 3
+
+
+def test_stream_max_errors(sensor, backend):
+    disconnect(backend)
+    assert list(sensor.stream(rate=50, max_errors=2)) == []
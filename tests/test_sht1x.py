@@ -0,0 +1,132 @@
+import gc
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pi_sht1x import SHT1x, SHT1xBus, SimulatedBackend, SimulatedSHT1x
+from pi_sht1x.backends import IN, OUT
+from pi_sht1x.sht1x import shared_pins
+
+
+def test_read(sensor):
+    assert sensor.read_temperature() == pytest.approx(21.0, abs=0.05)
+    assert sensor.read_humidity() == pytest.approx(40.0, abs=0.1)
+    reading = sensor.read()
+    assert reading.resolution == (14, 12)
+    assert reading.crc_ok is True
+
+
+def test_commands_are_replayed_from_compiled_waveforms(sensor):
+    sensor.read_temperature()
+    assert set(sensor._waveforms) == {sensor.Commands['WriteStatusRegister'], sensor.Commands['Temperature']}
+    waveform = sensor._waveforms[sensor.Commands['Temperature']]
+    sensor.read_temperature()
+    assert sensor._waveforms[sensor.Commands['Temperature']] is waveform
+
+
+def test_sck_delay_recompiles_waveforms(sensor):
+    sensor.read_temperature()
+    sensor.sck_delay = 0.00001
+    assert not sensor._waveforms
+    assert sensor.read_temperature() == pytest.approx(21.0, abs=0.05)
+    waveform = sensor._waveforms[sensor.Commands['Temperature']]
+    assert {delay for pin, state, delay in waveform if pin == sensor.sck_pin} == {0.00001}
+
+
+def test_read_status_register_sees_the_read_only_bits(sensor, simulated):
+    sensor.configure(resolution='Low')
+    # Bit 6: VDD below 2.47V.
+    simulated.status_register |= 0b01000000
+    assert sensor.read_status_register() == 0b01000001
+    assert sensor.read_status_register(cached=True) == 0b00000001
+
+
+def test_configure_writes_only_changed_settings(sensor, simulated):
+    sensor.read_temperature()
+    simulated.status_register |= 0b01000000
+    sensor.read_status_register()
+    assert not sensor.configure(resolution='High')
+    assert sensor.configure(heater=True)
+    assert simulated.status_register == 0b01000100
+
+
+def test_leaving_keeps_a_shared_sck_line_for_the_other_sensors():
+    backend = SimulatedBackend([SimulatedSHT1x(18, 23, temperature=10.0, time_scale=0.05),
+                                SimulatedSHT1x(24, 23, temperature=30.0, time_scale=0.05)])
+    first, second = SHT1x(18, 23, backend=backend), SHT1x(24, 23, backend=backend)
+    with first:
+        first.read_temperature()
+    assert backend.gpio_function(23) == OUT
+    assert backend.gpio_function(18) == IN
+    assert second.read_temperature() == pytest.approx(30.0, abs=0.05)
+
+    second.__exit__(None, None, None)
+    assert backend.gpio_function(23) == IN
+    # A sensor used again after leaving sets SCK up again.
+    assert first.read_temperature() == pytest.approx(10.0, abs=0.05)
+
+
+def test_objects_on_the_same_pins_keep_their_settings(backend, simulated, sensor):
+    other = SHT1x(sensor.data_pin, sensor.sck_pin, backend=backend)
+    sensor.configure(heater=True)
+    assert other.read_temperature() == pytest.approx(21.0, abs=0.05)
+    assert simulated.status_register & 0b111 == 0
+
+    sensor.configure(resolution='Low')
+    assert other.read_temperature() == pytest.approx(21.0, abs=0.05)
+    assert sensor.read_temperature() == pytest.approx(21.0, abs=0.05)
+    assert simulated.status_register & 0b111 == 0b101
+    assert sensor.read_status_register() == 0b101
+    assert other.read_status_register() == 0
+
+
+def test_objects_on_the_same_pins_from_threads(backend, sensor):
+    other = SHT1x(sensor.data_pin, sensor.sck_pin, backend=backend, resolution='Low')
+
+    def read(i):
+        return (sensor, other)[i % 2].read_temperature()
+
+    with ThreadPoolExecutor(4) as executor:
+        temperatures = list(executor.map(read, range(16)))
+    assert temperatures == pytest.approx([21.0] * 16, abs=0.05)
+
+
+def test_lock_is_shared_per_sck_line():
+    backend = SimulatedBackend([SimulatedSHT1x(pin, 5, time_scale=0.05) for pin in (1, 2)] +
+                               [SimulatedSHT1x(3, 6, time_scale=0.05)])
+    bus = SHT1xBus([1, 2], 5, backend=backend)
+    single = SHT1x(3, 6, backend=backend)
+    assert bus.sensors[0].lock.pins is bus.sensors[1].lock.pins
+    assert single.lock.pins is not bus.sensors[0].lock.pins
+
+    errors = []
+
+    def read(sensor):
+        for i in range(5):
+            try:
+                sensor.read_temperature()
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=read, args=(sensor,)) for sensor in bus.sensors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_pins_are_shared_per_backend_object():
+    first, second = SimulatedBackend(), SimulatedBackend()
+    assert shared_pins(first, 23) is shared_pins(first, 23)
+    assert shared_pins(first, 23) is not shared_pins(second, 23)
+
+    backend = SimulatedBackend([SimulatedSHT1x(18, 23, time_scale=0.05)])
+    with SHT1x(18, 23, backend=backend) as sensor:
+        sensor.read_temperature()
+    released = weakref.ref(backend)
+    del sensor, backend
+    gc.collect()
+    assert released() is None
@@ -0,0 +1,14 @@
+from pi_sht1x import SHT1x, SimulatedBackend, SimulatedSHT1x
+
+
+def test_sensors_on_separate_pins():
+    backend = SimulatedBackend([SimulatedSHT1x(18, 23, temperature=10.0, time_scale=0.05),
+                                SimulatedSHT1x(24, 25, temperature=30.0, time_scale=0.05)])
+    first, second = SHT1x(18, 23, backend=backend), SHT1x(24, 25, backend=backend)
+    assert round(first.read_temperature()) == 10
+    assert round(second.read_temperature()) == 30
+
+
+def test_status_register_is_written(backend, simulated):
+    SHT1x(18, 23, backend=backend, heater=True, resolution='Low')
+    assert simulated.status_register & 0b111 == 0b101
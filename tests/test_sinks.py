@@ -0,0 +1,65 @@
+import sqlite3
+
+from pi_sht1x import CSVSink, LineProtocolSink, SQLiteSink
+from pi_sht1x.sht1x import Reading
+from pi_sht1x.sinks import COLUMNS, record
+
+READING = Reading(1700000000.0, 21.0, 69.8, 40.0, 7.0, (14, 12), True)
+
+
+class FailingSink(SQLiteSink):
+    failing = True
+
+    def _write(self, records):
+        if self.failing:
+            raise sqlite3.OperationalError('database is locked')
+        super()._write(records)
+
+
+def rows(sink):
+    return sink._connection.execute('SELECT COUNT(*) FROM readings').fetchone()[0]
+
+
+def test_failed_batch_stays_buffered():
+    sink = FailingSink(':memory:', batch_size=2, flush_interval=60)
+    sink.write(READING, 'a')
+    try:
+        sink.write(READING, 'a')
+    except sqlite3.OperationalError:
+        pass
+    assert len(sink._buffer) == 2
+    sink.failing = False
+    sink.flush()
+    assert rows(sink) == 2
+    assert sink.written == 2
+    assert sink.dropped == 0
+
+
+def test_oldest_readings_are_dropped_while_writes_fail():
+    sink = FailingSink(':memory:', batch_size=2, flush_interval=60, max_buffered=3)
+    for i in range(5):
+        try:
+            sink.write(READING._replace(timestamp=i), 'a')
+        except sqlite3.OperationalError:
+            pass
+    assert sink.dropped == 2
+    assert [values[1] for values in sink._buffer] == [2, 3, 4]
+
+
+def test_csv_sink_writes_in_batches(tmp_path):
+    path = tmp_path / 'readings.csv'
+    with CSVSink(str(path), batch_size=2, flush_interval=60) as sink:
+        sink.write(READING, 'greenhouse')
+        assert path.read_text().splitlines() == [','.join(COLUMNS)]
+        sink.write(READING, 'greenhouse')
+        assert len(path.read_text().splitlines()) == 3
+        sink.write(READING, 'shed')
+    assert path.read_text().splitlines()[-1].startswith('shed,1700000000.0,21.0')
+
+
+def test_line_protocol(tmp_path):
+    sink = LineProtocolSink(str(tmp_path / 'readings.lp'), tags={'site': 'north field'})
+    assert sink.line(record(READING, 'greenhouse')) == (
+        'sht1x,sensor=greenhouse,site=north\\ field temperature_celsius=21.0,temperature_fahrenheit=69.8,'
+        'humidity=40.0,dew_point=7.0,temperature_bits=14i,humidity_bits=12i,crc_ok=true 1700000000000000000')
+    sink.close()